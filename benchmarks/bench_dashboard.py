@@ -0,0 +1,302 @@
+"""Mede o carregamento, as agregações e os gráficos do dashboard em vários tamanhos.
+
+Uso: python benchmarks/bench_dashboard.py [--linhas N ...] [--vendedores N]
+     [--de AAAA-MM-DD] [--ate AAAA-MM-DD] [--formato xlsx|csv|parquet]
+     [--repeticoes N] [--pasta DIR] [--saida ARQUIVO.json] [--comparar ANTERIOR.json]
+
+Gera planilhas sintéticas de vendas e metas (guardadas em --pasta e
+reaproveitadas entre execuções) e cronometra cada etapa de um rerun:
+carregar_e_processar_dados a frio, pelo snapshot e pelo cache em memória,
+a agregação e o merge da visão geral, o caminho da aba do vendedor e cada
+construtor criar_* (sem o cache de figuras e com ele). O resultado vai
+para um JSON com as versões das bibliotecas, para comparar execuções com
+--comparar.
+
+Uma aba .xlsx comporta no máximo 1.048.575 linhas de dados; acima disso
+as vendas são gravadas em Parquet (ou CSV, se pedido).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from importlib import metadata
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import dados  # noqa: E402
+import graficos  # noqa: E402
+import snapshots  # noqa: E402
+from dados import (  # noqa: E402
+    COL_EMISSAO, COL_VALOR, COL_CONTAGEM, COL_VENDEDOR, COL_META_INICIAL, COL_META_MENSAL,
+    MAPA_MESES
+)
+from figuras import cache_figuras  # noqa: E402
+
+LINHAS_PADRAO = [10_000, 1_000_000, 10_000_000]
+LIMITE_LINHAS_XLSX = 1_048_575
+PACOTES = ['pandas', 'numpy', 'plotly', 'openpyxl', 'pyarrow', 'streamlit']
+NOMES_MESES = {numero: nome for nome, numero in MAPA_MESES.items()}
+# Fator de sazonalidade de cada mês (vendas mais fortes no fim do ano)
+SAZONALIDADE = np.array([0.8, 0.85, 1.0, 0.95, 1.0, 0.95, 0.9, 1.0, 1.05, 1.1, 1.2, 1.4])
+
+
+def gerar_vendas(linhas, vendedores, inicio, fim, semente=0):
+    """Vendas sintéticas: poucos vendedores concentram o volume, fins de semana e meses fracos vendem menos."""
+    rng = np.random.default_rng(semente)
+    dias = pd.date_range(inicio, fim, freq='D')
+    peso_dias = SAZONALIDADE[dias.month - 1] * np.where(dias.dayofweek >= 5, 0.3, 1.0)
+    nomes = np.array([f"VENDEDOR {i + 1:03d}" for i in range(vendedores)])
+    peso_vendedores = 1 / np.arange(1, vendedores + 1) ** 0.8
+    return pd.DataFrame({
+        COL_EMISSAO: dias[rng.choice(len(dias), linhas, p=peso_dias / peso_dias.sum())],
+        COL_VALOR: np.round(rng.lognormal(7, 1.2, linhas), 2),
+        COL_CONTAGEM: 1,
+        COL_VENDEDOR: pd.Categorical.from_codes(
+            rng.choice(vendedores, linhas, p=peso_vendedores / peso_vendedores.sum()), nomes
+        ),
+        'CLIENTE': rng.integers(1, 50_000, linhas),
+    })
+
+
+def gerar_metas(df_vendas, semente=0):
+    """Metas da empresa e por vendedor em torno do realizado de cada mês, como nas planilhas reais."""
+    rng = np.random.default_rng(semente + 1)
+    emissao = df_vendas[COL_EMISSAO]
+    chave = [emissao.dt.year.rename('Ano'), emissao.dt.month.rename('Mes')]
+    varios_anos = emissao.dt.year.nunique() > 1
+
+    por_vendedor = df_vendas.groupby([df_vendas[COL_VENDEDOR], *chave], observed=True)[COL_VALOR].sum().reset_index()
+    por_vendedor[COL_META_INICIAL] = np.round(por_vendedor[COL_VALOR] * rng.uniform(0.8, 1.2, len(por_vendedor)), -2)
+    por_vendedor[COL_META_MENSAL] = np.round(por_vendedor[COL_META_INICIAL] * rng.uniform(0.95, 1.1, len(por_vendedor)), -2)
+    por_vendedor['Meta Mensal Acumulada'] = por_vendedor.groupby([COL_VENDEDOR, 'Ano'], observed=True)[COL_META_MENSAL].cumsum()
+
+    metas = por_vendedor.groupby(['Ano', 'Mes'])[[COL_META_INICIAL, COL_META_MENSAL]].sum().reset_index()
+    metas = metas.rename(columns={COL_META_INICIAL: 'Mensal', COL_META_MENSAL: 'Acumulado'})
+
+    for df in (metas, por_vendedor):
+        df.insert(0, 'Mês', df['Mes'].map(NOMES_MESES))
+    colunas_metas = ['Mês', 'Mensal', 'Acumulado']
+    colunas_vendedores = [COL_VENDEDOR, 'Mês', COL_META_INICIAL, COL_META_MENSAL, 'Meta Mensal Acumulada']
+    if varios_anos:
+        colunas_metas.insert(0, 'Ano')
+        colunas_vendedores.insert(1, 'Ano')
+    return metas[colunas_metas], por_vendedor[colunas_vendedores]
+
+
+def gravar_xlsx(caminho, abas):
+    """Grava as abas em modo write-only do openpyxl, bem mais rápido que o to_excel do pandas."""
+    wb = openpyxl.Workbook(write_only=True)
+    for nome, df in abas.items():
+        ws = wb.create_sheet(nome)
+        ws.append(list(df.columns))
+        colunas = [
+            df[c].dt.to_pydatetime() if pd.api.types.is_datetime64_any_dtype(df[c]) else df[c].astype(object).to_numpy()
+            for c in df.columns
+        ]
+        for linha in zip(*colunas):
+            ws.append(linha)
+    wb.save(caminho)
+
+
+def preparar_arquivos(pasta, linhas, vendedores, inicio, fim, formato):
+    """Gera (ou reaproveita) os arquivos de vendas e metas de um tamanho e retorna seus caminhos."""
+    if formato == 'xlsx' and linhas > LIMITE_LINHAS_XLSX:
+        formato = 'parquet'
+    base = os.path.join(pasta, f"{linhas}_{vendedores}_{inicio}_{fim}")
+    arq_vendas, arq_metas = f"{base}_vendas.{formato}", f"{base}_metas.xlsx"
+    if os.path.exists(arq_vendas) and os.path.exists(arq_metas):
+        return arq_vendas, arq_metas
+
+    os.makedirs(pasta, exist_ok=True)
+    print(f"Gerando {linhas:,} vendas em {formato}...", flush=True)
+    df_vendas = gerar_vendas(linhas, vendedores, inicio, fim)
+    df_metas, df_metas_vendedores = gerar_metas(df_vendas)
+    gravar_xlsx(arq_metas, {'metas': df_metas, 'Planilha1': df_metas_vendedores})
+    if formato == 'xlsx':
+        gravar_xlsx(arq_vendas, {'Vendas': df_vendas})
+    elif formato == 'csv':
+        df_vendas.to_csv(arq_vendas, index=False, sep=';', decimal=',', date_format='%d/%m/%Y')
+    else:
+        df_vendas.to_parquet(arq_vendas, index=False)
+    return arq_vendas, arq_metas
+
+
+def cronometrar(funcao, repeticoes=3, preparar=None):
+    """Executa `funcao` várias vezes e retorna os tempos em segundos e o último resultado."""
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos, resultado
+
+
+def medir_tamanho(arq_vendas, arq_metas, repeticoes, pasta_snapshots):
+    """Cronometra as etapas de um rerun do dashboard para um par de arquivos."""
+    etapas = {}
+
+    def medir(nome, funcao, preparar=None, vezes=repeticoes):
+        tempos, resultado = cronometrar(funcao, vezes, preparar)
+        etapas[nome] = tempos
+        print(f"  {nome:<38} {min(tempos) * 1000:10.1f} ms", flush=True)
+        return resultado
+
+    def sem_snapshots():
+        dados.cache_dados.limpar()
+        shutil.rmtree(pasta_snapshots, ignore_errors=True)
+
+    carregar = lambda: dados.carregar_e_processar_dados(arq_vendas, arq_metas)  # noqa: E731
+    medir('carregar_frio', carregar, sem_snapshots)
+    medir('carregar_snapshot', carregar, dados.cache_dados.limpar)
+    df_vendas, df_metas, df_metas_vendedores = medir('carregar_memoria', carregar)
+
+    # Visão geral
+    cubo = medir('montar_cubo', lambda: dados.montar_cubo(df_vendas))
+    periodos = dados.listar_periodos(cubo)
+    df_consolidado = medir('consolidar_meses', lambda: dados.consolidar_meses(cubo, df_metas))
+    # Cubo do filtro por datas (o último mês), sem o cache por intervalo de obter_cubo_intervalo
+    ultimo_mes = dados.datas_dos_periodos(periodos[-1], periodos[-1])
+    medir('cubo_intervalo', lambda: dados.montar_cubo(dados.fatiar_datas(df_vendas, *ultimo_mes)))
+    # Ranking montado do zero (obter_ranking o guardaria) e o resumo de um intervalo ainda não pedido
+    ranking = medir('montar_ranking', lambda: dados.RankingVendedores(cubo, df_metas_vendedores))
+    medir('ranking_resumo', lambda: ranking.resumo(periodos[0], periodos[-1]),
+          preparar=ranking._resumos.clear)
+    data_corte = df_vendas[COL_EMISSAO].iloc[-1]
+    df_projecao = medir('projetar_geral', lambda: dados.projetar_geral(cubo, df_metas, data_corte=data_corte))
+    medir('projetar_vendedores', lambda: dados.projetar_vendedores(cubo, df_metas_vendedores, data_corte=data_corte))
+    # Insights da visão geral e de todos os vendedores de uma vez (obter_insights os guardaria)
+    indicadores = medir('montar_insights', lambda: dados.montar_insights(cubo, df_metas, df_metas_vendedores))
+    d0, d1 = dados.datas_dos_periodos(periodos[0], periodos[-1])
+    df_ritmo = medir('ritmo_diario', lambda: dados.ritmo_diario(df_vendas, df_metas, d0, d1))
+
+    # Aba do vendedor: o de maior volume, com a primeira página do detalhamento
+    vendedor = cubo.groupby(level=COL_VENDEDOR, observed=True)[COL_VALOR].sum().idxmax()
+    df_vendedor = medir('consolidar_vendedor', lambda: dados.consolidar_vendedor(cubo, df_metas_vendedores, vendedor))
+    indice = medir('montar_indice_vendedores', lambda: dados.montar_indice_vendedores(df_vendas))
+    medir('paginar_vendas', lambda: dados.paginar_vendas(df_vendas, indice[vendedor], 1, 50))
+
+    total_vendas = df_consolidado[COL_VALOR].sum()
+    total_meta = df_consolidado[COL_META_MENSAL].sum()
+    construtores = {
+        'criar_pizza_atingimento': (graficos.criar_pizza_atingimento, (total_vendas, total_meta, "Vs Meta Mensal")),
+        'criar_pizza_distribuicao': (graficos.criar_pizza_distribuicao, (df_consolidado,)),
+        'criar_grafico_barras': (graficos.criar_grafico_barras, (df_consolidado,)),
+        'criar_grafico_barras_acumulado': (graficos.criar_grafico_barras_acumulado, (df_consolidado,)),
+        'criar_grafico_cumulativo': (graficos.criar_grafico_cumulativo, (df_consolidado,)),
+        'criar_heatmap_faturamento': (graficos.criar_heatmap_faturamento, (df_consolidado,)),
+        'criar_histograma_faturamento': (graficos.criar_histograma_faturamento, (df_consolidado,)),
+        'criar_grafico_ritmo': (graficos.criar_grafico_ritmo, (df_ritmo, "Ritmo")),
+        'criar_grafico_projecao': (graficos.criar_grafico_projecao, (df_projecao, "Projeção")),
+        'criar_pizza_distribuicao[vendedor]': (graficos.criar_pizza_distribuicao, (df_vendedor,)),
+    }
+    for nome, (construtor, args) in construtores.items():
+        # __wrapped__ é o construtor sem o cache de figuras
+        medir(nome, lambda: construtor.__wrapped__(*args))
+        cache_figuras.limpar()
+        construtor(*args)
+        medir(f"{nome}[em_cache]", lambda: construtor(*args))
+    medir('gerar_insights', lambda: graficos.gerar_insights(indicadores.loc[dados.ROTULO_GERAL]))
+
+    return {
+        'linhas': len(df_vendas),
+        'vendedores': len(dados.listar_vendedores(cubo)),
+        'periodos': len(periodos),
+        'arquivo_vendas': os.path.basename(arq_vendas),
+        'bytes_arquivo_vendas': os.path.getsize(arq_vendas),
+        'bytes_memoria_vendas': int(dados.tamanho_em_memoria(df_vendas)),
+        'etapas': {
+            nome: {'melhor_s': min(tempos), 'mediana_s': statistics.median(tempos), 'tempos_s': tempos}
+            for nome, tempos in etapas.items()
+        },
+    }
+
+
+def ambiente():
+    """Versões e máquina em que o benchmark rodou, para comparar execuções."""
+    versoes = {}
+    for pacote in PACOTES:
+        try:
+            versoes[pacote] = metadata.version(pacote)
+        except metadata.PackageNotFoundError:
+            versoes[pacote] = None
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'pacotes': versoes,
+        'snapshots': snapshots.disponivel(),
+    }
+
+
+def comparar(resultado, anterior):
+    """Mostra a razão entre os tempos (melhor de cada etapa) desta execução e de uma anterior."""
+    antes = {r['linhas']: r['etapas'] for r in anterior['tamanhos']}
+    print(f"\nComparação com {anterior['ambiente'].get('commit')} ({anterior['ambiente'].get('data')}):")
+    for tamanho in resultado['tamanhos']:
+        etapas_antes = antes.get(tamanho['linhas'])
+        if etapas_antes is None:
+            continue
+        print(f"{tamanho['linhas']:,} linhas")
+        for nome, etapa in tamanho['etapas'].items():
+            if nome in etapas_antes:
+                razao = etapa['melhor_s'] / etapas_antes[nome]['melhor_s']
+                print(f"  {nome:<38} {razao:6.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do dashboard de metas com planilhas sintéticas.")
+    parser.add_argument('--linhas', type=int, nargs='+', default=LINHAS_PADRAO, help="Tamanhos das vendas")
+    parser.add_argument('--vendedores', type=int, default=50, help="Número de vendedores")
+    parser.add_argument('--de', default='2024-01-01', help="Primeira data das vendas (AAAA-MM-DD)")
+    parser.add_argument('--ate', default='2025-12-31', help="Última data das vendas (AAAA-MM-DD)")
+    parser.add_argument('--formato', choices=['xlsx', 'csv', 'parquet'], default='xlsx', help="Formato das vendas")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções de cada etapa (vale o melhor tempo)")
+    parser.add_argument('--pasta', default=os.path.join(RAIZ, 'benchmarks', '.dados'),
+                        help="Onde guardar as planilhas geradas e os snapshots")
+    parser.add_argument('--saida', default=os.path.join(RAIZ, 'benchmarks', 'resultados_benchmark.json'),
+                        help="Arquivo JSON com os resultados")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args(argv)
+
+    # Snapshots numa pasta própria, para não misturar com os do dashboard
+    snapshots.SNAPSHOT_DIR = os.path.join(args.pasta, 'snapshots')
+    resultado = {'ambiente': ambiente(), 'tamanhos': []}
+    for linhas in args.linhas:
+        arq_vendas, arq_metas = preparar_arquivos(args.pasta, linhas, args.vendedores, args.de, args.ate, args.formato)
+        print(f"{linhas:,} linhas ({os.path.basename(arq_vendas)})", flush=True)
+        resultado['tamanhos'].append(medir_tamanho(arq_vendas, arq_metas, args.repeticoes, snapshots.SNAPSHOT_DIR))
+        dados.cache_dados.limpar()
+
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultado, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
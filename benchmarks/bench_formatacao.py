@@ -0,0 +1,66 @@
+"""Compara formatar_moeda_serie e formatar_percentual_serie com a formatação valor a valor.
+
+Uso: python benchmarks/bench_formatacao.py [linhas]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from formatacao import formatar_moeda, formatar_moeda_serie, formatar_percentual_serie  # noqa: E402
+
+CASOS_LIMITE = [
+    0.0, -0.0, 0.005, 0.015, 0.125, 1.005, 2.675, -0.004, -0.005, 999.995,
+    999999.999, 1e12, 9999999999999.99, 1e13, 1e20, np.nan, np.inf, -np.inf,
+]
+
+
+def gerar_valores(linhas, semente=0):
+    """Valores no formato de notas fiscais, com devoluções e casos limite."""
+    rng = np.random.default_rng(semente)
+    valores = np.round(rng.lognormal(7, 1.5, linhas), 2)
+    valores[rng.random(linhas) < 0.02] *= -1
+    return pd.Series(np.concatenate([valores, CASOS_LIMITE]))
+
+
+def cronometrar(funcao, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main(linhas=200_000):
+    valores = gerar_valores(linhas)
+    t_escalar, esperado = cronometrar(lambda: valores.apply(formatar_moeda))
+    t_vetor, obtido = cronometrar(lambda: formatar_moeda_serie(valores))
+
+    divergentes = int((esperado != obtido).sum())
+    if divergentes:
+        raise SystemExit(f"{divergentes} valores formatados diferente de formatar_moeda")
+
+    print(f"{len(valores)} valores")
+    print(f"formatar_moeda (apply): {t_escalar * 1000:8.1f} ms")
+    print(f"formatar_moeda_serie:   {t_vetor * 1000:8.1f} ms  ({t_escalar / t_vetor:.1f}x)")
+
+    # Percentuais de atingimento: em torno de 100%, com os mesmos casos limite
+    percentuais = valores / valores.median() * 100
+    t_escalar, esperado = cronometrar(lambda: percentuais.map('{:.1f}%'.format))
+    t_vetor, obtido = cronometrar(lambda: formatar_percentual_serie(percentuais))
+
+    divergentes = int((esperado.to_numpy() != obtido).sum())
+    if divergentes:
+        raise SystemExit(f"{divergentes} percentuais formatados diferente de '{{:.1f}}%'")
+
+    print(f"'{{:.1f}}%' (map):           {t_escalar * 1000:8.1f} ms")
+    print(f"formatar_percentual_serie: {t_vetor * 1000:8.1f} ms  ({t_escalar / t_vetor:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
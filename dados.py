@@ -0,0 +1,1457 @@
+import functools
+import hashlib
+import io
+import threading
+import time
+import weakref
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+import formatos
+import snapshots
+
+COL_EMISSAO = 'EMISSÃO'
+COL_VALOR = 'VALOR'
+COL_CONTAGEM = 'CONTAGEM'
+COL_VENDEDOR = 'VENDEDOR'
+COL_META_INICIAL = 'Meta Inicial'
+COL_META_MENSAL = 'Meta Mensal'
+COL_META_ACUMULADO = 'Acumulado'
+COL_MES = 'MÊS'
+COL_MES_NUM = 'Mes_Num'
+COL_ANO = 'Ano'
+# Chave de período ano * 100 + mês (ex.: 202501), ordenável e sem ambiguidade entre anos
+COL_PERIODO = 'Periodo'
+COL_NOME_MES = 'Nome_Mes'
+COL_PERC_META_MENSAL = 'Perc_Meta_Mensal'
+COL_PERC_META_INICIAL = 'Perc_Meta_Inicial'
+COL_TICKET_MEDIO = 'Ticket_Medio'
+COL_DATA = 'Data'
+COL_REALIZADO_ACUM = 'Realizado_Acum'
+COL_META_ACUM = 'Meta_Acum'
+COL_CRESCIMENTO = 'Crescimento'
+COL_PERCENTIL = 'Percentil'
+COL_META_ANUAL = 'Meta_Anual'
+COL_PROJECAO = 'Projecao'
+COL_PROJECAO_ACUM = 'Projecao_Acum'
+COL_PROJECAO_MIN = 'Projecao_Min'
+COL_PROJECAO_MAX = 'Projecao_Max'
+COL_PROJECAO_RITMO = 'Projecao_Ritmo'
+COL_PERC_PROJECAO = 'Perc_Projecao'
+COL_PROB_META = 'Prob_Meta'
+# Linha da empresa inteira nas tabelas que também trazem cada vendedor
+ROTULO_GERAL = 'Geral'
+
+MAPA_MESES = {
+    'Janeiro': 1, 'Fevereiro': 2, 'Março': 3, 'Abril': 4,
+    'Maio': 5, 'Junho': 6, 'Julho': 7, 'Agosto': 8,
+    'Setembro': 9, 'Outubro': 10, 'Novembro': 11, 'Dezembro': 12
+}
+
+MESES_ABREV = {
+    1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
+    7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
+}
+
+# Colunas lidas de cada aba; as demais colunas das planilhas são ignoradas
+COLUNAS_VENDAS = [COL_EMISSAO, COL_VALOR, COL_CONTAGEM, COL_VENDEDOR]
+# 'Ano' é opcional nas metas: sem ele, a meta de cada mês vale para todos os anos
+COLUNAS_METAS = [COL_ANO, 'Mês', 'Mensal', 'Acumulado']
+COLUNAS_METAS_VENDEDORES = [COL_VENDEDOR, COL_ANO, 'Mês', COL_META_INICIAL, COL_META_MENSAL, 'Meta Mensal Acumulada']
+
+# Tipos das colunas de vendas nos leitores de CSV e Parquet
+TIPOS_VENDAS = {COL_EMISSAO: 'data', COL_VALOR: 'numero', COL_CONTAGEM: 'numero', COL_VENDEDOR: 'categoria'}
+TIPOS_METAS = {
+    COL_ANO: 'numero', 'Mensal': 'numero', 'Acumulado': 'numero',
+    COL_META_INICIAL: 'numero', COL_META_MENSAL: 'numero', 'Meta Mensal Acumulada': 'numero',
+}
+
+# Tabelas gravadas no snapshot de um dataset de vendas
+TABELAS_VENDAS = ['vendas', 'cubo']
+# Linhas da planilha de vendas convertidas de objetos Python para colunas por vez
+TAMANHO_BLOCO = 100_000
+
+# Limites do cache de planilhas processadas (compartilhado pelo processo)
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+CACHE_MAX_ITENS = 8
+# Segundos sem acesso após os quais uma sessão deixa de segurar seu dataset
+CACHE_MAX_OCIOSO = 30 * 60
+# Threads que leem as planilhas enviadas em segundo plano
+CARREGAMENTO_MAX_THREADS = 4
+# Probabilidade coberta pelo intervalo das projeções de fim de ano
+CONFIANCA_PROJECAO = 0.8
+
+
+class CacheLRU:
+    """Cache LRU limitado por memória e por número de itens, seguro entre threads."""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_itens=CACHE_MAX_ITENS):
+        self.max_bytes = max_bytes
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.remocoes = 0
+
+    def obter(self, chave):
+        """Retorna o valor guardado (ou None) e atualiza a ordem de uso."""
+        with self._lock:
+            if chave not in self._itens:
+                self.faltas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return self._itens[chave][0]
+
+    def guardar(self, chave, valor, tamanho):
+        """Guarda o valor e remove os itens menos usados até caber nos limites."""
+        with self._lock:
+            if chave in self._itens:
+                self._bytes -= self._itens.pop(chave)[1]
+            self._itens[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            # O item recém-guardado nunca é removido, mesmo que sozinho passe do limite
+            for antiga in list(self._itens):
+                if self._bytes <= self.max_bytes and len(self._itens) <= self.max_itens:
+                    break
+                if antiga != chave and not self._em_uso(antiga):
+                    self._remover(antiga)
+
+    def _em_uso(self, chave):
+        """Indica se o item está protegido da remoção por LRU (nunca, aqui)."""
+        return False
+
+    def _remover(self, chave):
+        self._bytes -= self._itens.pop(chave)[1]
+        self.remocoes += 1
+
+    def limpar(self):
+        """Remove todos os itens, mantendo as estatísticas."""
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        """Retorna acertos, faltas, remoções, itens e bytes ocupados."""
+        with self._lock:
+            return {
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'remocoes': self.remocoes,
+                'itens': len(self._itens),
+                'bytes': self._bytes,
+            }
+
+
+class RegistroDatasets(CacheLRU):
+    """Datasets compartilhados por todas as sessões do processo, com referências.
+
+    Cada sessão referencia o último dataset que carregou. Datasets com
+    alguma sessão ativa não são removidos pelo LRU (os limites podem ser
+    ultrapassados enquanto estiverem em uso); os demais saem pelo LRU ou
+    depois de `max_ocioso` segundos sem acesso. Uma sessão que não acessa
+    o registro há mais de `max_ocioso` segundos perde sua referência, já
+    que o Streamlit não avisa quando a aba do navegador é fechada.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_itens=CACHE_MAX_ITENS,
+                 max_ocioso=CACHE_MAX_OCIOSO, relogio=time.monotonic):
+        super().__init__(max_bytes, max_itens)
+        self.max_ocioso = max_ocioso
+        self._relogio = relogio
+        self._sessoes = {}
+        self._referencias = Counter()
+        self._ultimo_uso = {}
+
+    def obter(self, chave, sessao=None):
+        """Retorna o dataset (ou None) e passa a referenciá-lo pela sessão."""
+        with self._lock:
+            self._remover_ociosos()
+            valor = super().obter(chave)
+            if valor is not None:
+                self._referenciar(chave, sessao)
+            return valor
+
+    def referenciar(self, chave, sessao):
+        """Passa a referenciar o dataset pela sessão sem contar acerto ou falta; retorna se ele existe."""
+        with self._lock:
+            if chave not in self._itens:
+                return False
+            self._itens.move_to_end(chave)
+            self._referenciar(chave, sessao)
+            return True
+
+    def guardar(self, chave, valor, tamanho, sessao=None):
+        """Guarda o dataset já referenciado pela sessão e aplica os limites."""
+        with self._lock:
+            self._referenciar(chave, sessao)
+            super().guardar(chave, valor, tamanho)
+
+    def liberar(self, sessao):
+        """Solta a referência da sessão; o dataset fica sujeito ao LRU e à ociosidade."""
+        with self._lock:
+            if sessao in self._sessoes:
+                self._referencias[self._sessoes.pop(sessao)[0]] -= 1
+            self._remover_ociosos()
+
+    def _referenciar(self, chave, sessao):
+        agora = self._relogio()
+        self._ultimo_uso[chave] = agora
+        if sessao is None:
+            return
+        anterior = self._sessoes.get(sessao)
+        if anterior is None or anterior[0] != chave:
+            if anterior is not None:
+                self._referencias[anterior[0]] -= 1
+            self._referencias[chave] += 1
+        self._sessoes[sessao] = (chave, agora)
+
+    def _remover_ociosos(self):
+        agora = self._relogio()
+        for sessao, (chave, instante) in list(self._sessoes.items()):
+            if agora - instante > self.max_ocioso:
+                del self._sessoes[sessao]
+                self._referencias[chave] -= 1
+        for chave in list(self._itens):
+            if not self._em_uso(chave) and agora - self._ultimo_uso.get(chave, agora) > self.max_ocioso:
+                self._remover(chave)
+
+    def _em_uso(self, chave):
+        return self._referencias[chave] > 0
+
+    def _remover(self, chave):
+        super()._remover(chave)
+        self._ultimo_uso.pop(chave, None)
+
+    def limpar(self):
+        """Remove todos os datasets e referências, mantendo as estatísticas."""
+        with self._lock:
+            super().limpar()
+            self._sessoes.clear()
+            self._referencias.clear()
+            self._ultimo_uso.clear()
+
+    def estatisticas(self):
+        """Inclui nas estatísticas as sessões ativas e os datasets em uso."""
+        with self._lock:
+            stats = super().estatisticas()
+            stats['sessoes'] = len(self._sessoes)
+            stats['em_uso'] = sum(1 for chave in self._itens if self._em_uso(chave))
+            return stats
+
+
+cache_dados = RegistroDatasets()
+
+# Estruturas derivadas já montadas, por id do DataFrame de vendas (removidas quando ele é coletado)
+_cubos = {}
+_indices_vendedores = {}
+_cubos_intervalo = {}
+# Por id do cubo, que pode ser o de um intervalo de datas
+_rankings = {}
+# Intervalos de datas com cubo guardado por dataset
+CUBOS_INTERVALO_MAX = 8
+# Intervalos de meses com resumo guardado por ranking
+RANKING_INTERVALOS_MAX = 16
+_insights = {}
+# Intervalos de meses com insights guardados por cubo
+INSIGHTS_INTERVALOS_MAX = 8
+
+
+def ler_bytes(arquivo):
+    """Lê o conteúdo de um upload do Streamlit, arquivo aberto ou caminho."""
+    if hasattr(arquivo, 'getvalue'):
+        return arquivo.getvalue()
+    if hasattr(arquivo, 'read'):
+        conteudo = arquivo.read()
+        arquivo.seek(0)
+        return conteudo
+    with open(arquivo, 'rb') as f:
+        return f.read()
+
+
+def hash_conteudo(*conteudos):
+    """Gera a chave do cache a partir do conteúdo (bytes) das planilhas."""
+    h = hashlib.sha256()
+    for conteudo in conteudos:
+        h.update(hashlib.sha256(conteudo).digest())
+    return h.hexdigest()
+
+
+def tamanho_em_memoria(*dfs):
+    """Soma a memória ocupada pelos DataFrames, incluindo strings."""
+    return int(sum(df.memory_usage(deep=True).sum() for df in dfs))
+
+
+def _abrir_planilha(arquivo):
+    return openpyxl.load_workbook(arquivo, read_only=True, data_only=True, keep_links=False)
+
+
+def _blocos_da_aba(ws, colunas, tamanho_bloco=None):
+    """Percorre a aba em streaming e gera DataFrames com só as colunas pedidas.
+
+    Cada bloco tem até `tamanho_bloco` linhas (sem limite se None); ao
+    menos um bloco, possivelmente vazio, é sempre gerado.
+    """
+    linhas = ws.iter_rows(values_only=True)
+    cabecalho = next(linhas, ())
+
+    posicoes = {}
+    for i, nome in enumerate(cabecalho):
+        if nome in colunas and nome not in posicoes:
+            posicoes[nome] = i
+    nomes = [c for c in colunas if c in posicoes]
+    indices = [posicoes[c] for c in nomes]
+    ultimo = max(indices, default=-1)
+
+    registros = []
+    gerou = False
+    for linha in linhas:
+        if len(linha) <= ultimo:
+            linha = linha + (None,) * (ultimo + 1 - len(linha))
+        valores = tuple(linha[i] for i in indices)
+        if any(v is not None for v in valores):
+            registros.append(valores)
+            if tamanho_bloco is not None and len(registros) >= tamanho_bloco:
+                yield pd.DataFrame.from_records(registros, columns=nomes)
+                registros = []
+                gerou = True
+
+    if registros or not gerou:
+        yield pd.DataFrame.from_records(registros, columns=nomes)
+
+
+def ler_abas(arquivo, abas):
+    """Lê várias abas de uma planilha abrindo o arquivo uma única vez.
+
+    `abas` mapeia o nome (ou o índice) de cada aba para as colunas desejadas;
+    colunas ausentes na planilha são ignoradas. O openpyxl é usado em modo
+    somente leitura, que percorre o XML em streaming, e só as colunas pedidas
+    são copiadas para o DataFrame.
+    """
+    wb = _abrir_planilha(arquivo)
+    try:
+        resultado = {}
+        for aba, colunas in abas.items():
+            ws = wb.worksheets[aba] if isinstance(aba, int) else wb[aba]
+            resultado[aba], = _blocos_da_aba(ws, colunas)
+        return resultado
+    finally:
+        wb.close()
+
+
+def ler_aba_em_blocos(arquivo, aba, colunas, tamanho_bloco=TAMANHO_BLOCO, progresso=None):
+    """Gera a aba em DataFrames de até `tamanho_bloco` linhas, como `ler_abas`.
+
+    `progresso`, se dado, é chamado após cada bloco com a fração das
+    linhas da aba já lidas (estimada pela dimensão gravada na planilha).
+    """
+    wb = _abrir_planilha(arquivo)
+    try:
+        ws = wb.worksheets[aba] if isinstance(aba, int) else wb[aba]
+        total = (ws.max_row or 0) - 1
+        lidas = 0
+        for bloco in _blocos_da_aba(ws, colunas, tamanho_bloco):
+            lidas += len(bloco)
+            if progresso is not None and total > 0:
+                progresso(min(lidas / total, 1.0))
+            yield bloco
+    finally:
+        wb.close()
+
+
+def periodo(anos, meses):
+    """Chave de período (ano * 100 + mês) de anos e meses escalares ou vetores."""
+    return anos * 100 + meses
+
+
+def rotular_periodos(periodos):
+    """Rótulos curtos dos períodos: 'Jan' se forem todos do mesmo ano, 'Jan/25' se não."""
+    periodos = pd.Series(periodos)
+    rotulos = (periodos % 100).map(MESES_ABREV)
+    anos = periodos // 100
+    if anos.nunique() > 1:
+        rotulos = rotulos + '/' + (anos % 100).map('{:02d}'.format)
+    return rotulos.to_numpy()
+
+
+def tipar_vendas(df_vendas):
+    """Converte as colunas de vendas e descarta linhas sem data de emissão válida."""
+    df_vendas[COL_EMISSAO] = pd.to_datetime(df_vendas[COL_EMISSAO], errors='coerce')
+    df_vendas = df_vendas.dropna(subset=[COL_EMISSAO]).reset_index(drop=True)
+    df_vendas[COL_VALOR] = pd.to_numeric(df_vendas[COL_VALOR], errors='coerce').astype('float64')
+    df_vendas[COL_VENDEDOR] = df_vendas[COL_VENDEDOR].astype('category')
+    df_vendas[COL_MES_NUM] = df_vendas[COL_EMISSAO].dt.month
+    df_vendas[COL_PERIODO] = periodo(df_vendas[COL_EMISSAO].dt.year, df_vendas[COL_MES_NUM])
+
+    return compactar_vendas(df_vendas)
+
+
+def processar_vendas(arq_vendas, tamanho_bloco=TAMANHO_BLOCO, formato='xlsx'):
+    """Lê e processa a primeira aba da planilha de vendas, com colunas tipadas."""
+    return processar_vendas_com_cubo(arq_vendas, tamanho_bloco, formato)[0]
+
+
+def processar_vendas_com_cubo(arq_vendas, tamanho_bloco=TAMANHO_BLOCO, formato='xlsx', progresso=None):
+    """Lê a aba de vendas em blocos, tipando cada um e somando-o ao cubo.
+
+    Só um bloco por vez existe como objetos Python; as linhas já lidas
+    ficam apenas nas colunas compactas. Retorna as vendas e o cubo
+    (vendedor × mês) acumulado durante a leitura, com as vendas já
+    ordenadas por EMISSÃO. Vendas em CSV ou Parquet são lidas de uma vez
+    pelo leitor colunar, já tipadas.
+    `progresso` recebe a fração lida, como em `ler_aba_em_blocos`.
+    """
+    if formato in formatos.FORMATOS_TABELA:
+        df_vendas = formatos.ler_tabela(ler_bytes(arq_vendas), formato, COLUNAS_VENDAS, TIPOS_VENDAS)
+        df_vendas = ordenar_vendas(tipar_vendas(df_vendas))
+        return df_vendas, montar_cubo(df_vendas)
+
+    blocos = []
+    cubo = None
+    for bloco in ler_aba_em_blocos(arq_vendas, 0, COLUNAS_VENDAS, tamanho_bloco, progresso):
+        bloco = tipar_vendas(bloco)
+        blocos.append(bloco)
+        cubo = montar_cubo(bloco) if cubo is None else somar_cubos(cubo, montar_cubo(bloco))
+
+    df_vendas = compactar_vendas(pd.concat(unificar_categorias(blocos), ignore_index=True))
+    return ordenar_vendas(df_vendas), cubo
+
+
+def ordenar_vendas(df_vendas):
+    """Ordena as vendas por EMISSÃO (estável), sem copiar se já estiverem em ordem.
+
+    O dataset fica sempre em ordem de emissão, para que filtros de datas
+    sejam recortes contíguos (ver `fatiar_datas`) e as vendas de cada
+    vendedor já saiam em ordem cronológica (ver `montar_indice_vendedores`).
+    """
+    if df_vendas[COL_EMISSAO].is_monotonic_increasing:
+        return df_vendas
+    ordem = np.argsort(df_vendas[COL_EMISSAO].to_numpy(), kind='stable')
+    return df_vendas.take(ordem).reset_index(drop=True)
+
+
+def unificar_categorias(dfs):
+    """Dá a todos os DataFrames as mesmas categorias de VENDEDOR, para concatená-los."""
+    categorias = pd.Index(sorted(set().union(*(df[COL_VENDEDOR].cat.categories for df in dfs))))
+    return [df.assign(**{COL_VENDEDOR: df[COL_VENDEDOR].cat.set_categories(categorias)}) for df in dfs]
+
+
+def compactar_vendas(df_vendas):
+    """Reduz os tipos das colunas de vendas ao menor que comporta os valores.
+
+    VENDEDOR vira categoria, Mes_Num int8, Periodo int32 e CONTAGEM o menor inteiro
+    possível (células vazias contam como zero, como já acontecia nas
+    somas). Altera e retorna o próprio DataFrame, sem cópias.
+    """
+    if df_vendas[COL_VENDEDOR].dtype != 'category':
+        df_vendas[COL_VENDEDOR] = df_vendas[COL_VENDEDOR].astype('category')
+    df_vendas[COL_MES_NUM] = df_vendas[COL_MES_NUM].astype('int8')
+    df_vendas[COL_PERIODO] = df_vendas[COL_PERIODO].astype('int32')
+    if COL_CONTAGEM in df_vendas:
+        contagem = pd.to_numeric(df_vendas[COL_CONTAGEM], errors='coerce').fillna(0)
+        df_vendas[COL_CONTAGEM] = pd.to_numeric(contagem, downcast='integer')
+    return df_vendas
+
+
+def relatorio_memoria(df):
+    """Tipo e memória ocupada (bytes, incluindo strings) de cada coluna e do índice."""
+    uso = df.memory_usage(deep=True)
+    tipos = df.dtypes.astype(str).reindex(uso.index, fill_value='índice')
+    return pd.DataFrame({'tipo': tipos, 'bytes': uso})
+
+
+def processar_metas(arq_metas, formato='xlsx'):
+    """Lê e processa as abas 'metas' e 'Planilha1' da planilha de metas.
+
+    No formato 'zip', as abas vêm como arquivos metas e Planilha1 (CSV ou
+    Parquet) dentro do .zip.
+    """
+    abas = {'metas': COLUNAS_METAS, 'Planilha1': COLUNAS_METAS_VENDEDORES}
+    if formato == 'zip':
+        abas = formatos.ler_tabelas_zip(ler_bytes(arq_metas), abas, TIPOS_METAS)
+    else:
+        abas = ler_abas(arq_metas, abas)
+    df_metas = abas['metas']
+    df_metas_vendedores = abas['Planilha1']  # Carregar dados individuais dos vendedores
+
+    df_metas[COL_MES_NUM] = df_metas['Mês'].map(MAPA_MESES)
+    _periodo_das_metas(df_metas)
+
+    df_metas = df_metas.rename(columns={
+        'Mensal': COL_META_INICIAL,
+        'Acumulado': COL_META_MENSAL
+    })
+    # Adicionar coluna Acumulado igual a Meta Mensal para compatibilidade
+    df_metas[COL_META_ACUMULADO] = df_metas[COL_META_MENSAL]
+
+    # Processar dados dos vendedores
+    df_metas_vendedores[COL_MES_NUM] = df_metas_vendedores['Mês'].map(MAPA_MESES)
+    _periodo_das_metas(df_metas_vendedores)
+
+    df_metas_vendedores = df_metas_vendedores.rename(columns={
+        'Meta Mensal Acumulada': COL_META_ACUMULADO
+    })
+
+    return df_metas, df_metas_vendedores
+
+
+def _periodo_das_metas(df_metas):
+    """Cria a coluna Periodo nas metas que informam o ano; as demais valem para todo ano."""
+    if COL_ANO in df_metas and df_metas[COL_ANO].notna().any():
+        df_metas[COL_PERIODO] = periodo(df_metas[COL_ANO], df_metas[COL_MES_NUM]).astype('Int32')
+    elif COL_ANO in df_metas:
+        del df_metas[COL_ANO]
+
+
+def chave_das_metas(df_metas):
+    """Coluna pela qual as metas se juntam às vendas: Periodo se tiverem ano, Mes_Num se não."""
+    return COL_PERIODO if COL_PERIODO in df_metas else COL_MES_NUM
+
+
+def _carregar_via_snapshot(conteudo, tabelas, processar, origem=None):
+    """Abre o snapshot colunar do arquivo ou processa o Excel e cria o snapshot."""
+    chave = hash_conteudo(conteudo)
+    dfs = snapshots.carregar(chave, tabelas)
+    if dfs is None:
+        dfs = processar(io.BytesIO(conteudo))
+        if isinstance(dfs, pd.DataFrame):
+            dfs = [dfs]
+        snapshots.salvar(chave, dict(zip(tabelas, dfs)), origem)
+    return dfs
+
+
+def _processar_vendas_para_snapshot(arq_vendas, formato='xlsx', progresso=None):
+    df_vendas, cubo = processar_vendas_com_cubo(arq_vendas, formato=formato, progresso=progresso)
+    return [df_vendas, cubo.reset_index()]
+
+
+def _abrir_vendas(tabela_vendas, tabela_cubo):
+    """Monta o dataset de vendas a partir das tabelas do snapshot, já com seu cubo."""
+    _guardar_derivado(_cubos, tabela_vendas, tabela_cubo.set_index([COL_VENDEDOR, COL_PERIODO]))
+    return tabela_vendas
+
+
+def listar_vendas_salvas():
+    """Lista os datasets de vendas gravados (chave, origem, linhas), do mais novo ao mais antigo."""
+    salvas = [
+        (info.get('criado_em', ''), info['tabelas']['vendas'], chave, info.get('origem'))
+        for chave, info in snapshots.listar().items()
+        if info.get('versao') == snapshots.VERSAO and 'vendas' in info.get('tabelas', {})
+    ]
+    salvas.sort(reverse=True)
+    return [(chave, origem, linhas) for _, linhas, chave, origem in salvas]
+
+
+class Carregamento:
+    """Leitura de um dataset em andamento nos threads de fundo.
+
+    Vendas e metas são lidas em paralelo; quando as duas terminam, o
+    dataset é guardado em `cache_dados`. `progresso` (de 0 a 1) e `etapa`
+    podem ser consultados a qualquer momento por outro thread.
+    """
+
+    def __init__(self, chave, dados=None):
+        self.chave = chave
+        self._partes = {}
+        self._dados = dados
+        self._erro = None
+        self._em_fundo = dados is None
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self._pronto = threading.Event()
+        if dados is not None:
+            self._pronto.set()
+
+    @property
+    def progresso(self):
+        """Fração concluída, média das partes (vendas e metas)."""
+        if self._pronto.is_set():
+            return 1.0
+        with self._lock:
+            fracoes = [fracao for fracao, _ in self._partes.values()]
+        return sum(fracoes) / len(fracoes) if fracoes else 0.0
+
+    @property
+    def etapa(self):
+        """Descrição da primeira parte ainda não concluída."""
+        with self._lock:
+            pendentes = [etapa for fracao, etapa in self._partes.values() if fracao < 1.0]
+        return pendentes[0] if pendentes else 'Finalizando'
+
+    def concluido(self):
+        """Indica se a leitura terminou, com sucesso ou com erro."""
+        return self._pronto.is_set()
+
+    def resultado(self, sessao=None, timeout=None):
+        """Espera a leitura e retorna (vendas, metas, metas dos vendedores).
+
+        A sessão passa a referenciar o dataset no registro. Erros da
+        leitura são relançados aqui.
+        """
+        if not self._pronto.wait(timeout):
+            raise TimeoutError(f"Carregamento {self.chave} ainda em andamento")
+        if self._erro is not None:
+            raise self._erro
+        if self._em_fundo and sessao is not None:
+            cache_dados.referenciar(self.chave, sessao)
+        return self._dados
+
+    def _avancar(self, parte, fracao, etapa=None):
+        with self._lock:
+            self._partes[parte] = (fracao, etapa or self._partes[parte][1])
+
+    def _iniciar(self, tarefas):
+        """Submete as tarefas (parte -> função) ao pool de threads."""
+        self._partes = {parte: (0.0, 'Na fila') for parte in tarefas}
+        self._pendentes = len(tarefas)
+        self._futuros = {parte: _executor.submit(tarefa) for parte, tarefa in tarefas.items()}
+        for futuro in self._futuros.values():
+            futuro.add_done_callback(self._finalizar)
+
+    def _finalizar(self, _futuro):
+        with self._lock:
+            self._pendentes -= 1
+            if self._pendentes:
+                return
+        try:
+            df_metas, df_metas_vendedores = self._futuros['metas'].result()
+            dados = (self._futuros['vendas'].result(), df_metas, df_metas_vendedores)
+            cache_dados.guardar(self.chave, dados, tamanho_em_memoria(*dados))
+            self._dados = dados
+        except Exception as erro:
+            self._erro = erro
+        finally:
+            with _lock_carregamentos:
+                _carregamentos.pop(self.chave, None)
+            self._pronto.set()
+
+
+_executor = ThreadPoolExecutor(max_workers=CARREGAMENTO_MAX_THREADS, thread_name_prefix='carregamento')
+# Carregamentos em andamento, por chave do dataset, para que pedidos repetidos não leiam tudo de novo
+_carregamentos = {}
+_lock_carregamentos = threading.Lock()
+
+
+def iniciar_carregamento(arq_vendas, arq_metas, sessao=None, novas_vendas=(), chave_vendas=None):
+    """Começa a carregar planilhas de vendas e metas em segundo plano.
+
+    Retorna um `Carregamento`, já concluído se o dataset estiver no cache.
+    Enquanto um carregamento está em andamento, novos pedidos com os
+    mesmos arquivos (de qualquer sessão) recebem o mesmo objeto em vez de
+    ler as planilhas de novo. Os argumentos são os de
+    `carregar_e_processar_dados`.
+    """
+    bytes_metas = ler_bytes(arq_metas)
+    if chave_vendas is None:
+        bytes_vendas = ler_bytes(arq_vendas)
+        chave_vendas = hash_conteudo(bytes_vendas)
+    else:
+        bytes_vendas = None
+    bytes_novas = [ler_bytes(arq) for arq in novas_vendas]
+
+    # Cada lote novo encadeia a chave das vendas, como num log
+    chaves_vendas = [chave_vendas]
+    for conteudo in bytes_novas:
+        chaves_vendas.append(hash_conteudo(chaves_vendas[-1].encode(), conteudo))
+    chave = hash_conteudo(chaves_vendas[-1].encode(), bytes_metas)
+
+    with _lock_carregamentos:
+        # Um carregamento em andamento ainda não está no registro: consultá-lo contaria uma falta a cada rerun
+        if chave in _carregamentos:
+            return _carregamentos[chave]
+        dados = cache_dados.obter(chave, sessao)
+        if dados is not None:
+            return Carregamento(chave, dados)
+        carregamento = _carregamentos[chave] = Carregamento(chave)
+
+    def ler_vendas():
+        return _carregar_vendas(
+            chaves_vendas, bytes_vendas, bytes_novas, arq_vendas, novas_vendas,
+            progresso=functools.partial(carregamento._avancar, 'vendas')
+        )
+
+    def ler_metas():
+        carregamento._avancar('metas', 0.0, 'Lendo metas')
+        metas = _carregar_via_snapshot(
+            bytes_metas, ['metas', 'planilha1'],
+            functools.partial(processar_metas, formato=formatos.detectar_formato(arq_metas, bytes_metas)),
+            getattr(arq_metas, 'name', str(arq_metas))
+        )
+        carregamento._avancar('metas', 1.0)
+        return metas
+
+    carregamento._iniciar({'vendas': ler_vendas, 'metas': ler_metas})
+    return carregamento
+
+
+def carregar_e_processar_dados(arq_vendas, arq_metas, sessao=None, novas_vendas=(), chave_vendas=None):
+    """Carrega e processa planilhas de vendas e metas, reaproveitando o cache.
+
+    Vendas podem vir em .xlsx, CSV ou Parquet; metas em .xlsx ou num .zip
+    com as tabelas metas e Planilha1 em CSV ou Parquet.
+
+    A chave é o hash do conteúdo dos arquivos, então reruns com os mesmos
+    uploads não leem o Excel de novo e sessões que enviam as mesmas
+    planilhas recebem os mesmos DataFrames (e os agregados derivados
+    deles). `sessao` identifica quem segura a referência ao dataset no
+    registro. Fora do cache em memória, cada planilha já vista é aberta do
+    snapshot colunar em disco. Os DataFrames retornados são compartilhados
+    e não devem ser alterados no lugar.
+
+    Em vez do upload de vendas, `chave_vendas` pode indicar um dataset já
+    gravado (ver `listar_vendas_salvas`). Cada planilha de `novas_vendas`
+    é acrescentada às vendas com `anexar_vendas`, e o resultado é gravado
+    como um novo dataset.
+
+    Bloqueia até o fim da leitura; ver `iniciar_carregamento` para lê-las
+    em segundo plano.
+    """
+    return iniciar_carregamento(arq_vendas, arq_metas, sessao, novas_vendas, chave_vendas).resultado(sessao)
+
+
+def _carregar_vendas(chaves_vendas, bytes_vendas, bytes_novas, arq_vendas, novas_vendas, progresso=None):
+    """Abre as vendas (upload ou dataset gravado) e aplica os lotes novos ainda não gravados.
+
+    `progresso(fracao, etapa)` é chamado a cada bloco lido e a cada lote.
+    """
+    progresso = progresso or (lambda fracao, etapa=None: None)
+    # Parte do último dataset da cadeia que já está gravado
+    inicio = len(chaves_vendas) - 1
+    while inicio > 0 and not snapshots.existe(chaves_vendas[inicio], TABELAS_VENDAS):
+        inicio -= 1
+    etapas = 1 + len(bytes_novas) - inicio
+    progresso(0.0, 'Lendo vendas')
+    tabelas = snapshots.carregar(chaves_vendas[inicio], TABELAS_VENDAS)
+    if tabelas is None:
+        if bytes_vendas is None:
+            raise ValueError(f"Dataset de vendas {chaves_vendas[0]} não encontrado")
+        tabelas = _carregar_via_snapshot(
+            bytes_vendas, TABELAS_VENDAS,
+            functools.partial(
+                _processar_vendas_para_snapshot, formato=formatos.detectar_formato(arq_vendas, bytes_vendas),
+                progresso=lambda fracao: progresso(fracao / etapas)
+            ),
+            getattr(arq_vendas, 'name', str(arq_vendas))
+        )
+    df_vendas = _abrir_vendas(*tabelas)
+
+    origem = snapshots.listar().get(chaves_vendas[inicio], {}).get('origem')
+    for i in range(inicio, len(bytes_novas)):
+        arq = novas_vendas[i]
+        progresso((1 + i - inicio) / etapas, f"Anexando {getattr(arq, 'name', str(arq))}")
+        df_novas = processar_vendas(
+            io.BytesIO(bytes_novas[i]), formato=formatos.detectar_formato(arq, bytes_novas[i])
+        )
+        df_vendas, cubo, _ = anexar_vendas(df_vendas, obter_cubo(df_vendas), df_novas)
+        _guardar_derivado(_cubos, df_vendas, cubo)
+        origem = f"{origem} + {getattr(arq, 'name', str(arq))}"
+        snapshots.salvar(
+            chaves_vendas[i + 1],
+            {'vendas': df_vendas, 'cubo': cubo.reset_index()},
+            origem,
+            base=chaves_vendas[i]
+        )
+    progresso(1.0)
+    return df_vendas
+
+
+def remover_ja_existentes(df_base, df_novas):
+    """Descarta das vendas novas as que já estão no dataset.
+
+    As planilhas não têm número de nota, então uma venda é identificada
+    pelos valores de todas as suas colunas, e vendas idênticas são
+    contadas: se a base tem duas iguais e o lote traz três, só a terceira
+    é nova. Só as vendas da base a partir da primeira data do lote entram
+    na comparação (um recorte da base, que está ordenada por emissão).
+    """
+    if df_novas.empty:
+        return df_novas
+    colunas = [c for c in COLUNAS_VENDAS if c in df_novas.columns]
+
+    def numerar_repetidas(df):
+        df = df[colunas].astype({COL_VENDEDOR: object})
+        df['_ocorrencia'] = df.groupby(colunas, dropna=False, sort=False).cumcount()
+        return df
+
+    janela = fatiar_datas(df_base, inicio=df_novas[COL_EMISSAO].min())
+    cruzamento = numerar_repetidas(df_novas).merge(
+        numerar_repetidas(janela), how='left', on=colunas + ['_ocorrencia'], indicator=True
+    )
+    return df_novas[(cruzamento['_merge'] == 'left_only').to_numpy()]
+
+
+def anexar_vendas(df_base, cubo_base, df_novas):
+    """Acrescenta ao dataset as vendas novas que ainda não estão nele.
+
+    O cubo é atualizado somando só o cubo das vendas novas ao anterior.
+    Nenhum dos argumentos é alterado. Retorna o novo dataset, o novo cubo
+    e quantas vendas foram de fato acrescentadas.
+    """
+    df_novas = remover_ja_existentes(df_base, df_novas)
+    df_vendas = compactar_vendas(pd.concat(unificar_categorias([df_base, df_novas]), ignore_index=True))
+    df_vendas = ordenar_vendas(df_vendas)
+    cubo = somar_cubos(cubo_base, montar_cubo(df_novas))
+    return df_vendas, cubo, len(df_novas)
+
+
+def montar_cubo(df_vendas):
+    """Soma VALOR e CONTAGEM por (VENDEDOR, Periodo), ordenado pelo índice.
+
+    Vendas sem vendedor ficam numa linha com VENDEDOR nulo, para que os
+    totais por mês continuem iguais aos da planilha inteira.
+    """
+    return df_vendas.groupby(
+        [COL_VENDEDOR, COL_PERIODO], observed=True, dropna=False, sort=True
+    )[[COL_VALOR, COL_CONTAGEM]].sum()
+
+
+def somar_cubos(*cubos):
+    """Soma cubos (vendedor × mês) de partes disjuntas das vendas."""
+    return pd.concat(cubos).groupby(
+        level=[COL_VENDEDOR, COL_PERIODO], observed=True, dropna=False, sort=True
+    ).sum()
+
+
+def _guardar_derivado(cache, df_vendas, valor):
+    chave = id(df_vendas)
+    cache[chave] = valor
+    weakref.finalize(df_vendas, cache.pop, chave, None)
+
+
+def _derivado_do_dataset(cache, df_vendas, montar):
+    """Retorna a estrutura derivada do dataset, montando-a só na primeira vez."""
+    valor = cache.get(id(df_vendas))
+    if valor is None:
+        valor = montar(df_vendas)
+        _guardar_derivado(cache, df_vendas, valor)
+    return valor
+
+
+def obter_cubo(df_vendas):
+    """Retorna o cubo (vendedor × mês) do dataset, montando-o só na primeira vez."""
+    return _derivado_do_dataset(_cubos, df_vendas, montar_cubo)
+
+
+def fatiar_datas(df_vendas, inicio=None, fim=None):
+    """Vendas emitidas de `inicio` até o fim do dia `fim` (inclusive), como recorte sem cópia.
+
+    As posições são achadas por busca binária em EMISSÃO, já ordenada.
+    """
+    emissao = df_vendas[COL_EMISSAO]
+    de = 0 if inicio is None else emissao.searchsorted(pd.Timestamp(inicio), side='left')
+    ate = len(df_vendas) if fim is None else emissao.searchsorted(
+        pd.Timestamp(fim).normalize() + pd.Timedelta(days=1), side='left'
+    )
+    return df_vendas.iloc[de:ate]
+
+
+def obter_cubo_intervalo(df_vendas, inicio=None, fim=None):
+    """Cubo (vendedor × mês) só das vendas entre as datas `inicio` e `fim`.
+
+    Sem limites, é o cubo do dataset inteiro. Os cubos dos últimos
+    intervalos pedidos ficam guardados por dataset, então reruns com o
+    mesmo filtro não somam as vendas de novo.
+    """
+    if inicio is None and fim is None:
+        return obter_cubo(df_vendas)
+    cubos = _derivado_do_dataset(_cubos_intervalo, df_vendas, lambda df: OrderedDict())
+    chave = (inicio, fim)
+    if chave in cubos:
+        cubos.move_to_end(chave)
+    else:
+        cubos[chave] = montar_cubo(fatiar_datas(df_vendas, inicio, fim))
+        if len(cubos) > CUBOS_INTERVALO_MAX:
+            cubos.popitem(last=False)
+    return cubos[chave]
+
+
+def montar_indice_vendedores(df_vendas):
+    """Mapeia cada vendedor às posições de suas vendas, da mais recente à mais antiga.
+
+    As vendas já estão ordenadas por emissão, então basta agrupar as
+    posições (que saem em ordem crescente) e invertê-las, sem ordenar.
+    """
+    grupos = df_vendas.groupby(COL_VENDEDOR, observed=True, sort=False).indices
+    return {vendedor: posicoes[::-1] for vendedor, posicoes in grupos.items()}
+
+
+def posicoes_vendas(df_vendas, vendedor):
+    """Posições das vendas do vendedor no dataset, da mais recente à mais antiga.
+
+    O índice é montado uma vez por dataset para todos os vendedores.
+    """
+    indice = _derivado_do_dataset(_indices_vendedores, df_vendas, montar_indice_vendedores)
+    return indice.get(vendedor, np.empty(0, dtype=np.intp))
+
+
+def paginar_vendas(df_vendas, posicoes, pagina, tamanho_pagina, colunas=None):
+    """Retorna só as linhas de uma página (`pagina` começa em 1) das posições dadas."""
+    inicio = (pagina - 1) * tamanho_pagina
+    linhas = posicoes[inicio:inicio + tamanho_pagina]
+    if colunas is None:
+        return df_vendas.iloc[linhas]
+    return df_vendas.iloc[linhas, [df_vendas.columns.get_loc(c) for c in colunas]]
+
+
+def listar_vendedores(cubo):
+    """Lista em ordem alfabética os vendedores com vendas no cubo."""
+    return sorted(cubo.index.get_level_values(COL_VENDEDOR).dropna().unique())
+
+
+def listar_periodos(cubo):
+    """Lista em ordem os períodos (ano * 100 + mês) com vendas no cubo."""
+    return sorted(int(p) for p in cubo.index.get_level_values(COL_PERIODO).unique())
+
+
+def recortar_periodos(df, inicio=None, fim=None):
+    """Recorta as linhas de `inicio` a `fim` (inclusive) de um DataFrame indexado por Periodo ordenado.
+
+    Os limites são achados por busca binária no índice, sem varrer as linhas.
+    """
+    indice = df.index.get_level_values(COL_PERIODO) if isinstance(df.index, pd.MultiIndex) else df.index
+    de = 0 if inicio is None else indice.searchsorted(inicio, side='left')
+    ate = len(indice) if fim is None else indice.searchsorted(fim, side='right')
+    return df.iloc[de:ate]
+
+
+def agregar_por_mes(cubo, inicio=None, fim=None, vendedor=None):
+    """Retorna VALOR e CONTAGEM por período a partir do cubo, sem reler as vendas.
+
+    Sem vendedor, soma todos os vendedores de cada período; com vendedor,
+    faz um recorte do índice ordenado. `inicio` e `fim` (períodos,
+    inclusive) limitam o intervalo retornado. O resultado vem em ordem de
+    período, com o mês (Mes_Num) de cada um.
+    """
+    if vendedor is None:
+        parte = cubo.groupby(level=COL_PERIODO, sort=True).sum()
+    else:
+        try:
+            parte = cubo.xs(vendedor, level=COL_VENDEDOR)
+        except KeyError:
+            parte = cubo.iloc[0:0].droplevel(COL_VENDEDOR)
+
+    parte = recortar_periodos(parte, inicio, fim).reset_index()
+    parte.insert(1, COL_MES_NUM, (parte[COL_PERIODO] % 100).astype('int8'))
+    return parte
+
+
+def _juntar_metas(vendas, metas, chaves=()):
+    """Junta metas às vendas por período (metas com ano) ou por mês (metas sem ano)."""
+    chave = chave_das_metas(metas)
+    colunas = [*chaves, chave]
+    metas = metas.dropna(subset=[chave]).groupby(colunas)[
+        [c for c in (COL_META_INICIAL, COL_META_MENSAL, COL_META_ACUMULADO) if c in metas]
+    ].sum().reset_index()
+    if chave == COL_PERIODO:
+        metas[COL_PERIODO] = metas[COL_PERIODO].astype('int64')
+    else:
+        metas[COL_MES_NUM] = metas[COL_MES_NUM].astype('int64')
+        vendas = vendas.astype({COL_MES_NUM: 'int64'})
+    return pd.merge(vendas, metas, on=colunas, how='left')
+
+
+def consolidar_meses(cubo, df_metas, inicio=None, fim=None):
+    """Junta por período as vendas de todos os vendedores às metas gerais, como na visão geral."""
+    df_consolidado = _juntar_metas(agregar_por_mes(cubo, inicio, fim), df_metas).sort_values(COL_PERIODO)
+    df_consolidado[COL_NOME_MES] = rotular_periodos(df_consolidado[COL_PERIODO])
+    return df_consolidado
+
+
+def consolidar_vendedor(cubo, df_metas_vendedores, vendedor):
+    """Junta por período as vendas do vendedor às suas metas da Planilha1, como na análise individual."""
+    df_metas_vendedor = df_metas_vendedores[df_metas_vendedores[COL_VENDEDOR] == vendedor]
+    df_vendedor = _juntar_metas(
+        agregar_por_mes(cubo, vendedor=vendedor), df_metas_vendedor
+    ).sort_values(COL_PERIODO)
+    df_vendedor[COL_NOME_MES] = rotular_periodos(df_vendedor[COL_PERIODO])
+    return df_vendedor
+
+
+class RankingVendedores:
+    """Atingimento de todos os vendedores para qualquer intervalo de meses, sem reler as vendas.
+
+    Junta uma vez o cubo às metas da Planilha1 e guarda, por vendedor, as
+    somas acumuladas período a período de faturamento, pedidos e metas.
+    O total de um intervalo é a diferença de duas colunas dessas somas, e
+    o resumo ordenado de cada intervalo pedido fica guardado, então top-k,
+    bottom-k e percentis só leem o resumo já ordenado.
+    """
+
+    COLUNAS = [COL_VALOR, COL_CONTAGEM, COL_META_INICIAL, COL_META_MENSAL]
+
+    def __init__(self, cubo, df_metas_vendedores):
+        self.metas = df_metas_vendedores
+        self.vendedores = pd.Index(df_metas_vendedores[COL_VENDEDOR].dropna().unique(), name=COL_VENDEDOR)
+        self.periodos = np.asarray(listar_periodos(cubo), dtype='int64')
+        # Somas de colunas inteiras (ex.: CONTAGEM compactada) voltam a inteiro, sem o limite do tipo compacto
+        self._tipos = {
+            coluna: 'int64' if pd.api.types.is_integer_dtype(tipo) else 'float64'
+            for coluna, tipo in cubo[[COL_VALOR, COL_CONTAGEM]].dtypes.items()
+        }
+
+        vendas = cubo[[COL_VALOR, COL_CONTAGEM]].reset_index()
+        vendas[COL_VENDEDOR] = vendas[COL_VENDEDOR].astype(object)
+        vendas[COL_MES_NUM] = vendas[COL_PERIODO] % 100
+        base = _juntar_metas(vendas[vendas[COL_VENDEDOR].isin(self.vendedores)], df_metas_vendedores, [COL_VENDEDOR])
+
+        linhas = self.vendedores.get_indexer(base[COL_VENDEDOR])
+        colunas = self.periodos.searchsorted(base[COL_PERIODO].to_numpy()) + 1
+        # Coluna 0 zerada: a soma dos períodos [i, j) é acumulado[:, j] - acumulado[:, i]
+        self._acumulados = {}
+        for coluna in self.COLUNAS:
+            matriz = np.zeros((len(self.vendedores), len(self.periodos) + 1))
+            valores = base[coluna].to_numpy(dtype='float64', na_value=0.0) if coluna in base else 0.0
+            np.add.at(matriz, (linhas, colunas), valores)
+            self._acumulados[coluna] = matriz.cumsum(axis=1)
+        self._resumos = OrderedDict()
+
+    def _posicoes(self, inicio=None, fim=None):
+        de = 0 if inicio is None else int(self.periodos.searchsorted(inicio, side='left'))
+        ate = len(self.periodos) if fim is None else int(self.periodos.searchsorted(fim, side='right'))
+        return de, max(de, ate)
+
+    def _somar(self, de, ate):
+        return {coluna: acumulado[:, ate] - acumulado[:, de] for coluna, acumulado in self._acumulados.items()}
+
+    def resumo(self, inicio=None, fim=None):
+        """Resumo por vendedor dos períodos de `inicio` a `fim` (inclusive), do maior ao menor atingimento.
+
+        Para cada vendedor da Planilha1 soma faturamento, pedidos e metas
+        dos meses em que vendeu (como na análise individual) e calcula o
+        percentual das metas mensal e inicial, o ticket médio, o
+        crescimento do faturamento sobre o mesmo número de meses logo antes
+        do intervalo e o percentil do atingimento da meta mensal entre os
+        vendedores. Percentuais sem base positiva ficam nulos.
+        """
+        de, ate = self._posicoes(inicio, fim)
+        if (de, ate) in self._resumos:
+            self._resumos.move_to_end((de, ate))
+            return self._resumos[(de, ate)]
+
+        resumo = pd.DataFrame(self._somar(de, ate), index=self.vendedores).astype(self._tipos)
+        anterior = self._somar(de - (ate - de), de)[COL_VALOR] if de >= ate - de else np.full(len(resumo), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            resumo[COL_PERC_META_MENSAL] = (resumo[COL_VALOR] / resumo[COL_META_MENSAL] * 100).where(
+                resumo[COL_META_MENSAL] > 0
+            )
+            resumo[COL_PERC_META_INICIAL] = (resumo[COL_VALOR] / resumo[COL_META_INICIAL] * 100).where(
+                resumo[COL_META_INICIAL] > 0
+            )
+            resumo[COL_TICKET_MEDIO] = (resumo[COL_VALOR] / resumo[COL_CONTAGEM]).where(resumo[COL_CONTAGEM] > 0, 0.0)
+            crescimento = (resumo[COL_VALOR].to_numpy() / anterior - 1) * 100
+            resumo[COL_CRESCIMENTO] = np.where(anterior > 0, crescimento, np.nan)
+        resumo[COL_PERCENTIL] = resumo[COL_PERC_META_MENSAL].rank(pct=True) * 100
+
+        resumo = resumo.reset_index().sort_values(
+            [COL_PERC_META_MENSAL, COL_VALOR], ascending=False, na_position='last', kind='stable'
+        ).reset_index(drop=True)
+        self._resumos[(de, ate)] = resumo
+        if len(self._resumos) > RANKING_INTERVALOS_MAX:
+            self._resumos.popitem(last=False)
+        return resumo
+
+    def melhores(self, k, inicio=None, fim=None):
+        """Os `k` vendedores de maior atingimento da meta mensal no intervalo."""
+        resumo = self.resumo(inicio, fim)
+        return resumo[resumo[COL_PERC_META_MENSAL].notna()].head(k)
+
+    def piores(self, k, inicio=None, fim=None):
+        """Os `k` vendedores de menor atingimento da meta mensal no intervalo, do pior para o melhor."""
+        resumo = self.resumo(inicio, fim)
+        return resumo[resumo[COL_PERC_META_MENSAL].notna()].tail(k).iloc[::-1]
+
+    def percentil(self, p, inicio=None, fim=None):
+        """Atingimento da meta mensal no percentil `p` (0 a 100) dos vendedores com meta, ou None se não houver."""
+        atingimento = self.resumo(inicio, fim)[COL_PERC_META_MENSAL].dropna()
+        return float(np.percentile(atingimento, p)) if len(atingimento) else None
+
+
+def obter_ranking(cubo, df_metas_vendedores):
+    """Retorna o ranking do cubo com as metas dadas, montando-o só na primeira vez."""
+    ranking = _rankings.get(id(cubo))
+    if ranking is None or ranking.metas is not df_metas_vendedores:
+        ranking = RankingVendedores(cubo, df_metas_vendedores)
+        _guardar_derivado(_rankings, cubo, ranking)
+    return ranking
+
+
+def resumir_vendedores(cubo, df_metas_vendedores, inicio=None, fim=None):
+    """Calcula de uma vez o resumo da visão por vendedor para todos os vendedores.
+
+    É o `RankingVendedores.resumo` do cubo, ordenado do maior para o menor
+    atingimento da meta mensal.
+    """
+    return obter_ranking(cubo, df_metas_vendedores).resumo(inicio, fim)
+
+
+def _sequencias(mascara):
+    """Tamanho da sequência de True terminada em cada coluna, por linha (zero onde é False)."""
+    contagem = mascara.cumsum(axis=1)
+    return contagem - np.maximum.accumulate(np.where(mascara, 0, contagem), axis=1)
+
+
+def montar_insights(cubo, df_metas, df_metas_vendedores, inicio=None, fim=None):
+    """Indicadores dos insights da visão geral e de todos os vendedores, numa única passada matricial.
+
+    A primeira linha (ROTULO_GERAL) soma todos os vendedores contra as
+    metas gerais, como a visão geral; as demais são os vendedores da
+    Planilha1, com metas só dos meses em que venderam, como na análise
+    individual. Vendas e metas dos períodos de `inicio` a `fim` viram
+    matrizes (linhas × períodos), e cada indicador é uma operação sobre
+    elas: totais e atingimento, variação do último mês com vendas sobre o
+    anterior, melhor mês, maior queda entre meses seguidos com vendas e
+    sequências de meses com a meta mensal batida ou não.
+    """
+    periodos = np.asarray(listar_periodos(cubo), dtype='int64')
+    periodos = periodos[(periodos >= (inicio or 0)) & (periodos <= (fim or np.iinfo('int64').max))]
+    vendedores = pd.Index(df_metas_vendedores[COL_VENDEDOR].dropna().unique(), name=COL_VENDEDOR)
+    indice = pd.Index([ROTULO_GERAL, *vendedores], name=COL_VENDEDOR)
+    linhas = np.arange(len(indice))
+    if len(periodos):
+        vendas = cubo[[COL_VALOR]].reset_index()
+        vendas[COL_VENDEDOR] = vendas[COL_VENDEDOR].astype(object)
+        vendas[COL_CONTAGEM] = 1.0
+        valores = np.vstack([
+            _matriz_por_periodo(vendas, pd.Index([0]), periodos, COL_VALOR),
+            _matriz_por_periodo(vendas, vendedores, periodos, COL_VALOR, COL_VENDEDOR),
+        ])
+        presenca = np.vstack([
+            np.ones((1, len(periodos)), dtype=bool),
+            _matriz_por_periodo(vendas, vendedores, periodos, COL_CONTAGEM, COL_VENDEDOR) > 0,
+        ])
+        metas = np.vstack([
+            _metas_por_periodo(df_metas, periodos),
+            _metas_por_periodo(df_metas_vendedores, periodos, vendedores),
+        ]) * presenca
+        rotulos = np.asarray(rotular_periodos(periodos), dtype=object)
+    else:
+        # Sem meses no intervalo: uma coluna vazia mantém as contas abaixo sem casos especiais
+        valores, metas = np.zeros((len(linhas), 1)), np.zeros((len(linhas), 1))
+        presenca = np.zeros((len(linhas), 1), dtype=bool)
+        rotulos = np.array([None], dtype=object)
+
+    # Posição de cada mês com vendas (-1 nos demais), do último e do penúltimo deles
+    posicoes = np.where(presenca, np.arange(presenca.shape[1]), -1)
+    ultimo = posicoes.max(axis=1)
+    penultimo = np.where(posicoes == ultimo[:, None], -1, posicoes).max(axis=1)
+    valor_ultimo = valores[linhas, ultimo.clip(0)]
+    valor_penultimo = valores[linhas, penultimo.clip(0)]
+
+    # Queda de cada mês com vendas em relação ao mês com vendas anterior a ele
+    anterior = np.concatenate(
+        [np.full((len(linhas), 1), -1), np.maximum.accumulate(posicoes, axis=1)[:, :-1]], axis=1
+    )
+    valor_anterior = valores[linhas[:, None], anterior.clip(0)]
+    quedas = np.where(presenca & (anterior >= 0), valor_anterior - valores, -np.inf)
+    pior = quedas.argmax(axis=1)
+    maior_queda = quedas[linhas, pior]
+    houve_queda = maior_queda > 0
+    antes_queda = anterior[linhas, pior]
+
+    melhor = np.where(presenca, valores, -np.inf).argmax(axis=1)
+    com_meta = presenca & (metas > 0)
+    bateu = _sequencias(com_meta & (valores >= metas))
+    abaixo = _sequencias(com_meta & (valores < metas))
+
+    def rotular(posicoes, validas):
+        return np.where(validas, rotulos[posicoes.clip(0)], None)
+
+    total, meta = valores.sum(axis=1), metas.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            COL_VALOR: total,
+            COL_META_MENSAL: meta,
+            COL_PERC_META_MENSAL: np.where(meta > 0, total / meta * 100, np.nan),
+            'Meses': presenca.sum(axis=1),
+            'Mes_Ultimo': rotular(ultimo, ultimo >= 0),
+            'Mes_Penultimo': rotular(penultimo, penultimo >= 0),
+            'Variacao_Ultimo': np.where(
+                (penultimo >= 0) & (valor_penultimo > 0), (valor_ultimo / valor_penultimo - 1) * 100, np.nan
+            ),
+            'Melhor_Mes': rotular(melhor, ultimo >= 0),
+            'Melhor_Valor': np.where(ultimo >= 0, valores[linhas, melhor], np.nan),
+            'Mes_Antes_Queda': rotular(antes_queda, houve_queda),
+            'Mes_Maior_Queda': rotular(pior, houve_queda),
+            'Maior_Queda': np.where(houve_queda, maior_queda, np.nan),
+            'Maior_Queda_Perc': np.where(
+                houve_queda, maior_queda / valores[linhas, antes_queda.clip(0)] * 100, np.nan
+            ),
+            'Sequencia_Meta': bateu[linhas, ultimo.clip(0)],
+            'Maior_Sequencia_Meta': bateu.max(axis=1),
+            'Sequencia_Abaixo': abaixo[linhas, ultimo.clip(0)],
+        }, index=indice)
+
+
+def obter_insights(cubo, df_metas, df_metas_vendedores, inicio=None, fim=None):
+    """Retorna os indicadores de `montar_insights`, guardados por cubo, metas e intervalo."""
+    guardados = _derivado_do_dataset(_insights, cubo, lambda c: OrderedDict())
+    chave = (inicio, fim)
+    guardado = guardados.get(chave)
+    if guardado is None or guardado[0] is not df_metas or guardado[1] is not df_metas_vendedores:
+        guardado = (df_metas, df_metas_vendedores, montar_insights(cubo, df_metas, df_metas_vendedores, inicio, fim))
+        guardados[chave] = guardado
+        if len(guardados) > INSIGHTS_INTERVALOS_MAX:
+            guardados.popitem(last=False)
+    guardados.move_to_end(chave)
+    return guardado[2]
+
+
+def _matriz_por_periodo(tabela, linhas, periodos, coluna, chave=None):
+    """Distribui `coluna` da tabela (com Periodo) numa matriz (linhas × períodos), somando repetidos.
+
+    Linhas da tabela fora de `linhas` (pela coluna `chave`) ou de
+    `periodos` (ordenados) são ignoradas; sem `chave`, tudo vai para a
+    primeira linha.
+    """
+    matriz = np.zeros((len(linhas), len(periodos)))
+    periodos_tabela = tabela[COL_PERIODO].to_numpy(dtype='int64')
+    colunas = np.searchsorted(periodos, periodos_tabela).clip(max=max(len(periodos) - 1, 0))
+    posicoes = linhas.get_indexer(tabela[chave]) if chave is not None else np.zeros(len(tabela), dtype=np.intp)
+    validas = (posicoes >= 0) & (len(periodos) > 0) & (np.asarray(periodos)[colunas] == periodos_tabela)
+    np.add.at(
+        matriz,
+        (posicoes[validas], colunas[validas]),
+        tabela[coluna].to_numpy(dtype='float64', na_value=0.0)[validas],
+    )
+    return matriz
+
+
+def _metas_por_periodo(df_metas, periodos, linhas=None):
+    """Meta Mensal de cada período numa matriz (linhas × períodos), por vendedor se `linhas` for dado."""
+    periodos = np.asarray(periodos, dtype='int64')
+    meses = pd.DataFrame({COL_PERIODO: periodos, COL_MES_NUM: periodos % 100})
+    if linhas is None:
+        return _matriz_por_periodo(_juntar_metas(meses, df_metas), pd.Index([0]), periodos, COL_META_MENSAL)
+    grade = pd.merge(pd.DataFrame({COL_VENDEDOR: linhas}), meses, how='cross')
+    return _matriz_por_periodo(
+        _juntar_metas(grade, df_metas, [COL_VENDEDOR]), linhas, periodos, COL_META_MENSAL, COL_VENDEDOR
+    )
+
+
+def indice_sazonal(cubo, ano, metas_ano=None):
+    """Peso de cada mês do ano (média 1) para distribuir a projeção.
+
+    Vem da participação média de cada mês nos anos completos anteriores a
+    `ano` no cubo (todos os vendedores juntos). Sem histórico, usa o
+    perfil das metas mensais do ano (`metas_ano`, 12 valores) se todos os
+    meses tiverem meta positiva; com metas só de parte do ano (ex.: até
+    junho), os meses sem meta ficariam com peso zero e projeção nula, então
+    os pesos são iguais.
+    """
+    totais = cubo.groupby(level=COL_PERIODO)[COL_VALOR].sum()
+    historico = pd.DataFrame({'ano': totais.index // 100, 'mes': totais.index % 100, 'valor': totais.to_numpy()})
+    historico = historico[historico['ano'] < ano].pivot(index='ano', columns='mes', values='valor')
+    historico = historico.reindex(columns=range(1, 13)).dropna()
+    historico = historico[historico.sum(axis=1) > 0]
+    if len(historico):
+        participacao = historico.to_numpy() / historico.to_numpy().sum(axis=1, keepdims=True)
+        return participacao.mean(axis=0) * 12
+    if metas_ano is not None:
+        metas_ano = np.asarray(metas_ano, dtype='float64')
+        if len(metas_ano) == 12 and np.all(metas_ano > 0):
+            return metas_ano / metas_ano.mean()
+    return np.ones(12)
+
+
+def _cdf_normal(z):
+    """Distribuição normal padrão acumulada de um array, sem laço em Python.
+
+    Usa a aproximação de Chebyshev de erfc (Numerical Recipes), com erro
+    relativo abaixo de 1,2e-7, suficiente para probabilidades em %.
+    """
+    x = np.abs(np.asarray(z, dtype='float64')) / np.sqrt(2)
+    t = 1 / (1 + 0.5 * x)
+    polinomio = -1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277))))
+    ))))
+    with np.errstate(invalid='ignore', over='ignore'):
+        cauda = 0.5 * t * np.exp(-x * x + polinomio)
+    return np.where(np.asarray(z) >= 0, 1 - cauda, cauda)
+
+
+def _projetar(valores, metas, sazonal, mes_atual, fracao, confianca):
+    """Projeta até dezembro as linhas da matriz (linhas × 12) de vendas do ano, todas de uma vez.
+
+    Os meses antes de `mes_atual` estão fechados e `fracao` do mês atual
+    já passou. O modelo sazonal estima o nível de cada linha pelo
+    realizado dividido pelos pesos sazonais já decorridos e projeta o
+    restante com os pesos dos meses que faltam; o de ritmo supõe a mesma
+    venda por mês até o fim do ano. O intervalo usa a dispersão dos meses
+    fechados dessazonalizados, como se fossem independentes e normais,
+    somando a incerteza de cada mês futuro à do nível estimado.
+    """
+    meses = np.arange(1, 13)
+    decorrido = np.where(meses < mes_atual, 1.0, np.where(meses == mes_atual, fracao, 0.0))
+    restante = 1.0 - decorrido
+    peso_decorrido = (sazonal * decorrido).sum()
+    peso_restante = sazonal * restante
+
+    realizado = valores.sum(axis=1)
+    nivel = realizado / peso_decorrido if peso_decorrido > 0 else np.zeros(len(valores))
+    projecao_mensal = valores + nivel[:, None] * peso_restante
+
+    fechados = (decorrido == 1.0) & (sazonal > 0)
+    n = int(fechados.sum())
+    if n >= 2:
+        desvio = (valores[:, fechados] / sazonal[fechados]).std(axis=1, ddof=1)
+    else:
+        desvio = np.full(len(valores), np.nan)
+    # Variância acumulada mês a mês: meses futuros independentes mais o erro do nível (desvio² / n)
+    variancia = (desvio[:, None] ** 2) * (
+        np.cumsum(peso_restante ** 2)[None, :] + np.cumsum(peso_restante)[None, :] ** 2 / max(n, 1)
+    )
+    z = NormalDist().inv_cdf(0.5 + confianca / 2)
+    acumulado = projecao_mensal.cumsum(axis=1)
+    margem = z * np.sqrt(variancia)
+    realizado_acum = valores.cumsum(axis=1)
+    minimo = np.maximum(acumulado - margem, realizado_acum)
+    maximo = acumulado + margem
+
+    meses_decorridos = decorrido.sum()
+    ritmo = realizado + (realizado / meses_decorridos * (12 - meses_decorridos) if meses_decorridos > 0 else 0.0)
+
+    meta_anual = metas.sum(axis=1)
+    desvio_final = np.sqrt(variancia[:, -1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_meta = (acumulado[:, -1] - meta_anual) / desvio_final
+    probabilidade = np.where(
+        desvio_final > 0,
+        _cdf_normal(z_meta),
+        (acumulado[:, -1] >= meta_anual).astype(float),
+    )
+    return {
+        'mensal': projecao_mensal, 'acumulado': acumulado, 'minimo': minimo, 'maximo': maximo,
+        'realizado': realizado, 'ritmo': ritmo, 'meta_anual': meta_anual, 'probabilidade': probabilidade,
+    }
+
+
+def _referencia_projecao(cubo, ano, data_corte):
+    """Ano projetado, mês atual e fração dele já decorrida (pela data da última venda, se dada)."""
+    periodos = listar_periodos(cubo)
+    if ano is None:
+        ano = periodos[-1] // 100 if periodos else pd.Timestamp.today().year
+    do_ano = [p for p in periodos if p // 100 == ano]
+    mes_atual = do_ano[-1] % 100 if do_ano else 1
+    fracao = 1.0 if do_ano else 0.0
+    if data_corte is not None:
+        data_corte = pd.Timestamp(data_corte)
+        if data_corte.year == ano and data_corte.month == mes_atual:
+            fracao = data_corte.day / data_corte.days_in_month
+    return ano, mes_atual, fracao
+
+
+def projetar_vendedores(cubo, df_metas_vendedores, ano=None, data_corte=None, confianca=CONFIANCA_PROJECAO):
+    """Projeção de fim de ano de todos os vendedores da Planilha1, numa única conta matricial.
+
+    `ano` é o último ano com vendas se omitido; `data_corte` (a data da
+    última venda) indica quanto do mês atual já passou. Retorna por
+    vendedor o realizado no ano, a projeção sazonal com seu intervalo de
+    `confianca`, a projeção pelo ritmo, a meta anual (soma das Metas
+    Mensais do ano), o atingimento projetado e a chance estimada de bater
+    a meta, da maior para a menor chance.
+    """
+    ano, mes_atual, fracao = _referencia_projecao(cubo, ano, data_corte)
+    vendedores = pd.Index(df_metas_vendedores[COL_VENDEDOR].dropna().unique(), name=COL_VENDEDOR)
+    meses = periodo(ano, np.arange(1, 13))
+    vendas = cubo[[COL_VALOR]].reset_index()
+    valores = _matriz_por_periodo(vendas, vendedores, meses, COL_VALOR, COL_VENDEDOR)
+    metas = _metas_por_periodo(df_metas_vendedores, meses, vendedores)
+    projecao = _projetar(valores, metas, indice_sazonal(cubo, ano, metas.sum(axis=0)), mes_atual, fracao, confianca)
+
+    resultado = pd.DataFrame({
+        COL_VENDEDOR: vendedores,
+        COL_VALOR: projecao['realizado'],
+        COL_PROJECAO: projecao['acumulado'][:, -1],
+        COL_PROJECAO_MIN: projecao['minimo'][:, -1],
+        COL_PROJECAO_MAX: projecao['maximo'][:, -1],
+        COL_PROJECAO_RITMO: projecao['ritmo'],
+        COL_META_ANUAL: projecao['meta_anual'],
+        COL_PROB_META: projecao['probabilidade'] * 100,
+    })
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resultado[COL_PERC_PROJECAO] = (resultado[COL_PROJECAO] / resultado[COL_META_ANUAL] * 100).where(
+            resultado[COL_META_ANUAL] > 0
+        )
+    return resultado.sort_values(
+        [COL_PROB_META, COL_PERC_PROJECAO], ascending=False, na_position='last', kind='stable'
+    ).reset_index(drop=True)
+
+
+def projetar_geral(cubo, df_metas, ano=None, data_corte=None, confianca=CONFIANCA_PROJECAO):
+    """Projeção mês a mês do ano para todos os vendedores juntos, contra as metas gerais.
+
+    Usa o mesmo modelo de `projetar_vendedores`. Retorna uma linha por
+    mês com o realizado (nulo nos meses futuros), a projeção do mês, o
+    acumulado projetado com seu intervalo e a meta mensal e acumulada;
+    a chance de bater a meta anual e a projeção pelo ritmo vão em `attrs`.
+    """
+    ano, mes_atual, fracao = _referencia_projecao(cubo, ano, data_corte)
+    totais = cubo.groupby(level=COL_PERIODO)[[COL_VALOR]].sum().reset_index()
+    valores = _matriz_por_periodo(totais, pd.Index([0]), periodo(ano, np.arange(1, 13)), COL_VALOR)
+    metas = _metas_por_periodo(df_metas, periodo(ano, np.arange(1, 13)))
+    projecao = _projetar(valores, metas, indice_sazonal(cubo, ano, metas[0]), mes_atual, fracao, confianca)
+
+    meses = np.arange(1, 13)
+    resultado = pd.DataFrame({
+        COL_PERIODO: periodo(ano, meses),
+        COL_MES_NUM: meses,
+        COL_VALOR: np.where(meses <= mes_atual, valores[0], np.nan),
+        COL_PROJECAO: projecao['mensal'][0],
+        COL_PROJECAO_ACUM: projecao['acumulado'][0],
+        COL_PROJECAO_MIN: projecao['minimo'][0],
+        COL_PROJECAO_MAX: projecao['maximo'][0],
+        COL_META_MENSAL: metas[0],
+        COL_META_ACUM: metas[0].cumsum(),
+    })
+    resultado[COL_NOME_MES] = rotular_periodos(resultado[COL_PERIODO])
+    resultado.attrs.update(
+        mes_atual=mes_atual, fracao=fracao, confianca=confianca,
+        probabilidade=float(projecao['probabilidade'][0] * 100), ritmo=float(projecao['ritmo'][0]),
+    )
+    return resultado
+
+
+def ritmo_diario(df_vendas, df_metas, inicio, fim, vendedor=None, frequencia='D'):
+    """Vendas por dia (ou semana) entre as datas, comparadas à meta mensal proporcional.
+
+    A Meta Mensal de cada mês é dividida igualmente pelos dias do mês, e
+    cada linha traz o realizado e essa meta no dia, mais os dois
+    acumulados desde `inicio`. Dias sem venda entram com zero. Com
+    `vendedor`, usa só as vendas dele e `df_metas` deve ser a Planilha1.
+    `frequencia` 'W' soma por semana (terminando no domingo).
+    """
+    dias = pd.date_range(pd.Timestamp(inicio).normalize(), pd.Timestamp(fim).normalize(), freq='D', name=COL_DATA)
+    fatia = fatiar_datas(df_vendas, inicio, fim)
+    if vendedor is not None:
+        fatia = fatia[fatia[COL_VENDEDOR] == vendedor]
+        df_metas = df_metas[df_metas[COL_VENDEDOR] == vendedor]
+
+    ritmo = fatia.groupby(fatia[COL_EMISSAO].dt.normalize().rename(COL_DATA))[
+        [COL_VALOR, COL_CONTAGEM]
+    ].sum().reindex(dias, fill_value=0)
+
+    periodos = pd.Series(periodo(dias.year, dias.month), index=dias)
+    meses = pd.DataFrame({COL_PERIODO: periodos.unique()})
+    meses[COL_MES_NUM] = meses[COL_PERIODO] % 100
+    meta_mes = _juntar_metas(meses, df_metas).set_index(COL_PERIODO)[COL_META_MENSAL]
+    ritmo[COL_META_MENSAL] = periodos.map(meta_mes).fillna(0).to_numpy() / dias.days_in_month
+
+    if frequencia == 'W':
+        ritmo = ritmo.resample('W-SUN').sum()
+    ritmo[COL_REALIZADO_ACUM] = ritmo[COL_VALOR].cumsum()
+    ritmo[COL_META_ACUM] = ritmo[COL_META_MENSAL].cumsum()
+    return ritmo.reset_index()
+
+
+def datas_dos_periodos(inicio, fim):
+    """Primeiro dia do período `inicio` e último dia do período `fim`."""
+    primeiro = pd.Timestamp(year=inicio // 100, month=inicio % 100, day=1)
+    ultimo = pd.Timestamp(year=fim // 100, month=fim % 100, day=1) + pd.offsets.MonthEnd(0)
+    return primeiro.date(), ultimo.date()
@@ -1,8 +1,31 @@
-import pandas as pd
 import streamlit as st
-import plotly.graph_objects as go
+import math
+import time
+import uuid
+import medicao
 from datetime import datetime
 
+from dados import (
+    COL_EMISSAO, COL_VALOR, COL_CONTAGEM, COL_VENDEDOR,
+    COL_META_INICIAL, COL_META_MENSAL, COL_META_ACUMULADO,
+    COL_PERIODO, COL_PERC_META_MENSAL, COL_PERC_META_INICIAL, COL_TICKET_MEDIO, COL_CRESCIMENTO, COL_PERCENTIL,
+    COL_META_ACUM, COL_META_ANUAL, COL_PROJECAO, COL_PROJECAO_ACUM, COL_PROJECAO_MIN, COL_PROJECAO_MAX,
+    COL_PROJECAO_RITMO, COL_PERC_PROJECAO, COL_PROB_META,
+    cache_dados, iniciar_carregamento, listar_vendas_salvas, relatorio_memoria, tamanho_em_memoria,
+    obter_cubo, obter_cubo_intervalo, listar_periodos, listar_vendedores, consolidar_meses, consolidar_vendedor,
+    posicoes_vendas, paginar_vendas, obter_ranking, ritmo_diario, datas_dos_periodos,
+    projetar_geral, projetar_vendedores, obter_insights, ROTULO_GERAL
+)
+from figuras import cache_figuras
+from medicao import etapa
+from formatacao import formatar_moeda, formatar_moeda_serie
+from graficos import (
+    COLORS,
+    criar_pizza_atingimento, criar_pizza_distribuicao, criar_grafico_barras, criar_grafico_cumulativo,
+    criar_grafico_barras_acumulado, criar_heatmap_faturamento, criar_histograma_faturamento, criar_grafico_ritmo,
+    criar_grafico_projecao, gerar_insights
+)
+
 st.set_page_config(
     page_title="Dashboard de Metas",
     layout="wide",
@@ -10,30 +33,20 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-COLORS = {
-    'primary': '#2563eb',
-    'success': '#10b981',
-    'warning': '#f59e0b',
-    'danger': '#ef4444',
-    'info': '#3b82f6',
-    'neutral': '#64748b',
-    'bg_light': '#f8fafc',
-    'card_bg': '#ffffff',
-    'text_dark': '#0f172a',
-    'text_muted': '#64748b',
-    'border': '#e2e8f0'
-}
+# Identifica esta sessão no registro de datasets compartilhado pelo processo
+if 'sessao_id' not in st.session_state:
+    st.session_state.sessao_id = uuid.uuid4().hex
+
+# Tempo e memória de cada etapa deste rerun, para o painel de desempenho e o log estruturado
+medicao.iniciar(st.session_state.sessao_id)
+
 
-COL_EMISSAO = 'EMISSÃO'
-COL_VALOR = 'VALOR'
-COL_CONTAGEM = 'CONTAGEM'
-COL_VENDEDOR = 'VENDEDOR'
-COL_META_INICIAL = 'Meta Inicial'
-COL_META_MENSAL = 'Meta Mensal'
-COL_META_ACUMULADO = 'Acumulado'
-COL_MES = 'MÊS'
-COL_MES_NUM = 'Mes_Num'
-COL_NOME_MES = 'Nome_Mes'
+# Segundos entre atualizações da barra de progresso durante a leitura das planilhas
+INTERVALO_PROGRESSO = 0.25
+TAMANHOS_PAGINA = [25, 50, 100, 500]
+VISAO_GERAL = "📊 Visão Geral"
+VISAO_VENDEDOR = "👤 Por Vendedor"
+VISAO_RANKING = "🏆 Ranking de Vendedores"
 
 st.markdown(f"""
 <style>
@@ -96,7 +109,7 @@ st.markdown(f"""
         color: {COLORS['text_dark']};
     }}
     
-    .stTabs [data-baseweb="tab-list"] {{
+    .st-key-visao_ativa [role="radiogroup"] {{
         gap: 8px;
         background: white;
         padding: 0.5rem;
@@ -104,15 +117,14 @@ st.markdown(f"""
         box-shadow: 0 1px 3px rgba(0,0,0,0.05);
     }}
     
-    .stTabs [data-baseweb="tab"] {{
-        height: 50px;
-        padding: 0 1.5rem;
+    .st-key-visao_ativa [role="radiogroup"] label {{
+        padding: 0.75rem 1.5rem;
         border-radius: 8px;
         font-weight: 500;
         color: {COLORS['text_muted']};
     }}
     
-    .stTabs [aria-selected="true"] {{
+    .st-key-visao_ativa [role="radiogroup"] label:has(input:checked) {{
         background: {COLORS['primary']};
         color: white;
     }}
@@ -158,631 +170,79 @@ st.markdown(f"""
 </style>
 """, unsafe_allow_html=True)
 
-def formatar_moeda(valor):
-    """Formata valor em moeda brasileira."""
-    return f"R$ {valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+def parar_rerun():
+    """Encerra a medição do rerun antes de interrompê-lo, para que ele também seja registrado."""
+    medicao.encerrar()
+    st.stop()
 
-def carregar_e_processar_dados(arq_vendas, arq_metas):
-    """Carrega e processa planilhas de vendas e metas."""
-    df_vendas = pd.read_excel(arq_vendas)
-    df_metas = pd.read_excel(arq_metas, sheet_name='metas')
-    df_metas_vendedores = pd.read_excel(arq_metas, sheet_name='Planilha1')  # Carregar dados individuais dos vendedores
-    
-    # Processar vendas
-    df_vendas[COL_EMISSAO] = pd.to_datetime(df_vendas[COL_EMISSAO], errors='coerce')
-    df_vendas = df_vendas.dropna(subset=[COL_EMISSAO])
-    df_vendas[COL_MES_NUM] = df_vendas[COL_EMISSAO].dt.month
-    
-    mapa_meses = {
-        'Janeiro': 1, 'Fevereiro': 2, 'Março': 3, 'Abril': 4, 
-        'Maio': 5, 'Junho': 6, 'Julho': 7, 'Agosto': 8,
-        'Setembro': 9, 'Outubro': 10, 'Novembro': 11, 'Dezembro': 12
-    }
-    df_metas[COL_MES_NUM] = df_metas['Mês'].map(mapa_meses)
-    
-    df_metas = df_metas.rename(columns={
-        'Mensal': COL_META_INICIAL,
-        'Acumulado': COL_META_MENSAL
-    })
-    # Adicionar coluna Acumulado igual a Meta Mensal para compatibilidade
-    df_metas[COL_META_ACUMULADO] = df_metas[COL_META_MENSAL]
-    
-    # Processar dados dos vendedores
-    df_metas_vendedores[COL_MES_NUM] = df_metas_vendedores['Mês'].map(mapa_meses)
-    
-    df_metas_vendedores = df_metas_vendedores.rename(columns={
-        'Meta Mensal Acumulada': COL_META_ACUMULADO
-    })
-    
-    return df_vendas, df_metas, df_metas_vendedores
+def mostrar_grafico(fig, nome):
+    """Exibe a figura medindo o st.plotly_chart, onde ela é serializada para o navegador."""
+    with etapa(f'st.plotly_chart[{nome}]'):
+        st.plotly_chart(fig, use_container_width=True)
 
-def criar_pizza_atingimento(valor_real, valor_meta, titulo, mostrar_rotulos=True):
-    """Cria gráfico de pizza mostrando atingimento da meta."""
-    if valor_meta == 0 or pd.isna(valor_meta):
-        return go.Figure().add_annotation(
-            text="Meta não definida",
-            showarrow=False,
-            font=dict(size=16, color=COLORS['text_muted'])
-        )
-    
-    percentual = (valor_real / valor_meta) * 100
-    
-    if valor_real >= valor_meta:
-        labels = ['Meta Atingida', 'Superação']
-        values = [valor_meta, valor_real - valor_meta]
-        colors = [COLORS['success'], COLORS['primary']]
-        center_color = COLORS['success']
-    else:
-        labels = ['Realizado', 'Falta Atingir']
-        values = [valor_real, valor_meta - valor_real]
-        colors = [COLORS['info'], COLORS['border']]
-        center_color = COLORS['warning'] if percentual >= 70 else COLORS['danger']
-    
-    fig = go.Figure(data=[go.Pie(
-        labels=labels,
-        values=values,
-        hole=0.65,
-        marker=dict(colors=colors, line=dict(color='white', width=3)),
-        textinfo='label+percent' if mostrar_rotulos else 'percent',
-        textposition='outside' if mostrar_rotulos else 'auto',
-        textfont=dict(size=15, family='Inter', color=COLORS['text_dark']),
-        hovertemplate='<b>%{label}</b><br>%{value:,.2f}<br>%{percent}<extra></extra>'
-    )])
-    
-    fig.add_annotation(
-        text=f"<b>{percentual:.1f}%</b>",
-        x=0.5, y=0.55,
-        font=dict(size=32, color=center_color, family='Inter'),
-        showarrow=False
-    )
-    
-    fig.add_annotation(
-        text="da Meta",
-        x=0.5, y=0.45,
-        font=dict(size=14, color=COLORS['text_muted'], family='Inter'),
-        showarrow=False
-    )
+def mostrar_projecao(projecao, minimo, maximo, meta_anual, probabilidade, ritmo):
+    """Métricas da projeção de fim de ano, da empresa ou de um vendedor."""
+    col1, col2, col3, col4 = st.columns(4)
     
-    fig.update_layout(
-        title=dict(
-            text=titulo,
-            x=0.5,
-            xanchor='center',
-            font=dict(size=16, color=COLORS['text_dark'], family='Inter', weight=600)
-        ),
-        height=380,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=-0.15,
-            xanchor="center",
-            x=0.5,
-            font=dict(size=12, family='Inter')
-        ),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(t=60, b=80, l=20, r=20)
-    )
-    
-    return fig
-
-def criar_pizza_distribuicao(df, mostrar_rotulos=True):
-    """Cria gráfico de pizza com distribuição por mês."""
-    color_scale = [COLORS['primary'], COLORS['success'], COLORS['info'], 
-                   COLORS['warning'], '#8b5cf6', '#ec4899', '#06b6d4', '#f59e0b']
-    
-    fig = go.Figure(data=[go.Pie(
-        labels=df[COL_NOME_MES],
-        values=df[COL_VALOR],
-        hole=0.5,
-        marker=dict(colors=color_scale[:len(df)], line=dict(color='white', width=2)),
-        textinfo='label+percent' if mostrar_rotulos else 'percent',
-        textposition='outside' if mostrar_rotulos else 'auto',
-        textfont=dict(size=14, family='Inter'),
-        hovertemplate='<b>%{label}</b><br>R$ %{value:,.2f}<br>%{percent}<extra></extra>'
-    )])
-    
-    total = df[COL_VALOR].sum()
-    fig.add_annotation(
-        text=f"<b>Total</b><br>{formatar_moeda(total)}",
-        x=0.5, y=0.5,
-        font=dict(size=14, color=COLORS['text_dark'], family='Inter'),
-        showarrow=False
-    )
-    
-    fig.update_layout(
-        title=dict(
-            text='Distribuição de Faturamento por Mês',
-            x=0.5,
-            xanchor='center',
-            font=dict(size=16, color=COLORS['text_dark'], family='Inter', weight=600)
-        ),
-        height=380,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=-0.15,
-            xanchor="center",
-            x=0.5,
-            font=dict(size=11, family='Inter')
-        ),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(t=60, b=80, l=20, r=20)
-    )
-    
-    return fig
-
-def criar_grafico_barras(df: pd.DataFrame, em_percentual: bool = False, mostrar_rotulos: bool = True) -> go.Figure:
-    """Cria gráfico de barras comparando realizado vs meta."""
-    fig = go.Figure()
-    
-    # Ordenar por mês para garantir ordem correta
-    df = df.sort_values(COL_MES_NUM).copy()
-    
-    # Determinar cores baseadas no atingimento
-    cores_barras = []
-    for _, row in df.iterrows():
-        if pd.isna(row[COL_META_INICIAL]) or row[COL_META_INICIAL] == 0:
-            cores_barras.append(COLORS['neutral'])
-        else:
-            perc = (row[COL_VALOR] / row[COL_META_INICIAL]) * 100
-            if perc >= 100:
-                cores_barras.append(COLORS['success'])
-            elif perc >= 70:
-                cores_barras.append(COLORS['warning'])
-            else:
-                cores_barras.append(COLORS['danger'])
-    
-    if em_percentual:
-        y_valores = []
-        for _, row in df.iterrows():
-            if pd.isna(row[COL_META_INICIAL]) or row[COL_META_INICIAL] == 0:
-                y_valores.append(0)
-            else:
-                y_valores.append((row[COL_VALOR] / row[COL_META_INICIAL]) * 100)
-        
-        fig.add_trace(go.Bar(
-            x=df[COL_NOME_MES],
-            y=y_valores,
-            name='Atingimento',
-            marker=dict(color=cores_barras, line=dict(color='white', width=1)),
-            text=[f'{v:.1f}%' for v in y_valores] if mostrar_rotulos else None,
-            textposition='outside' if mostrar_rotulos else None,
-            textfont=dict(size=14, family='Inter', color=COLORS['text_dark']) if mostrar_rotulos else None,
-            hovertemplate='<b>%{x}</b><br>Atingimento: %{y:.1f}%<extra></extra>'
-        ))
-        
-        # Linha de referência em 100%
-        fig.add_hline(
-            y=100,
-            line=dict(color=COLORS['success'], width=2, dash='dash'),
-            annotation=dict(text="Meta (100%)", font=dict(size=11, color=COLORS['success']))
+    with col1:
+        st.metric(
+            label="Projeção até Dezembro",
+            value=formatar_moeda(projecao),
+            delta=f"Pelo ritmo: {formatar_moeda(ritmo)}",
+            delta_color="off"
         )
-        
-        y_title = 'Percentual de Atingimento (%)'
-    else:
-        fig.add_trace(go.Bar(
-            x=df[COL_NOME_MES],
-            y=df[COL_VALOR],
-            name='Realizado',
-            marker=dict(color=cores_barras, line=dict(color='white', width=1)),
-            text=df[COL_VALOR].apply(lambda x: formatar_moeda(x)) if mostrar_rotulos else None,
-            textposition='outside' if mostrar_rotulos else None,
-            textfont=dict(size=14, family='Inter', color=COLORS['text_dark']) if mostrar_rotulos else None,
-            hovertemplate='<b>%{x}</b><br>Realizado: R$ %{y:,.2f}<extra></extra>'
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=df[COL_NOME_MES],
-            y=df[COL_META_INICIAL],
-            name='Meta',
-            mode='lines+markers+text' if mostrar_rotulos else 'lines+markers',
-            line=dict(color=COLORS['primary'], width=3),
-            marker=dict(size=10, color=COLORS['primary'], line=dict(color='white', width=2)),
-            text=df[COL_META_INICIAL].apply(lambda x: formatar_moeda(x)) if mostrar_rotulos else None,
-            textposition='top center' if mostrar_rotulos else None,
-            textfont=dict(size=14, family='Inter', color=COLORS['primary']) if mostrar_rotulos else None,
-            hovertemplate='<b>%{x}</b><br>Meta: R$ %{y:,.2f}<extra></extra>'
-        ))
-        
-        y_title = 'Valor (R$)'
-    
-    fig.update_layout(
-        title=dict(
-            text='Desempenho Mensal vs Meta',
-            x=0.5,
-            xanchor='center',
-            font=dict(size=18, color=COLORS['text_dark'], family='Inter', weight=600)
-        ),
-        xaxis=dict(
-            title='Mês',
-            title_font=dict(size=13, color=COLORS['text_dark']),
-            tickfont=dict(size=12, color=COLORS['text_muted']),
-            showgrid=False
-        ),
-        yaxis=dict(
-            title=y_title,
-            title_font=dict(size=13, color=COLORS['text_dark']),
-            tickfont=dict(size=11, color=COLORS['text_muted']),
-            showgrid=True,
-            gridcolor=COLORS['border']
-        ),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        height=420,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=-0.2,
-            xanchor="center",
-            x=0.5,
-            font=dict(size=12, family='Inter')
-        ),
-        margin=dict(t=80, b=60, l=60, r=40),
-        hovermode='x unified'
-    )
-    
-    return fig
-
-def criar_grafico_cumulativo(df: pd.DataFrame, mostrar_rotulos: bool = True) -> go.Figure:
-    """Cria gráfico de área com evolução cumulativa."""
-    df = df.sort_values(COL_MES_NUM).copy()
-    
-    df['Realizado_Acum'] = df[COL_VALOR].cumsum()
-    df['Meta_Acum'] = df[COL_META_ACUMULADO].cumsum()
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=df[COL_NOME_MES],
-        y=df['Realizado_Acum'],
-        name='Realizado Acumulado',
-        mode='lines+markers+text' if mostrar_rotulos else 'lines',
-        line=dict(color=COLORS['success'], width=3),
-        marker=dict(size=8, color=COLORS['success']) if mostrar_rotulos else None,
-        fill='tozeroy',
-        fillcolor=f"rgba(16, 185, 129, 0.15)",
-        text=df['Realizado_Acum'].apply(lambda x: formatar_moeda(x)) if mostrar_rotulos else None,
-        textposition='top center' if mostrar_rotulos else None,
-        textfont=dict(size=14, family='Inter', color=COLORS['success']) if mostrar_rotulos else None,
-        hovertemplate='<b>%{x}</b><br>Acumulado: R$ %{y:,.2f}<extra></extra>'
-    ))
     
-    fig.add_trace(go.Scatter(
-        x=df[COL_NOME_MES],
-        y=df['Meta_Acum'],
-        name='Meta Acumulada',
-        mode='lines+markers+text' if mostrar_rotulos else 'lines+markers',
-        line=dict(color=COLORS['primary'], width=3, dash='dot'),
-        marker=dict(size=8, color=COLORS['primary']),
-        text=df['Meta_Acum'].apply(lambda x: formatar_moeda(x)) if mostrar_rotulos else None,
-        textposition='bottom center' if mostrar_rotulos else None,
-        textfont=dict(size=14, family='Inter', color=COLORS['primary']) if mostrar_rotulos else None,
-        hovertemplate='<b>%{x}</b><br>Meta: R$ %{y:,.2f}<extra></extra>'
-    ))
-
-    fig.update_layout(
-        title=dict(
-            text='Evolução Acumulada no Ano',
-            x=0.5,
-            xanchor='center',
-            font=dict(size=18, color=COLORS['text_dark'], family='Inter', weight=600)
-        ),
-        xaxis=dict(
-            title='Mês',
-            title_font=dict(size=13, color=COLORS['text_dark']),
-            tickfont=dict(size=12, family='Inter'),
-            showgrid=False
-        ),
-        yaxis=dict(
-            title='Valor Acumulado (R$)',
-            title_font=dict(size=13, color=COLORS['text_dark']),
-            tickformat=',.0f',
-            tickfont=dict(size=11, family='Inter'),
-            showgrid=True,
-            gridcolor='rgba(0,0,0,0.05)'
-        ),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        height=420,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=-0.2,
-            xanchor="center",
-            x=0.5,
-            font=dict(size=12, family='Inter')
-        ),
-        margin=dict(t=80, b=60, l=60, r=40),
-        hovermode='x unified'
-    )
-    
-    return fig
-
-def criar_grafico_barras_acumulado(df: pd.DataFrame, em_percentual: bool = False, mostrar_rotulos: bool = True) -> go.Figure:
-    """Cria gráfico de barras comparando realizado vs meta acumulada."""
-    fig = go.Figure()
-    
-    # Ordenar por mês para garantir ordem correta
-    df = df.sort_values(COL_MES_NUM).copy()
-    
-    # Determinar cores baseadas no atingimento
-    cores_barras = []
-    for _, row in df.iterrows():
-        if pd.isna(row[COL_META_ACUMULADO]) or row[COL_META_ACUMULADO] == 0:
-            cores_barras.append(COLORS['neutral'])
-        else:
-            perc = (row[COL_VALOR] / row[COL_META_ACUMULADO]) * 100
-            if perc >= 100:
-                cores_barras.append(COLORS['success'])
-            elif perc >= 70:
-                cores_barras.append(COLORS['warning'])
-            else:
-                cores_barras.append(COLORS['danger'])
-    
-    if em_percentual:
-        y_valores = []
-        for _, row in df.iterrows():
-            if pd.isna(row[COL_META_ACUMULADO]) or row[COL_META_ACUMULADO] == 0:
-                y_valores.append(0)
-            else:
-                y_valores.append((row[COL_VALOR] / row[COL_META_ACUMULADO]) * 100)
-        
-        fig.add_trace(go.Bar(
-            x=df[COL_NOME_MES],
-            y=y_valores,
-            name='Atingimento',
-            marker=dict(color=cores_barras, line=dict(color='white', width=1)),
-            text=[f'{v:.1f}%' for v in y_valores] if mostrar_rotulos else None,
-            textposition='outside' if mostrar_rotulos else None,
-            textfont=dict(size=14, family='Inter', color=COLORS['text_dark']) if mostrar_rotulos else None,
-            hovertemplate='<b>%{x}</b><br>Atingimento: %{y:.1f}%<extra></extra>'
-        ))
-        
-        # Linha de referência em 100%
-        fig.add_hline(
-            y=100,
-            line=dict(color=COLORS['success'], width=2, dash='dash'),
-            annotation=dict(text="Meta (100%)", font=dict(size=11, color=COLORS['success']))
+    with col2:
+        st.metric(
+            label="Intervalo da Projeção",
+            value="N/A" if math.isnan(minimo) else f"{formatar_moeda(minimo)} a {formatar_moeda(maximo)}"
         )
-        
-        y_title = 'Percentual de Atingimento (%)'
-    else:
-        fig.add_trace(go.Bar(
-            x=df[COL_NOME_MES],
-            y=df[COL_VALOR],
-            name='Realizado',
-            marker=dict(color=cores_barras, line=dict(color='white', width=1)),
-            text=df[COL_VALOR].apply(lambda x: formatar_moeda(x)) if mostrar_rotulos else None,
-            textposition='outside' if mostrar_rotulos else None,
-            textfont=dict(size=14, family='Inter', color=COLORS['text_dark']) if mostrar_rotulos else None,
-            hovertemplate='<b>%{x}</b><br>Realizado: R$ %{y:,.2f}<extra></extra>'
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=df[COL_NOME_MES],
-            y=df[COL_META_ACUMULADO],
-            name='Meta Acumulada (Ajustada)',
-            mode='lines+markers+text' if mostrar_rotulos else 'lines+markers',
-            line=dict(color=COLORS['warning'], width=3),
-            marker=dict(size=10, color=COLORS['warning'], line=dict(color='white', width=2)),
-            text=df[COL_META_ACUMULADO].apply(lambda x: formatar_moeda(x)) if mostrar_rotulos else None,
-            textposition='top center' if mostrar_rotulos else None,
-            textfont=dict(size=14, family='Inter', color=COLORS['warning']) if mostrar_rotulos else None,
-            hovertemplate='<b>%{x}</b><br>Meta Acumulada: R$ %{y:,.2f}<extra></extra>'
-        ))
-        
-        y_title = 'Valor (R$)'
-    
-    fig.update_layout(
-        title=dict(
-            text='Desempenho Mensal vs Meta Acumulada (Ajustada)',
-            x=0.5,
-            xanchor='center',
-            font=dict(size=18, color=COLORS['text_dark'], family='Inter', weight=600)
-        ),
-        xaxis=dict(
-            title='Mês',
-            title_font=dict(size=13, color=COLORS['text_dark']),
-            tickfont=dict(size=12, color=COLORS['text_muted']),
-            showgrid=False
-        ),
-        yaxis=dict(
-            title=y_title,
-            title_font=dict(size=13, color=COLORS['text_dark']),
-            tickfont=dict(size=11, color=COLORS['text_muted']),
-            showgrid=True,
-            gridcolor=COLORS['border']
-        ),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        height=420,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=-0.2,
-            xanchor="center",
-            x=0.5,
-            font=dict(size=12, family='Inter')
-        ),
-        margin=dict(t=80, b=60, l=60, r=40),
-        hovermode='x unified'
-    )
-    
-    return fig
-
-def gerar_insights(df, total_vendas, total_meta):
-    """Gera insights baseados nos dados."""
-    insights = []
     
-    # Análise de atingimento geral
-    if total_meta > 0:
-        perc_total = (total_vendas / total_meta) * 100
-        if perc_total >= 100:
-            insights.append({
-                'tipo': 'success',
-                'titulo': '🎯 Meta Atingida!',
-                'texto': f'Parabéns! Você atingiu {perc_total:.1f}% da meta total, superando em {formatar_moeda(total_vendas - total_meta)}.'
-            })
-        elif perc_total >= 70:
-            falta = total_meta - total_vendas
-            insights.append({
-                'tipo': 'warning',
-                'titulo': '⚡ Quase lá!',
-                'texto': f'Você está em {perc_total:.1f}% da meta. Faltam {formatar_moeda(falta)} para atingir o objetivo.'
-            })
+    with col3:
+        if meta_anual > 0:
+            st.metric(
+                label="vs Meta Anual",
+                value=f"{projecao / meta_anual * 100:.1f}%",
+                delta=f"{projecao / meta_anual * 100 - 100:+.1f}%"
+            )
         else:
-            insights.append({
-                'tipo': 'danger',
-                'titulo': '📊 Atenção Necessária',
-                'texto': f'O atingimento atual é de {perc_total:.1f}%. Revise a estratégia para melhorar os resultados.'
-            })
-    
-    # Análise de tendência
-    if len(df) >= 2:
-        ultimos_3 = df.tail(3)[COL_VALOR].values if len(df) >= 3 else df[COL_VALOR].values
-        if len(ultimos_3) >= 2:
-            tendencia = ultimos_3[-1] > ultimos_3[-2]
-            if tendencia:
-                crescimento = ((ultimos_3[-1] / ultimos_3[-2]) - 1) * 100
-                insights.append({
-                    'tipo': 'success',
-                    'titulo': '📈 Tendência Positiva',
-                    'texto': f'Crescimento de {crescimento:.1f}% no último mês analisado em relação ao anterior.'
-                })
-            else:
-                queda = ((ultimos_3[-2] / ultimos_3[-1]) - 1) * 100
-                insights.append({
-                    'tipo': 'warning',
-                    'titulo': '📉 Atenção à Queda',
-                    'texto': f'Redução de {queda:.1f}% no último mês. Considere ações corretivas.'
-                })
-    
-    # Melhor mês
-    if not df.empty:
-        melhor_mes = df.loc[df[COL_VALOR].idxmax()]
-        insights.append({
-            'tipo': 'info',
-            'titulo': '🏆 Melhor Performance',
-            'texto': f'{melhor_mes[COL_NOME_MES]} foi o melhor mês com {formatar_moeda(melhor_mes[COL_VALOR])} em vendas.'
-        })
-    
-    return insights
-
-def criar_heatmap_faturamento(df):
-    """Cria mapa de calor mostrando intensidade de faturamento por mês."""
-    # Preparar dados
-    df_sorted = df.sort_values(COL_MES_NUM).copy()
-    
-    # Criar matriz para heatmap (1 linha com todos os meses)
-    valores = df_sorted[COL_VALOR].values.reshape(1, -1)
-    meses = df_sorted[COL_NOME_MES].values
-    
-    # Criar texto para hover
-    texto_hover = [[formatar_moeda(val)] for val in df_sorted[COL_VALOR].values]
-    texto_hover = [texto_hover]  # Transformar em matriz 2D
+            st.metric(label="vs Meta Anual", value="N/A")
     
-    fig = go.Figure(data=go.Heatmap(
-        z=valores,
-        x=meses,
-        y=['Faturamento'],
-        colorscale=[
-            [0, '#e0e7ff'],      # Azul muito claro
-            [0.25, '#c7d2fe'],   # Azul claro
-            [0.5, '#818cf8'],    # Azul médio
-            [0.75, '#6366f1'],   # Azul
-            [1, '#4f46e5']       # Azul escuro
-        ],
-        text=texto_hover,
-        texttemplate='%{text}',
-        textfont=dict(size=13, color='white', family='Inter', weight=600),
-        hovertemplate='<b>%{x}</b><br>Faturamento: %{text}<extra></extra>',
-        showscale=True,
-        colorbar=dict(
-            title="Valor (R$)",
-            tickformat=",.0f",
-            len=0.7,
-            thickness=15
+    with col4:
+        st.metric(
+            label="Chance de Bater a Meta",
+            value=f"{probabilidade:.0f}%" if meta_anual > 0 else "N/A"
         )
-    ))
-    
-    fig.update_layout(
-        title=dict(
-            text='Mapa de Calor - Intensidade de Faturamento',
-            x=0.5,
-            xanchor='center',
-            font=dict(size=16, color=COLORS['text_dark'], family='Inter', weight=600)
-        ),
-        height=200,
-        xaxis=dict(
-            title='',
-            tickfont=dict(size=12, family='Inter'),
-            showgrid=False
-        ),
-        yaxis=dict(
-            title='',
-            showticklabels=False,
-            showgrid=False
-        ),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=20, r=100, t=50, b=50),
-        font=dict(family='Inter', size=12, color=COLORS['text_dark'])
-    )
-    
-    return fig
 
-def criar_histograma_faturamento(df):
-    """Cria histograma mostrando distribuição de valores de faturamento."""
-    df_sorted = df.sort_values(COL_MES_NUM).copy()
-    
-    fig = go.Figure(data=[go.Bar(
-        x=df_sorted[COL_NOME_MES],
-        y=df_sorted[COL_VALOR],
-        marker=dict(
-            color=df_sorted[COL_VALOR],
-            colorscale='Blues',
-            showscale=False,
-            line=dict(color='white', width=2)
-        ),
-        text=[formatar_moeda(val) for val in df_sorted[COL_VALOR]],
-        textposition='outside',
-        textfont=dict(size=13, color=COLORS['text_dark'], family='Inter', weight=600),
-        hovertemplate='<b>%{x}</b><br>Faturamento: R$ %{y:,.2f}<extra></extra>'
-    )])
-    
-    fig.update_layout(
-        title=dict(
-            text='Histograma - Valores de Faturamento por Mês',
-            x=0.5,
-            xanchor='center',
-            font=dict(size=16, color=COLORS['text_dark'], family='Inter', weight=600)
-        ),
-        height=380,
-        xaxis=dict(
-            title='Mês',
-            tickfont=dict(size=12, family='Inter'),
-            showgrid=False
-        ),
-        yaxis=dict(
-            title='Faturamento (R$)',
-            tickformat=',.0f',
-            tickfont=dict(size=12, family='Inter'),
-            showgrid=True,
-            gridcolor='rgba(0,0,0,0.05)'
-        ),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(t=60, b=60, l=80, r=40)
+def mostrar_insights(indicadores):
+    """Caixas de insights de uma linha dos indicadores (visão geral ou vendedor), duas por linha."""
+    insights = gerar_insights(indicadores)
+    for inicio in range(0, len(insights), 2):
+        colunas = st.columns(2)
+        for coluna, insight in zip(colunas, insights[inicio:inicio + 2]):
+            with coluna:
+                st.markdown(f"""
+                <div class="insight-box" style="border-left: 4px solid {COLORS[insight['tipo']]};">
+                    <div class="insight-title">{insight['titulo']}</div>
+                    <div class="insight-text">{insight['texto']}</div>
+                </div>
+                """, unsafe_allow_html=True)
+
+def mostrar_ritmo(chave, df_vendas, df_metas, inicio, fim, titulo, mostrar_rotulos, vendedor=None):
+    """Seção do ritmo diário/semanal contra a meta, calculada só quando ativada."""
+    st.markdown('<div class="section-title">📅 Ritmo Diário vs Meta</div>', unsafe_allow_html=True)
+    if not st.toggle("Mostrar ritmo diário", key=f"{chave}_ativo", help="Realizado dia a dia contra a meta mensal proporcional"):
+        return
+    frequencia = st.radio(
+        "Agrupar por",
+        ['D', 'W'],
+        format_func={'D': "Dia", 'W': "Semana"}.get,
+        horizontal=True,
+        key=f"{chave}_frequencia"
     )
-    
-    return fig
+    with etapa('ritmo_diario'):
+        df_ritmo = ritmo_diario(df_vendas, df_metas, inicio, fim, vendedor, frequencia)
+    mostrar_grafico(criar_grafico_ritmo(df_ritmo, titulo, mostrar_rotulos), 'ritmo')
 
 st.markdown('<h1 class="main-title">📊 Dashboard de Análise de Metas</h1>', unsafe_allow_html=True)
 
@@ -790,40 +250,121 @@ with st.sidebar:
     st.header("⚙️ Configurações")
     st.markdown("---")
     
-    f_vendas = st.file_uploader("📁 Planilha de Vendas", type=['xlsx'], help="Envie a planilha com os dados de vendas", key="uploader_vendas")
-    f_metas = st.file_uploader("🎯 Planilha de Metas", type=['xlsx'], help="Envie a planilha com as metas definidas", key="uploader_metas")
+    f_vendas = st.file_uploader(
+        "📁 Planilha de Vendas",
+        type=['xlsx', 'csv', 'parquet'],
+        help="Envie os dados de vendas em Excel, CSV ou Parquet",
+        key="uploader_vendas"
+    )
+    
+    chave_vendas = None
+    if not f_vendas:
+        vendas_salvas = {chave: f"{origem} ({linhas} vendas)" for chave, origem, linhas in listar_vendas_salvas()}
+        if vendas_salvas:
+            chave_vendas = st.selectbox(
+                "📦 Ou use vendas já carregadas",
+                [None, *vendas_salvas],
+                format_func=lambda chave: "—" if chave is None else vendas_salvas[chave],
+                help="Datasets de vendas já processados, incluindo os que receberam vendas novas"
+            )
+    
+    f_novas = st.file_uploader(
+        "➕ Vendas Novas",
+        type=['xlsx', 'csv', 'parquet'],
+        accept_multiple_files=True,
+        help="Planilhas só com as notas novas; vendas que já estão no dataset são ignoradas",
+        key="uploader_novas"
+    )
+    f_metas = st.file_uploader(
+        "🎯 Planilha de Metas",
+        type=['xlsx', 'zip'],
+        help="Envie a planilha com as metas definidas, ou um .zip com metas.csv e Planilha1.csv (ou .parquet)",
+        key="uploader_metas"
+    )
+    
+    tem_vendas = bool(f_vendas or chave_vendas)
     
-    if f_vendas and f_metas:
+    if tem_vendas and f_metas:
         st.markdown("---")
         st.subheader("🔍 Filtros")
         
         mostrar_rotulos = st.toggle("Mostrar rótulos nos gráficos", value=True, help="Exibir valores diretamente nos gráficos")
         
-        df_vendas, df_metas, df_metas_vendedores = carregar_e_processar_dados(f_vendas, f_metas)
-        
-        meses_disponiveis = sorted(df_vendas[COL_MES_NUM].unique())
-        meses_abrev = {
-            1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
-            7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
-        }
+        # A leitura roda em segundo plano; reruns durante ela reencontram o mesmo carregamento
+        with etapa('carregar_e_processar_dados'):
+            carregamento = iniciar_carregamento(
+                f_vendas, f_metas, st.session_state.sessao_id,
+                novas_vendas=f_novas or (), chave_vendas=chave_vendas
+            )
+            if not carregamento.concluido():
+                barra = st.progress(carregamento.progresso, text=f"⏳ {carregamento.etapa}...")
+                while not carregamento.concluido():
+                    time.sleep(INTERVALO_PROGRESSO)
+                    barra.progress(carregamento.progresso, text=f"⏳ {carregamento.etapa}...")
+                barra.empty()
+            df_vendas, df_metas, df_metas_vendedores = carregamento.resultado(st.session_state.sessao_id)
+
+        stats_cache = cache_dados.estatisticas()
+        st.caption(
+            f"🗄️ Cache de planilhas: {stats_cache['acertos']} acertos, {stats_cache['faltas']} faltas, "
+            f"{stats_cache['itens']} em memória ({stats_cache['bytes'] / 1024**2:.1f} MB), "
+            f"{stats_cache['sessoes']} sessões"
+        )
+        stats_figuras = cache_figuras.estatisticas()
+        st.caption(
+            f"🖼️ Cache de gráficos: {stats_figuras['acertos']} acertos, {stats_figuras['faltas']} faltas, "
+            f"{stats_figuras['itens']} figuras"
+        )
         
+        with st.expander("🧮 Memória do dataset"):
+            memoria_vendas = relatorio_memoria(df_vendas)
+            st.dataframe(memoria_vendas, use_container_width=True)
+            st.caption(
+                f"Vendas: {len(df_vendas)} linhas, {memoria_vendas['bytes'].sum() / 1024**2:.1f} MB · "
+                f"Metas: {tamanho_em_memoria(df_metas, df_metas_vendedores) / 1024**2:.2f} MB"
+            )
+
+        with etapa('obter_cubo'):
+            cubo = obter_cubo(df_vendas)
+        periodos_disponiveis = listar_periodos(cubo)
         meses_nomes = {
             1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril',
             5: 'Maio', 6: 'Junho', 7: 'Julho', 8: 'Agosto',
             9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
         }
         
-        meses_sel = st.multiselect(
-            "Selecione os meses:",
-            options=meses_disponiveis,
-            format_func=lambda x: meses_nomes[x],
-            default=meses_disponiveis,
-            help="Escolha os meses que deseja analisar"
-        )
-        
-        if not meses_sel:
-            st.warning("⚠️ Selecione pelo menos um mês")
-            st.stop()
+        if not periodos_disponiveis:
+            st.warning("⚠️ Nenhuma venda com data de emissão válida")
+            parar_rerun()
+        
+        # Vendas ordenadas por emissão: filtros de período ou de datas são recortes por busca binária
+        cubo_geral = cubo
+        periodo_inicio, periodo_fim = periodos_disponiveis[0], periodos_disponiveis[-1]
+        filtrar_datas = st.toggle("Filtrar por datas", key="filtrar_datas", help="Escolha dias exatos em vez de meses inteiros")
+        if filtrar_datas:
+            data_min, data_max = (data.date() for data in df_vendas[COL_EMISSAO].iloc[[0, -1]])
+            intervalo = st.date_input(
+                "Intervalo de datas:",
+                value=(data_min, data_max),
+                min_value=data_min,
+                max_value=data_max,
+                format="DD/MM/YYYY",
+                help="Primeiro e último dia (inclusive) das vendas analisadas"
+            )
+            # Enquanto só o primeiro dia foi escolhido, o intervalo vai até a última venda
+            data_inicio, data_fim = (*intervalo, data_max)[:2] if intervalo else (data_min, data_max)
+            with etapa('obter_cubo_intervalo'):
+                cubo_geral = obter_cubo_intervalo(df_vendas, data_inicio, data_fim)
+        elif len(periodos_disponiveis) > 1:
+            periodo_inicio, periodo_fim = st.select_slider(
+                "Selecione o período:",
+                options=periodos_disponiveis,
+                value=(periodos_disponiveis[0], periodos_disponiveis[-1]),
+                format_func=lambda p: f"{meses_nomes[p % 100]}/{p // 100}",
+                help="Escolha o primeiro e o último mês que deseja analisar"
+            )
+        if not filtrar_datas:
+            data_inicio, data_fim = datas_dos_periodos(periodo_inicio, periodo_fim)
         
         mostrar_percentual = st.checkbox(
             "Exibir em percentual",
@@ -831,16 +372,17 @@ with st.sidebar:
             help="Mostra o gráfico em percentual de atingimento ao invés de valores absolutos"
         )
 
-if f_vendas and f_metas and meses_sel:
-    df_filtrado = df_vendas[df_vendas[COL_MES_NUM].isin(meses_sel)].copy()
-    
-    df_agrupado = df_filtrado.groupby(COL_MES_NUM).agg({
-        COL_VALOR: 'sum',
-        COL_CONTAGEM: 'sum'
-    }).reset_index()
-    
-    df_consolidado = pd.merge(df_agrupado, df_metas, on=COL_MES_NUM, how='left').sort_values(COL_MES_NUM)
-    df_consolidado[COL_NOME_MES] = df_consolidado[COL_MES_NUM].map(meses_abrev)
+    st.markdown("---")
+    # Preenchido no fim do rerun, quando todas as etapas já foram medidas
+    painel_medicao = st.container() if st.toggle(
+        "🐞 Painel de desempenho",
+        key="painel_medicao",
+        help="Tempo e memória de cada etapa deste rerun (leitura, agregações, gráficos)"
+    ) else None
+
+if tem_vendas and f_metas:
+    with etapa('consolidar_meses'):
+        df_consolidado = consolidar_meses(cubo_geral, df_metas, periodo_inicio, periodo_fim)
     
     total_vendas = df_consolidado[COL_VALOR].sum()
     total_meta_mensal = df_consolidado[COL_META_MENSAL].sum()
@@ -848,6 +390,8 @@ if f_vendas and f_metas and meses_sel:
     total_meta_inicial = df_consolidado[COL_META_INICIAL].sum()
     total_pedidos = df_consolidado[COL_CONTAGEM].sum()
     ticket_medio = total_vendas / total_pedidos if total_pedidos > 0 else 0
+    # Vendas ordenadas por emissão: a última linha é a venda mais recente
+    data_ultima_venda = df_vendas[COL_EMISSAO].iloc[-1]
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
@@ -901,35 +445,48 @@ if f_vendas and f_metas and meses_sel:
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    tab_geral, tab_vendedor = st.tabs(["📊 Visão Geral", "👤 Por Vendedor"])
+    # Seletor no lugar de st.tabs: abas escondem o conteúdo só no navegador, então
+    # cada rerun montaria as duas seções; aqui só a seção ativa é calculada e enviada
+    visao = st.radio(
+        "Visão",
+        [VISAO_GERAL, VISAO_VENDEDOR, VISAO_RANKING],
+        horizontal=True,
+        key="visao_ativa",
+        label_visibility="collapsed"
+    )
     
-    with tab_geral:
+    if visao == VISAO_GERAL:
+        st.markdown('<div class="section-title">💡 Insights</div>', unsafe_allow_html=True)
+        with etapa('insights'):
+            indicadores = obter_insights(cubo_geral, df_metas, df_metas_vendedores, periodo_inicio, periodo_fim)
+        mostrar_insights(indicadores.loc[ROTULO_GERAL])
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
             fig_pizza1 = criar_pizza_atingimento(total_vendas, total_meta_inicial, "Vs Meta Inicial", mostrar_rotulos)
-            st.plotly_chart(fig_pizza1, use_container_width=True)
+            mostrar_grafico(fig_pizza1, 'pizza1')
         
         with col2:
             fig_pizza_vs_meta = criar_pizza_atingimento(total_vendas, total_meta_mensal, "Vs Meta Mensal", mostrar_rotulos)
-            st.plotly_chart(fig_pizza_vs_meta, use_container_width=True)
+            mostrar_grafico(fig_pizza_vs_meta, 'pizza_vs_meta')
         
         with col3:
             fig_pizza2 = criar_pizza_distribuicao(df_consolidado, mostrar_rotulos)
-            st.plotly_chart(fig_pizza2, use_container_width=True)
+            mostrar_grafico(fig_pizza2, 'pizza2')
         
         st.markdown("<br>", unsafe_allow_html=True)
         
         st.markdown('<div class="section-title">📊 Visualização de Distribuição de Faturamento</div>', unsafe_allow_html=True)
         
         fig_heatmap = criar_heatmap_faturamento(df_consolidado)
-        st.plotly_chart(fig_heatmap, use_container_width=True)
+        mostrar_grafico(fig_heatmap, 'heatmap')
         
         col_hist1, col_hist2 = st.columns([2, 1])
         
         with col_hist1:
             fig_histograma = criar_histograma_faturamento(df_consolidado)
-            st.plotly_chart(fig_histograma, use_container_width=True)
+            mostrar_grafico(fig_histograma, 'histograma')
         
         with col_hist2:
             st.markdown("""
@@ -961,22 +518,46 @@ if f_vendas and f_metas and meses_sel:
         st.markdown("<br>", unsafe_allow_html=True)
         
         fig_barras = criar_grafico_barras(df_consolidado, mostrar_percentual, mostrar_rotulos)
-        st.plotly_chart(fig_barras, use_container_width=True)
+        mostrar_grafico(fig_barras, 'barras')
         
         st.markdown("<br>", unsafe_allow_html=True)
         
         fig_barras_acumulado = criar_grafico_barras_acumulado(df_consolidado, mostrar_percentual, mostrar_rotulos)
-        st.plotly_chart(fig_barras_acumulado, use_container_width=True)
+        mostrar_grafico(fig_barras_acumulado, 'barras_acumulado')
         
         st.markdown("<br>", unsafe_allow_html=True)
         
         fig_cumulativo = criar_grafico_cumulativo(df_consolidado, mostrar_rotulos)
-        st.plotly_chart(fig_cumulativo, use_container_width=True)
+        mostrar_grafico(fig_cumulativo, 'cumulativo')
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        
+        mostrar_ritmo("ritmo_geral", df_vendas, df_metas, data_inicio, data_fim, "Ritmo de Vendas vs Meta", mostrar_rotulos)
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        
+        # A projeção usa o ano inteiro das vendas, independente do filtro de meses
+        st.markdown('<div class="section-title">🔮 Projeção para o Fim do Ano</div>', unsafe_allow_html=True)
+        with etapa('projetar_geral'):
+            df_projecao = projetar_geral(cubo, df_metas, data_corte=data_ultima_venda)
+        fim_do_ano = df_projecao.iloc[-1]
+        mostrar_projecao(
+            fim_do_ano[COL_PROJECAO_ACUM], fim_do_ano[COL_PROJECAO_MIN], fim_do_ano[COL_PROJECAO_MAX],
+            fim_do_ano[COL_META_ACUM], df_projecao.attrs['probabilidade'], df_projecao.attrs['ritmo']
+        )
+        fig_projecao = criar_grafico_projecao(
+            df_projecao, f"Projeção de {fim_do_ano[COL_PERIODO] // 100} vs Meta Acumulada", mostrar_rotulos
+        )
+        mostrar_grafico(fig_projecao, 'projecao')
+        st.caption(
+            f"Projeção sazonal com as vendas até {data_ultima_venda:%d/%m/%Y}; a faixa cobre "
+            f"{df_projecao.attrs['confianca']:.0%} dos resultados esperados pela variação dos meses fechados."
+        )
     
-    with tab_vendedor:
+    elif visao == VISAO_VENDEDOR:
         st.markdown('<div class="section-title">👤 Análise Individual por Vendedor</div>', unsafe_allow_html=True)
         
-        vendedores = sorted(df_vendas[COL_VENDEDOR].unique())
+        vendedores = listar_vendedores(cubo)
         vendedor_selecionado = st.selectbox(
             "Selecione um vendedor para análise detalhada:",
             ["Selecione..."] + vendedores,
@@ -984,27 +565,14 @@ if f_vendas and f_metas and meses_sel:
         )
         
         if vendedor_selecionado != "Selecione...":
-            df_vendas_vendedor = df_vendas[df_vendas[COL_VENDEDOR] == vendedor_selecionado]
-            
-            df_metas_vendedor = df_metas_vendedores[df_metas_vendedores[COL_VENDEDOR] == vendedor_selecionado].copy()
+            df_metas_vendedor = df_metas_vendedores[df_metas_vendedores[COL_VENDEDOR] == vendedor_selecionado]
             
             if df_metas_vendedor.empty:
                 st.warning(f"⚠️ Nenhuma meta encontrada para '{vendedor_selecionado}' na Planilha1")
-                st.stop()
-            
-            vendas_vendedor = df_vendas_vendedor.groupby(COL_MES_NUM).agg({
-                COL_VALOR: 'sum',
-                COL_CONTAGEM: 'sum'
-            }).reset_index()
-            
-            metas_vendedor = df_metas_vendedor.groupby(COL_MES_NUM).agg({
-                COL_META_INICIAL: 'sum',
-                COL_META_MENSAL: 'sum',
-                COL_META_ACUMULADO: 'sum' # Adicionando agregação para Meta Acumulada
-            }).reset_index()
+                parar_rerun()
             
-            df_vendedor = pd.merge(vendas_vendedor, metas_vendedor, on=COL_MES_NUM, how='left').sort_values(COL_MES_NUM)
-            df_vendedor[COL_NOME_MES] = df_vendedor[COL_MES_NUM].map(meses_abrev)
+            with etapa('consolidar_vendedor'):
+                df_vendedor = consolidar_vendedor(cubo, df_metas_vendedores, vendedor_selecionado)
             
             total_vendas_v = df_vendedor[COL_VALOR].sum()
             total_meta_mensal_v = df_vendedor[COL_META_MENSAL].sum()
@@ -1052,6 +620,24 @@ if f_vendas and f_metas and meses_sel:
                     delta=f"{total_pedidos_v} pedidos"
                 )
             
+            with etapa('insights'):
+                indicadores = obter_insights(cubo, df_metas, df_metas_vendedores)
+            if vendedor_selecionado in indicadores.index:
+                mostrar_insights(indicadores.loc[vendedor_selecionado])
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+            
+            with etapa('projetar_vendedores'):
+                df_projecoes = projetar_vendedores(cubo, df_metas_vendedores, data_corte=data_ultima_venda)
+            projecao_v = df_projecoes[df_projecoes[COL_VENDEDOR] == vendedor_selecionado]
+            if not projecao_v.empty:
+                projecao_v = projecao_v.iloc[0]
+                st.markdown('<div class="section-title">🔮 Projeção para o Fim do Ano</div>', unsafe_allow_html=True)
+                mostrar_projecao(
+                    projecao_v[COL_PROJECAO], projecao_v[COL_PROJECAO_MIN], projecao_v[COL_PROJECAO_MAX],
+                    projecao_v[COL_META_ANUAL], projecao_v[COL_PROB_META], projecao_v[COL_PROJECAO_RITMO]
+                )
+            
             st.markdown("<br>", unsafe_allow_html=True)
             
             col_v1, col_v2 = st.columns(2)
@@ -1063,25 +649,162 @@ if f_vendas and f_metas and meses_sel:
                     f"Atingimento - {vendedor_selecionado}",
                     mostrar_rotulos
                 )
-                st.plotly_chart(fig_pizza_v, use_container_width=True)
+                mostrar_grafico(fig_pizza_v, 'pizza_v')
             
             with col_v2:
                 fig_dist_v = criar_pizza_distribuicao(df_vendedor, mostrar_rotulos)
-                st.plotly_chart(fig_dist_v, use_container_width=True)
+                mostrar_grafico(fig_dist_v, 'dist_v')
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+            
+            periodos_vendedor = df_vendedor[COL_PERIODO].tolist()
+            if periodos_vendedor:
+                periodo_ritmo = st.selectbox(
+                    "Mês do ritmo diário:",
+                    [None, *reversed(periodos_vendedor)],
+                    index=1,
+                    format_func=lambda p: "Todos os meses" if p is None else f"{meses_nomes[p % 100]}/{p // 100}",
+                    key="periodo_ritmo_vendedor"
+                )
+                inicio_ritmo, fim_ritmo = (
+                    datas_dos_periodos(periodos_vendedor[0], periodos_vendedor[-1]) if periodo_ritmo is None
+                    else datas_dos_periodos(periodo_ritmo, periodo_ritmo)
+                )
+                mostrar_ritmo(
+                    "ritmo_vendedor", df_vendas, df_metas_vendedores, inicio_ritmo, fim_ritmo,
+                    f"Ritmo de Vendas - {vendedor_selecionado}", mostrar_rotulos, vendedor_selecionado
+                )
             
             st.markdown("<br>", unsafe_allow_html=True)
             
             with st.expander("📋 Ver Detalhamento das Vendas"):
-                df_detalhe = df_vendas_vendedor[[COL_EMISSAO, COL_VALOR, COL_CONTAGEM]].copy()
-                df_detalhe = df_detalhe.sort_values(COL_EMISSAO, ascending=False)
-                df_detalhe[COL_VALOR] = df_detalhe[COL_VALOR].apply(formatar_moeda)
-                
-                st.dataframe(
-                    df_detalhe,
-                    use_container_width=True,
-                    hide_index=True
+                # Nada é ordenado ou formatado enquanto o detalhamento não for carregado
+                if st.toggle("Carregar vendas", key="detalhe_vendas", help="Lista as vendas do vendedor, página a página"):
+                    posicoes = posicoes_vendas(df_vendas, vendedor_selecionado)
+                    
+                    col_pag, col_tam = st.columns([3, 1])
+                    with col_tam:
+                        tamanho_pagina = st.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1)
+                    total_paginas = max(1, -(-len(posicoes) // tamanho_pagina))
+                    with col_pag:
+                        pagina = st.number_input(
+                            f"Página (de {total_paginas})",
+                            min_value=1,
+                            max_value=total_paginas,
+                            value=1,
+                            step=1
+                        )
+                    
+                    df_detalhe = paginar_vendas(
+                        df_vendas, posicoes, pagina, tamanho_pagina,
+                        colunas=[COL_EMISSAO, COL_VALOR, COL_CONTAGEM]
+                    )
+                    df_detalhe = df_detalhe.assign(**{COL_VALOR: formatar_moeda_serie(df_detalhe[COL_VALOR])})
+                    
+                    st.dataframe(
+                        df_detalhe,
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    st.caption(f"{len(posicoes)} vendas no total")
+    
+    else:
+        st.markdown('<div class="section-title">🏆 Ranking de Vendedores</div>', unsafe_allow_html=True)
+        
+        # Mesmas métricas da análise individual, para todos os vendedores da Planilha1, nos meses filtrados.
+        # O ranking é montado uma vez por cubo; cada seleção de meses só subtrai somas acumuladas.
+        with etapa('ranking_vendedores'):
+            ranking = obter_ranking(cubo_geral, df_metas_vendedores)
+            df_resumo = ranking.resumo(periodo_inicio, periodo_fim)
+        
+        col_p25, col_p50, col_p75 = st.columns(3)
+        for coluna, p, rotulo in [(col_p25, 25, "Percentil 25"), (col_p50, 50, "Mediana"), (col_p75, 75, "Percentil 75")]:
+            with coluna:
+                atingimento_p = ranking.percentil(p, periodo_inicio, periodo_fim)
+                st.metric(f"{rotulo} vs Meta Mensal", "—" if atingimento_p is None else f"{atingimento_p:.1f}%")
+        
+        col_recorte, col_k = st.columns([2, 1])
+        with col_recorte:
+            recorte = st.radio(
+                "Mostrar",
+                ["Todos", "Melhores", "Piores"],
+                horizontal=True,
+                key="ranking_recorte",
+                help="Melhores e piores consideram só vendedores com meta mensal no período"
+            )
+        with col_k:
+            k = st.number_input("Quantidade", min_value=1, value=10, step=1, key="ranking_k", disabled=recorte == "Todos")
+        if recorte == "Melhores":
+            df_resumo = ranking.melhores(k, periodo_inicio, periodo_fim)
+        elif recorte == "Piores":
+            df_resumo = ranking.piores(k, periodo_inicio, periodo_fim)
+        
+        df_ranking = df_resumo[[
+            COL_VENDEDOR, COL_VALOR, COL_PERC_META_MENSAL, COL_PERC_META_INICIAL, COL_CRESCIMENTO,
+            COL_PERCENTIL, COL_TICKET_MEDIO, COL_CONTAGEM, COL_META_MENSAL, COL_META_INICIAL
+        ]]
+        # A posição é a do ranking completo, também nos recortes de melhores e piores
+        df_ranking.insert(0, 'Posição', df_resumo.index + 1)
+        
+        rotulos_ranking = {
+            COL_VENDEDOR: "Vendedor", COL_VALOR: "Faturamento", COL_PERC_META_MENSAL: "vs Meta Mensal",
+            COL_PERC_META_INICIAL: "vs Meta Inicial", COL_CRESCIMENTO: "Crescimento", COL_PERCENTIL: "Percentil",
+            COL_TICKET_MEDIO: "Ticket Médio", COL_CONTAGEM: "Pedidos",
+            COL_META_MENSAL: "Meta Mensal", COL_META_INICIAL: "Meta Inicial",
+        }
+        formatos_ranking = {
+            COL_VALOR: "R$ %.2f", COL_PERC_META_MENSAL: "%.1f%%", COL_PERC_META_INICIAL: "%.1f%%",
+            COL_CRESCIMENTO: "%+.1f%%", COL_PERCENTIL: "%.0f",
+            COL_TICKET_MEDIO: "R$ %.2f", COL_META_MENSAL: "R$ %.2f", COL_META_INICIAL: "R$ %.2f",
+        }
+        
+        st.dataframe(
+            df_ranking,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                coluna: st.column_config.NumberColumn(rotulo, format=formatos_ranking.get(coluna))
+                if coluna != COL_VENDEDOR else st.column_config.TextColumn(rotulo)
+                for coluna, rotulo in rotulos_ranking.items()
+            }
+        )
+        st.caption(
+            f"{len(df_ranking)} vendedores · crescimento sobre o mesmo número de meses antes do período · "
+            "clique no cabeçalho de uma coluna para reordenar"
+        )
+        
+        st.download_button(
+            "⬇️ Exportar ranking (CSV)",
+            df_ranking.rename(columns=rotulos_ranking).to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig'),
+            file_name="ranking_vendedores.csv",
+            mime="text/csv"
+        )
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        
+        st.markdown('<div class="section-title">🔮 Projeção de Fim de Ano por Vendedor</div>', unsafe_allow_html=True)
+        with etapa('projetar_vendedores'):
+            df_projecoes = projetar_vendedores(cubo, df_metas_vendedores, data_corte=data_ultima_venda)
+        rotulos_projecao = {
+            COL_VENDEDOR: "Vendedor", COL_VALOR: "Realizado no Ano", COL_PROJECAO: "Projeção",
+            COL_PROJECAO_MIN: "Mínimo", COL_PROJECAO_MAX: "Máximo", COL_PROJECAO_RITMO: "Pelo Ritmo",
+            COL_META_ANUAL: "Meta Anual", COL_PERC_PROJECAO: "vs Meta Anual", COL_PROB_META: "Chance de Bater",
+        }
+        st.dataframe(
+            df_projecoes[list(rotulos_projecao)],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                coluna: st.column_config.NumberColumn(
+                    rotulo, format="%.1f%%" if coluna in (COL_PERC_PROJECAO, COL_PROB_META) else "R$ %.2f"
                 )
+                if coluna != COL_VENDEDOR else st.column_config.TextColumn(rotulo)
+                for coluna, rotulo in rotulos_projecao.items()
+            }
+        )
+        st.caption(f"Vendas até {data_ultima_venda:%d/%m/%Y} · do vendedor com mais chance de bater a meta anual ao com menos")
 else:
+    cache_dados.liberar(st.session_state.sessao_id)
     st.info("👋 Bem-vindo! Por favor, envie as planilhas de **Vendas** e **Metas** na barra lateral para iniciar a análise.")
     
     st.markdown("""
@@ -1096,3 +819,26 @@ else:
     
     💡 **Dica:** Use a opção "Exibir em percentual" para facilitar comparações entre períodos diferentes.
     """)
+
+medicao_rerun = medicao.encerrar()
+if painel_medicao is not None:
+    with painel_medicao:
+        st.dataframe(
+            [
+                {
+                    "Etapa": registro['etapa'],
+                    "Tempo (ms)": registro['segundos'] * 1000,
+                    "Memória (MB)": None if registro['memoria_delta'] is None else registro['memoria_delta'] / 1024**2,
+                    "Cache": registro.get('em_cache'),
+                }
+                for registro in medicao_rerun.etapas
+            ],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Tempo (ms)": st.column_config.NumberColumn(format="%.1f"),
+                "Memória (MB)": st.column_config.NumberColumn(format="%+.1f"),
+            }
+        )
+        memoria_final = "—" if medicao_rerun.memoria_final is None else f"{medicao_rerun.memoria_final / 1024**2:.0f} MB"
+        st.caption(f"Rerun: {medicao_rerun.segundos * 1000:.0f} ms · Memória do processo: {memoria_final}")
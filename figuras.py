@@ -0,0 +1,53 @@
+import functools
+import hashlib
+
+import pandas as pd
+
+from dados import CacheLRU
+from medicao import etapa
+
+# Limite do cache de figuras (compartilhado pelo processo); cada figura ocupa poucos KB
+CACHE_FIGURAS_MAX_ITENS = 256
+
+cache_figuras = CacheLRU(max_bytes=float('inf'), max_itens=CACHE_FIGURAS_MAX_ITENS)
+
+
+def impressao_digital(*args, **kwargs):
+    """Gera um hash dos argumentos de um gráfico, com DataFrames hasheados pelo conteúdo.
+
+    O conteúdo inclui os metadados em `attrs` (ex.: os da projeção), em
+    ordem de chave para que a mesma informação gere sempre o mesmo hash.
+    """
+    h = hashlib.sha256()
+    for nome, valor in [(None, valor) for valor in args] + sorted(kwargs.items()):
+        h.update(repr(nome).encode())
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            h.update(repr(valor.dtypes).encode())
+            h.update(repr(sorted(valor.attrs.items())).encode())
+            h.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+        else:
+            h.update(repr(valor).encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def em_cache(construir):
+    """Memoriza a figura devolvida pelo construtor de gráfico.
+
+    A chave combina o nome do construtor com a impressão digital dos
+    argumentos (dados e opções de exibição), então reruns que não mudam o
+    gráfico recebem a mesma figura, sem reconstruí-la. As figuras são
+    compartilhadas e não devem ser alteradas depois de criadas. Cada
+    chamada é medida como uma etapa do rerun (ver `medicao`).
+    """
+    @functools.wraps(construir)
+    def construir_em_cache(*args, **kwargs):
+        with etapa(construir.__name__) as info:
+            chave = (construir.__qualname__, impressao_digital(*args, **kwargs))
+            figura = cache_figuras.obter(chave)
+            info['em_cache'] = figura is not None
+            if figura is None:
+                figura = construir(*args, **kwargs)
+                cache_figuras.guardar(chave, figura, 0)
+        return figura
+    return construir_em_cache
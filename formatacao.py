@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Acima disso (em reais) os centavos não cabem com folga na precisão do float64
+LIMITE_VETORIZADO = 1e13
+_MAX_DIGITOS = 13
+_POTENCIAS_10 = 10 ** np.arange(1, _MAX_DIGITOS, dtype=np.int64)
+# 'R$ -' + dígitos + pontos de milhar + ',dd'
+_LARGURA = 4 + _MAX_DIGITOS + (_MAX_DIGITOS - 1) // 3 + 3
+_ZERO = ord('0')
+# Concatenação elemento a elemento de arrays de texto (np.strings é do NumPy 2; np.char, bem mais lento, do 1.x)
+_concatenar = getattr(np, 'strings', np.char).add
+# Final do percentual para cada décimo: '.0%' a '.9%'
+_SUFIXOS_PERCENTUAL = np.array([f'.{decimo}%' for decimo in range(10)])
+
+
+def formatar_moeda(valor):
+    """Formata valor em moeda brasileira."""
+    return f"R$ {valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def formatar_moeda_serie(valores):
+    """Formata uma Series/array inteiro em moeda brasileira, sem laço em Python.
+
+    O resultado é idêntico ao de aplicar `formatar_moeda` a cada valor. Os
+    centavos são arredondados em lote; valores não finitos, muito grandes
+    ou cujo arredondamento em float fica ambíguo (perto de meio centavo)
+    são formatados por `formatar_moeda`. Uma Series volta como Series com
+    o mesmo índice; qualquer outra entrada volta como array de objetos.
+    """
+    indice = valores.index if isinstance(valores, pd.Series) else None
+    x = np.asarray(valores, dtype='float64')
+
+    negativo = np.signbit(x)
+    absoluto = np.abs(x)
+    with np.errstate(invalid='ignore'):
+        escalado = absoluto * 100
+        centavos = np.rint(escalado)
+        # O erro de absoluto * 100 é de no máximo meio ulp; fora dessa faixa
+        # em torno de x,5 o arredondamento coincide com o do Python
+        incerto = (
+            ~np.isfinite(x)
+            | (absoluto >= LIMITE_VETORIZADO)
+            | (np.abs(escalado - np.floor(escalado) - 0.5) <= 1e-9 + escalado * 1e-15)
+        )
+    centavos = np.where(incerto, 0, centavos).astype(np.int64)
+    inteiros = centavos // 100
+    qtd_digitos = np.searchsorted(_POTENCIAS_10, inteiros, side='right') + 1
+
+    # Texto montado como códigos UCS-4, um caractere por coluna de `buffer`;
+    # a última coluna recebe as escritas descartadas e é zerada no final
+    n = x.shape[0]
+    largura = _LARGURA + 1
+    buffer = np.zeros((n, largura), dtype=np.uint32)
+    plano = buffer.reshape(-1)
+    base = np.arange(n, dtype=np.int64) * largura
+    descarte = base + largura - 1
+
+    plano[base] = ord('R')
+    plano[base + 1] = ord('$')
+    plano[base + 2] = ord(' ')
+    plano[base[negativo] + 3] = ord('-')
+
+    virgula = base + 3 + negativo + qtd_digitos + (qtd_digitos - 1) // 3
+    dezenas, unidades = np.divmod(centavos, 10)
+    plano[virgula] = ord(',')
+    plano[virgula + 1] = dezenas % 10 + _ZERO
+    plano[virgula + 2] = unidades + _ZERO
+
+    resto = inteiros
+    for k in range(int(qtd_digitos.max(initial=1))):
+        tem = k < qtd_digitos
+        posicao = virgula - 1 - k - k // 3
+        resto, digito = np.divmod(resto, 10)
+        plano[np.where(tem, posicao, descarte)] = digito + _ZERO
+        if k and k % 3 == 0:
+            plano[np.where(tem, posicao + 1, descarte)] = ord('.')
+    buffer[:, -1] = 0
+
+    resultado = buffer.view(f'<U{largura}').ravel().astype(object)
+
+    if incerto.any():
+        resultado[incerto] = [formatar_moeda(v) for v in x[incerto]]
+
+    if indice is not None:
+        return pd.Series(resultado, index=indice, dtype=object)
+    return resultado
+
+
+
+
+def formatar_percentual_serie(valores):
+    """Formata percentuais como '{:.1f}%'.format faria em cada valor, sem laço em Python.
+
+    Os décimos são arredondados em lote e o texto é concatenado pelas
+    operações de string do NumPy (`_concatenar`); valores não finitos, muito grandes ou
+    perto de meio décimo (arredondamento ambíguo em float) são formatados
+    um a um. Retorna um array de objetos.
+    """
+    x = np.asarray(valores, dtype='float64')
+    absoluto = np.abs(x)
+    with np.errstate(invalid='ignore'):
+        escalado = absoluto * 10
+        incerto = (
+            ~np.isfinite(x)
+            | (absoluto >= LIMITE_VETORIZADO)
+            | (np.abs(escalado - np.floor(escalado) - 0.5) <= 1e-9 + escalado * 1e-15)
+        )
+    inteiros, decimais = np.divmod(np.where(incerto, 0, np.rint(escalado)).astype(np.int64), 10)
+    texto = _concatenar(inteiros.astype(str), _SUFIXOS_PERCENTUAL[decimais])
+    negativo = np.signbit(x)
+    if negativo.any():
+        # Como no Python, o sinal fica mesmo quando o valor arredonda para zero
+        texto = _concatenar(np.where(negativo, '-', ''), texto)
+
+    resultado = texto.astype(object)
+    if incerto.any():
+        resultado[incerto] = ['{:.1f}%'.format(v) for v in x[incerto]]
+    return resultado
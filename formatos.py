@@ -0,0 +1,234 @@
+import csv
+import io
+import itertools
+import os
+import re
+import zipfile
+from collections import Counter
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional: sem ele o CSV usa o leitor do pandas e Parquet não é aceito
+    pa = None
+    pa_csv = None
+    pq = None
+
+FORMATOS_TABELA = ('csv', 'parquet')
+# Linhas de dados lidas para descobrir o separador decimal dos números
+AMOSTRA_DECIMAL = 1000
+# Número com um único separador seguido de exatamente três dígitos: '1.234' pode ser milhar ou decimal
+_AMBIGUO = re.compile(r'^-?[1-9]\d{0,2}[.,]\d{3}$')
+# Formatos de data aceitos no CSV, além do ISO 8601
+FORMATOS_DATA = ['%d/%m/%Y', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M']
+
+
+def detectar_formato(arquivo, conteudo):
+    """Identifica o formato do upload pela extensão do nome ou, sem ela, pelo conteúdo."""
+    nome = getattr(arquivo, 'name', arquivo if isinstance(arquivo, str) else '')
+    extensao = os.path.splitext(nome)[1].lower().lstrip('.')
+    if extensao in ('xlsx', 'zip', *FORMATOS_TABELA):
+        return extensao
+    if conteudo[:4] == b'PAR1':
+        return 'parquet'
+    if conteudo[:2] == b'PK':
+        return 'xlsx'
+    return 'csv'
+
+
+def _dialeto(conteudo):
+    """Descobre codificação, separador e colunas pelo cabeçalho.
+
+    O separador decimal sugerido é o usual para o separador de campos
+    (vírgula com ';', ponto com ','); `_separador_decimal` o confirma
+    pelos próprios números.
+    """
+    primeira_linha = conteudo.split(b'\n', 1)[0].rstrip(b'\r')
+    try:
+        cabecalho = primeira_linha.decode('utf-8-sig')
+        codificacao = 'utf-8'
+    except UnicodeDecodeError:
+        cabecalho = primeira_linha.decode('latin-1')
+        codificacao = 'latin-1'
+    separador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+    decimal = ',' if separador == ';' else '.'
+    colunas = next(csv.reader([cabecalho], delimiter=separador), [])
+    return codificacao, separador, decimal, colunas
+
+
+def _decimal_do_valor(texto):
+    """Separador decimal que o número em texto indica: ',', '.', None (sem separador) ou '?' (ambíguo)."""
+    texto = texto.strip().replace(' ', '')
+    ultimo = max(texto.rfind(','), texto.rfind('.'))
+    if ultimo < 0:
+        return None
+    marca = texto[ultimo]
+    outra = '.' if marca == ',' else ','
+    if outra in texto or texto.count(marca) == 1 and not _AMBIGUO.match(texto):
+        # O último separador é o decimal quando há os dois ou quando não separa um grupo de milhar
+        return marca
+    if texto.count(marca) > 1:
+        # Repetido, só pode ser o de milhar
+        return outra
+    return '?'
+
+
+def _separador_decimal(conteudo, codificacao, separador, colunas, sugerido):
+    """Separador decimal das colunas numéricas, pelas primeiras linhas de dados.
+
+    Cada valor indica a vírgula ou o ponto pela posição do último
+    separador (ex.: '1.234,56', '1,234.56', '10.5'). Sem nenhum
+    separador nos números, vale o `sugerido`. Se os valores discordarem
+    ou forem todos ambíguos (ex.: só '1.234'), levanta ValueError em vez
+    de arriscar reescrever os dígitos.
+    """
+    if not colunas:
+        return sugerido
+    leitor = csv.reader(
+        io.TextIOWrapper(io.BytesIO(conteudo), encoding='utf-8-sig' if codificacao == 'utf-8' else codificacao),
+        delimiter=separador
+    )
+    cabecalho = next(leitor, [])
+    posicoes = [cabecalho.index(coluna) for coluna in colunas if coluna in cabecalho]
+    indicados = Counter(
+        _decimal_do_valor(linha[posicao])
+        for linha in itertools.islice(leitor, AMOSTRA_DECIMAL)
+        for posicao in posicoes
+        if posicao < len(linha)
+    )
+    decimais = {marca for marca in indicados if marca in (',', '.')}
+    if len(decimais) > 1:
+        raise ValueError(
+            f"Números do CSV com vírgula e ponto como separador decimal ({', '.join(colunas)}); "
+            "padronize o arquivo"
+        )
+    if decimais:
+        return decimais.pop()
+    if indicados['?']:
+        raise ValueError(
+            f"Não foi possível identificar o separador decimal do CSV ({', '.join(colunas)}): "
+            "valores como '1.234' podem ser milhar ou decimal"
+        )
+    return sugerido
+
+
+def _converter_datas(valores):
+    """Converte datas em texto: ISO 8601 primeiro e, no que sobrar, cada formato de FORMATOS_DATA.
+
+    Cada formato é tentado só nos valores que ainda não converteram, para
+    que uma data ISO nunca seja lida com o dia antes do mês.
+    """
+    datas = pd.to_datetime(valores, errors='coerce', format='ISO8601')
+    for formato in FORMATOS_DATA:
+        faltando = datas.isna() & valores.notna()
+        if not faltando.any():
+            break
+        datas[faltando] = pd.to_datetime(valores[faltando], errors='coerce', format=formato)
+    return datas
+
+
+def _converter(df, tipos, decimal):
+    """Converte colunas lidas como texto, com os mesmos tipos do leitor nativo."""
+    for coluna, tipo in tipos.items():
+        if coluna not in df:
+            continue
+        if tipo == 'data':
+            df[coluna] = _converter_datas(df[coluna])
+        elif tipo == 'numero' and not pd.api.types.is_numeric_dtype(df[coluna]):
+            milhar = '.' if decimal == ',' else ','
+            texto = df[coluna].str.strip().str.replace(milhar, '', regex=False)
+            if decimal == ',':
+                texto = texto.str.replace(',', '.', regex=False)
+            df[coluna] = pd.to_numeric(texto, errors='coerce')
+        elif tipo == 'categoria':
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def ler_csv(conteudo, colunas, tipos=None):
+    """Lê só as colunas pedidas (as ausentes são ignoradas) de um CSV.
+
+    `tipos` mapeia colunas para 'data', 'numero' ou 'categoria'. Com o
+    pyarrow, o arquivo é convertido direto para colunas tipadas pelo leitor
+    nativo; se algum valor não converter, as colunas são lidas como texto
+    e convertidas pelo pandas, virando nulas onde forem inválidas.
+    """
+    tipos = tipos or {}
+    codificacao, separador, decimal, cabecalho = _dialeto(conteudo)
+    presentes = [c for c in colunas if c in cabecalho]
+    numericas = [c for c in presentes if tipos.get(c) == 'numero']
+    decimal = _separador_decimal(conteudo, codificacao, separador, numericas, decimal)
+
+    if pa_csv is None:
+        df = pd.read_csv(
+            io.BytesIO(conteudo), sep=separador, decimal=decimal,
+            thousands='.' if decimal == ',' else ',', encoding=codificacao,
+            usecols=presentes
+        )
+        return _converter(df, tipos, decimal)
+
+    tipos_arrow = {
+        'data': pa.timestamp('us'),
+        'numero': pa.float64(),
+        'categoria': pa.dictionary(pa.int32(), pa.string()),
+    }
+
+    def ler(tipos_colunas):
+        return pa_csv.read_csv(
+            io.BytesIO(conteudo),
+            read_options=pa_csv.ReadOptions(encoding=codificacao),
+            parse_options=pa_csv.ParseOptions(delimiter=separador),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=presentes,
+                column_types=tipos_colunas,
+                timestamp_parsers=[pa_csv.ISO8601, *FORMATOS_DATA],
+                decimal_point=decimal,
+            ),
+        ).to_pandas()
+
+    try:
+        return ler({c: tipos_arrow[t] for c, t in tipos.items() if c in presentes})
+    except pa.ArrowInvalid:
+        texto = ler({c: pa.string() for c in tipos if c in presentes})
+        return _converter(texto, tipos, decimal)
+
+
+def ler_parquet(conteudo, colunas):
+    """Lê só as colunas pedidas (as ausentes são ignoradas) de um Parquet."""
+    if pq is None:
+        raise ValueError("Arquivos Parquet exigem o pacote pyarrow instalado")
+    arquivo = pq.ParquetFile(io.BytesIO(conteudo))
+    presentes = [c for c in colunas if c in arquivo.schema_arrow.names]
+    return arquivo.read(columns=presentes).to_pandas()
+
+
+def ler_tabela(conteudo, formato, colunas, tipos=None):
+    """Lê uma tabela CSV ou Parquet com as colunas pedidas."""
+    if formato == 'parquet':
+        return ler_parquet(conteudo, colunas)
+    return ler_csv(conteudo, colunas, tipos)
+
+
+def ler_tabelas_zip(conteudo, tabelas, tipos=None):
+    """Lê de um .zip uma tabela CSV ou Parquet por nome (ex.: metas.csv, Planilha1.parquet).
+
+    `tabelas` mapeia o nome de cada arquivo (sem extensão, sem diferenciar
+    maiúsculas) para as colunas desejadas, como as abas de `ler_abas`.
+    """
+    resultado = {}
+    with zipfile.ZipFile(io.BytesIO(conteudo)) as zf:
+        membros = {}
+        for membro in zf.namelist():
+            nome, extensao = os.path.splitext(os.path.basename(membro))
+            if extensao.lower().lstrip('.') in FORMATOS_TABELA:
+                membros[nome.lower()] = membro
+        for tabela, colunas in tabelas.items():
+            membro = membros.get(tabela.lower())
+            if membro is None:
+                raise ValueError(f"O arquivo .zip não contém a tabela '{tabela}' em CSV ou Parquet")
+            formato = os.path.splitext(membro)[1].lower().lstrip('.')
+            resultado[tabela] = ler_tabela(zf.read(membro), formato, colunas, tipos)
+    return resultado
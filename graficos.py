@@ -0,0 +1,916 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from dados import (
+    COL_VALOR, COL_META_INICIAL, COL_META_ACUMULADO, COL_MES_NUM, COL_NOME_MES, COL_PERIODO, MESES_ABREV,
+    COL_META_MENSAL, COL_PERC_META_MENSAL,
+    COL_DATA, COL_REALIZADO_ACUM, COL_META_ACUM, COL_PROJECAO_ACUM, COL_PROJECAO_MIN, COL_PROJECAO_MAX,
+)
+from figuras import em_cache
+from formatacao import formatar_moeda, formatar_moeda_serie, formatar_percentual_serie
+
+# Pontos enviados ao navegador por série nos gráficos diários
+MAX_PONTOS_SERIE = 500
+
+COLORS = {
+    'primary': '#2563eb',
+    'success': '#10b981',
+    'warning': '#f59e0b',
+    'danger': '#ef4444',
+    'info': '#3b82f6',
+    'neutral': '#64748b',
+    'bg_light': '#f8fafc',
+    'card_bg': '#ffffff',
+    'text_dark': '#0f172a',
+    'text_muted': '#64748b',
+    'border': '#e2e8f0'
+}
+
+
+def classificar_atingimento(valores, metas):
+    """Calcula percentual, cor e rótulo de atingimento de todas as barras de uma vez.
+
+    Metas nulas ou zeradas ficam com 0% e cor neutra; as demais recebem
+    verde (>= 100%), amarelo (>= 70%) ou vermelho.
+    """
+    valores = np.asarray(valores, dtype='float64')
+    metas = np.asarray(metas, dtype='float64')
+    sem_meta = np.isnan(metas) | (metas == 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentual = np.where(sem_meta, 0.0, (valores / metas) * 100)
+    cores = np.select(
+        [sem_meta, percentual >= 100, percentual >= 70],
+        [COLORS['neutral'], COLORS['success'], COLORS['warning']],
+        default=COLORS['danger']
+    )
+    rotulos = formatar_percentual_serie(percentual).tolist()
+    return percentual, cores.tolist(), rotulos
+
+@em_cache
+def criar_pizza_atingimento(valor_real, valor_meta, titulo, mostrar_rotulos=True):
+    """Cria gráfico de pizza mostrando atingimento da meta."""
+    if valor_meta == 0 or pd.isna(valor_meta):
+        return go.Figure().add_annotation(
+            text="Meta não definida",
+            showarrow=False,
+            font=dict(size=16, color=COLORS['text_muted'])
+        )
+    
+    percentual = (valor_real / valor_meta) * 100
+    
+    if valor_real >= valor_meta:
+        labels = ['Meta Atingida', 'Superação']
+        values = [valor_meta, valor_real - valor_meta]
+        colors = [COLORS['success'], COLORS['primary']]
+        center_color = COLORS['success']
+    else:
+        labels = ['Realizado', 'Falta Atingir']
+        values = [valor_real, valor_meta - valor_real]
+        colors = [COLORS['info'], COLORS['border']]
+        center_color = COLORS['warning'] if percentual >= 70 else COLORS['danger']
+    
+    fig = go.Figure(data=[go.Pie(
+        labels=labels,
+        values=values,
+        hole=0.65,
+        marker=dict(colors=colors, line=dict(color='white', width=3)),
+        textinfo='label+percent' if mostrar_rotulos else 'percent',
+        textposition='outside' if mostrar_rotulos else 'auto',
+        textfont=dict(size=15, family='Inter', color=COLORS['text_dark']),
+        hovertemplate='<b>%{label}</b><br>%{value:,.2f}<br>%{percent}<extra></extra>'
+    )])
+    
+    fig.add_annotation(
+        text=f"<b>{percentual:.1f}%</b>",
+        x=0.5, y=0.55,
+        font=dict(size=32, color=center_color, family='Inter'),
+        showarrow=False
+    )
+    
+    fig.add_annotation(
+        text="da Meta",
+        x=0.5, y=0.45,
+        font=dict(size=14, color=COLORS['text_muted'], family='Inter'),
+        showarrow=False
+    )
+    
+    fig.update_layout(
+        title=dict(
+            text=titulo,
+            x=0.5,
+            xanchor='center',
+            font=dict(size=16, color=COLORS['text_dark'], family='Inter', weight=600)
+        ),
+        height=380,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.15,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=12, family='Inter')
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(t=60, b=80, l=20, r=20)
+    )
+    
+    return fig
+
+@em_cache
+def criar_pizza_distribuicao(df, mostrar_rotulos=True):
+    """Cria gráfico de pizza com distribuição por mês."""
+    color_scale = [COLORS['primary'], COLORS['success'], COLORS['info'], 
+                   COLORS['warning'], '#8b5cf6', '#ec4899', '#06b6d4', '#f59e0b']
+    
+    fig = go.Figure(data=[go.Pie(
+        labels=df[COL_NOME_MES],
+        values=df[COL_VALOR],
+        hole=0.5,
+        marker=dict(colors=color_scale[:len(df)], line=dict(color='white', width=2)),
+        textinfo='label+percent' if mostrar_rotulos else 'percent',
+        textposition='outside' if mostrar_rotulos else 'auto',
+        textfont=dict(size=14, family='Inter'),
+        hovertemplate='<b>%{label}</b><br>R$ %{value:,.2f}<br>%{percent}<extra></extra>'
+    )])
+    
+    total = df[COL_VALOR].sum()
+    fig.add_annotation(
+        text=f"<b>Total</b><br>{formatar_moeda(total)}",
+        x=0.5, y=0.5,
+        font=dict(size=14, color=COLORS['text_dark'], family='Inter'),
+        showarrow=False
+    )
+    
+    fig.update_layout(
+        title=dict(
+            text='Distribuição de Faturamento por Mês',
+            x=0.5,
+            xanchor='center',
+            font=dict(size=16, color=COLORS['text_dark'], family='Inter', weight=600)
+        ),
+        height=380,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.15,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=11, family='Inter')
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(t=60, b=80, l=20, r=20)
+    )
+    
+    return fig
+
+@em_cache
+def criar_grafico_barras(df: pd.DataFrame, em_percentual: bool = False, mostrar_rotulos: bool = True) -> go.Figure:
+    """Cria gráfico de barras comparando realizado vs meta."""
+    fig = go.Figure()
+    
+    # Ordenar por mês para garantir ordem correta
+    df = df.sort_values(COL_PERIODO)
+    
+    # Determinar cores e percentuais baseados no atingimento
+    y_valores, cores_barras, rotulos_percentuais = classificar_atingimento(df[COL_VALOR], df[COL_META_INICIAL])
+    
+    if em_percentual:
+        fig.add_trace(go.Bar(
+            x=df[COL_NOME_MES],
+            y=y_valores,
+            name='Atingimento',
+            marker=dict(color=cores_barras, line=dict(color='white', width=1)),
+            text=rotulos_percentuais if mostrar_rotulos else None,
+            textposition='outside' if mostrar_rotulos else None,
+            textfont=dict(size=14, family='Inter', color=COLORS['text_dark']) if mostrar_rotulos else None,
+            hovertemplate='<b>%{x}</b><br>Atingimento: %{y:.1f}%<extra></extra>'
+        ))
+        
+        # Linha de referência em 100%
+        fig.add_hline(
+            y=100,
+            line=dict(color=COLORS['success'], width=2, dash='dash'),
+            annotation=dict(text="Meta (100%)", font=dict(size=11, color=COLORS['success']))
+        )
+        
+        y_title = 'Percentual de Atingimento (%)'
+    else:
+        fig.add_trace(go.Bar(
+            x=df[COL_NOME_MES],
+            y=df[COL_VALOR],
+            name='Realizado',
+            marker=dict(color=cores_barras, line=dict(color='white', width=1)),
+            text=formatar_moeda_serie(df[COL_VALOR]) if mostrar_rotulos else None,
+            textposition='outside' if mostrar_rotulos else None,
+            textfont=dict(size=14, family='Inter', color=COLORS['text_dark']) if mostrar_rotulos else None,
+            hovertemplate='<b>%{x}</b><br>Realizado: R$ %{y:,.2f}<extra></extra>'
+        ))
+        
+        fig.add_trace(go.Scatter(
+            x=df[COL_NOME_MES],
+            y=df[COL_META_INICIAL],
+            name='Meta',
+            mode='lines+markers+text' if mostrar_rotulos else 'lines+markers',
+            line=dict(color=COLORS['primary'], width=3),
+            marker=dict(size=10, color=COLORS['primary'], line=dict(color='white', width=2)),
+            text=formatar_moeda_serie(df[COL_META_INICIAL]) if mostrar_rotulos else None,
+            textposition='top center' if mostrar_rotulos else None,
+            textfont=dict(size=14, family='Inter', color=COLORS['primary']) if mostrar_rotulos else None,
+            hovertemplate='<b>%{x}</b><br>Meta: R$ %{y:,.2f}<extra></extra>'
+        ))
+        
+        y_title = 'Valor (R$)'
+    
+    fig.update_layout(
+        title=dict(
+            text='Desempenho Mensal vs Meta',
+            x=0.5,
+            xanchor='center',
+            font=dict(size=18, color=COLORS['text_dark'], family='Inter', weight=600)
+        ),
+        xaxis=dict(
+            title='Mês',
+            title_font=dict(size=13, color=COLORS['text_dark']),
+            tickfont=dict(size=12, color=COLORS['text_muted']),
+            showgrid=False
+        ),
+        yaxis=dict(
+            title=y_title,
+            title_font=dict(size=13, color=COLORS['text_dark']),
+            tickfont=dict(size=11, color=COLORS['text_muted']),
+            showgrid=True,
+            gridcolor=COLORS['border']
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=420,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.2,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=12, family='Inter')
+        ),
+        margin=dict(t=80, b=60, l=60, r=40),
+        hovermode='x unified'
+    )
+    
+    return fig
+
+@em_cache
+def criar_grafico_cumulativo(df: pd.DataFrame, mostrar_rotulos: bool = True) -> go.Figure:
+    """Cria gráfico de área com evolução cumulativa."""
+    df = df.sort_values(COL_PERIODO).copy()
+    
+    df['Realizado_Acum'] = df[COL_VALOR].cumsum()
+    df['Meta_Acum'] = df[COL_META_ACUMULADO].cumsum()
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=df[COL_NOME_MES],
+        y=df['Realizado_Acum'],
+        name='Realizado Acumulado',
+        mode='lines+markers+text' if mostrar_rotulos else 'lines',
+        line=dict(color=COLORS['success'], width=3),
+        marker=dict(size=8, color=COLORS['success']) if mostrar_rotulos else None,
+        fill='tozeroy',
+        fillcolor=f"rgba(16, 185, 129, 0.15)",
+        text=formatar_moeda_serie(df['Realizado_Acum']) if mostrar_rotulos else None,
+        textposition='top center' if mostrar_rotulos else None,
+        textfont=dict(size=14, family='Inter', color=COLORS['success']) if mostrar_rotulos else None,
+        hovertemplate='<b>%{x}</b><br>Acumulado: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=df[COL_NOME_MES],
+        y=df['Meta_Acum'],
+        name='Meta Acumulada',
+        mode='lines+markers+text' if mostrar_rotulos else 'lines+markers',
+        line=dict(color=COLORS['primary'], width=3, dash='dot'),
+        marker=dict(size=8, color=COLORS['primary']),
+        text=formatar_moeda_serie(df['Meta_Acum']) if mostrar_rotulos else None,
+        textposition='bottom center' if mostrar_rotulos else None,
+        textfont=dict(size=14, family='Inter', color=COLORS['primary']) if mostrar_rotulos else None,
+        hovertemplate='<b>%{x}</b><br>Meta: R$ %{y:,.2f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=dict(
+            text='Evolução Acumulada no Ano',
+            x=0.5,
+            xanchor='center',
+            font=dict(size=18, color=COLORS['text_dark'], family='Inter', weight=600)
+        ),
+        xaxis=dict(
+            title='Mês',
+            title_font=dict(size=13, color=COLORS['text_dark']),
+            tickfont=dict(size=12, family='Inter'),
+            showgrid=False
+        ),
+        yaxis=dict(
+            title='Valor Acumulado (R$)',
+            title_font=dict(size=13, color=COLORS['text_dark']),
+            tickformat=',.0f',
+            tickfont=dict(size=11, family='Inter'),
+            showgrid=True,
+            gridcolor='rgba(0,0,0,0.05)'
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=420,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.2,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=12, family='Inter')
+        ),
+        margin=dict(t=80, b=60, l=60, r=40),
+        hovermode='x unified'
+    )
+    
+    return fig
+
+def reduzir_serie(x, y, max_pontos=MAX_PONTOS_SERIE):
+    """Escolhe até `max_pontos` pontos que preservam a forma da série (LTTB).
+
+    Largest-Triangle-Three-Buckets: mantém o primeiro e o último ponto e,
+    em cada faixa intermediária, o ponto que forma o maior triângulo com o
+    ponto escolhido antes e a média da faixa seguinte. Picos e quebras de
+    tendência sobrevivem, e o navegador recebe só os pontos escolhidos.
+    Retorna as posições escolhidas, em ordem.
+    """
+    n = len(y)
+    if n <= max_pontos or max_pontos < 3:
+        return np.arange(n)
+    xs = np.asarray(x).astype('float64')
+    ys = np.asarray(y, dtype='float64')
+
+    limites = np.linspace(1, n - 1, max_pontos - 1).astype(np.intp)
+    escolhidos = np.empty(max_pontos, dtype=np.intp)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(max_pontos - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        seguinte = slice(fim, limites[i + 2]) if i + 2 < len(limites) else slice(n - 1, n)
+        media_x, media_y = xs[seguinte].mean(), ys[seguinte].mean()
+        area = np.abs(
+            (xs[anterior] - media_x) * (ys[inicio:fim] - ys[anterior])
+            - (xs[anterior] - xs[inicio:fim]) * (media_y - ys[anterior])
+        )
+        anterior = escolhidos[i + 1] = inicio + int(np.argmax(area))
+    return escolhidos
+
+
+def agregar_barras(y, max_pontos=MAX_PONTOS_SERIE):
+    """Soma a série em até `max_pontos` faixas de pontos consecutivos, do mesmo tamanho.
+
+    Para barras, que não podem perder pontos como as linhas do LTTB: o
+    total das faixas é o total da série. Retorna a posição do primeiro e
+    do último ponto de cada faixa e a soma dela.
+    """
+    n = len(y)
+    tamanho = max(-(-n // max_pontos), 1)
+    inicios = np.arange(0, n, tamanho)
+    fins = np.minimum(inicios + tamanho, n) - 1
+    somas = np.add.reduceat(np.asarray(y, dtype='float64'), inicios) if n else np.empty(0)
+    return inicios, fins, somas
+
+
+@em_cache
+def criar_grafico_ritmo(df: pd.DataFrame, titulo: str, mostrar_rotulos: bool = True) -> go.Figure:
+    """Cria gráfico do ritmo diário (ou semanal): acumulados contra a meta proporcional.
+
+    Cada série vai ao navegador com até MAX_PONTOS_SERIE pontos: os
+    acumulados reduzidos por LTTB e o realizado do período, em barras no
+    eixo da direita, somado em faixas de dias seguidos (sem perder vendas).
+    """
+    datas = df[COL_DATA].to_numpy()
+    tempo = datas.astype('datetime64[ns]').view('int64')
+    
+    def serie(coluna):
+        posicoes = reduzir_serie(tempo, df[coluna].to_numpy())
+        return datas[posicoes], df[coluna].to_numpy()[posicoes]
+    
+    fig = go.Figure()
+    
+    inicios, fins, somas = agregar_barras(df[COL_VALOR].to_numpy())
+    agregado = len(somas) < len(df)
+    fig.add_trace(go.Bar(
+        x=datas[inicios],
+        y=somas,
+        customdata=datas[fins],
+        name='Realizado no Período',
+        marker=dict(color='rgba(100, 116, 139, 0.35)'),
+        yaxis='y2',
+        hovertemplate=(
+            '<b>%{x|%d/%m/%Y} a %{customdata|%d/%m/%Y}</b>' if agregado else '<b>%{x|%d/%m/%Y}</b>'
+        ) + '<br>Realizado: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    x, y = serie(COL_REALIZADO_ACUM)
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        name='Realizado Acumulado',
+        mode='lines+text' if mostrar_rotulos else 'lines',
+        line=dict(color=COLORS['success'], width=3),
+        fill='tozeroy',
+        fillcolor="rgba(16, 185, 129, 0.15)",
+        # Só o total final ganha rótulo: com centenas de pontos os demais se sobreporiam
+        text=[''] * (len(y) - 1) + formatar_moeda_serie(y[-1:]).tolist() if mostrar_rotulos and len(y) else None,
+        textposition='top left' if mostrar_rotulos else None,
+        textfont=dict(size=14, family='Inter', color=COLORS['success']) if mostrar_rotulos else None,
+        hovertemplate='<b>%{x|%d/%m/%Y}</b><br>Acumulado: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    x, y = serie(COL_META_ACUM)
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        name='Meta Proporcional Acumulada',
+        mode='lines+text' if mostrar_rotulos else 'lines',
+        line=dict(color=COLORS['primary'], width=3, dash='dot'),
+        text=[''] * (len(y) - 1) + formatar_moeda_serie(y[-1:]).tolist() if mostrar_rotulos and len(y) else None,
+        textposition='bottom left' if mostrar_rotulos else None,
+        textfont=dict(size=14, family='Inter', color=COLORS['primary']) if mostrar_rotulos else None,
+        hovertemplate='<b>%{x|%d/%m/%Y}</b><br>Meta: R$ %{y:,.2f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=dict(
+            text=titulo,
+            x=0.5,
+            xanchor='center',
+            font=dict(size=18, color=COLORS['text_dark'], family='Inter', weight=600)
+        ),
+        xaxis=dict(
+            title='Data',
+            title_font=dict(size=13, color=COLORS['text_dark']),
+            tickfont=dict(size=12, family='Inter'),
+            tickformat='%d/%m/%y',
+            showgrid=False
+        ),
+        yaxis=dict(
+            title='Valor Acumulado (R$)',
+            title_font=dict(size=13, color=COLORS['text_dark']),
+            tickformat=',.0f',
+            tickfont=dict(size=11, family='Inter'),
+            showgrid=True,
+            gridcolor='rgba(0,0,0,0.05)'
+        ),
+        yaxis2=dict(
+            title='Realizado no Período (R$)',
+            title_font=dict(size=13, color=COLORS['text_muted']),
+            tickformat=',.0f',
+            tickfont=dict(size=11, family='Inter', color=COLORS['text_muted']),
+            overlaying='y',
+            side='right',
+            showgrid=False
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=420,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.25,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=12, family='Inter')
+        ),
+        margin=dict(t=80, b=60, l=60, r=60),
+        hovermode='x unified'
+    )
+    
+    return fig
+
+@em_cache
+def criar_grafico_projecao(df: pd.DataFrame, titulo: str, mostrar_rotulos: bool = True) -> go.Figure:
+    """Cria gráfico do acumulado no ano com a projeção até dezembro e seu intervalo.
+
+    Recebe a saída de `projetar_geral`: o realizado vai até o mês atual e
+    a projeção (com a faixa do intervalo) segue dele até o fim do ano,
+    contra a meta acumulada.
+    """
+    df = df.sort_values(COL_PERIODO)
+    realizado = df[df[COL_VALOR].notna()]
+    # A projeção parte do último mês realizado para a linha não ficar solta
+    futuro = df.iloc[max(len(realizado) - 1, 0):]
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=futuro[COL_NOME_MES],
+        y=futuro[COL_PROJECAO_MAX],
+        name='Intervalo',
+        mode='lines',
+        line=dict(width=0),
+        showlegend=False,
+        hovertemplate='<b>%{x}</b><br>Máximo: R$ %{y:,.2f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=futuro[COL_NOME_MES],
+        y=futuro[COL_PROJECAO_MIN],
+        name=f"Intervalo ({df.attrs.get('confianca', 0.8):.0%})",
+        mode='lines',
+        line=dict(width=0),
+        fill='tonexty',
+        fillcolor='rgba(245, 158, 11, 0.18)',
+        hovertemplate='<b>%{x}</b><br>Mínimo: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=futuro[COL_NOME_MES],
+        y=futuro[COL_PROJECAO_ACUM],
+        name='Projeção Acumulada',
+        mode='lines+markers+text' if mostrar_rotulos else 'lines+markers',
+        line=dict(color=COLORS['warning'], width=3, dash='dash'),
+        marker=dict(size=7, color=COLORS['warning']),
+        text=[''] * (len(futuro) - 1) + formatar_moeda_serie(futuro[COL_PROJECAO_ACUM].tail(1)).tolist()
+        if mostrar_rotulos and len(futuro) else None,
+        textposition='top left' if mostrar_rotulos else None,
+        textfont=dict(size=14, family='Inter', color=COLORS['warning']) if mostrar_rotulos else None,
+        hovertemplate='<b>%{x}</b><br>Projeção: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    realizado_acum = realizado[COL_VALOR].cumsum()
+    fig.add_trace(go.Scatter(
+        x=realizado[COL_NOME_MES],
+        y=realizado_acum,
+        name='Realizado Acumulado',
+        mode='lines+markers',
+        line=dict(color=COLORS['success'], width=3),
+        marker=dict(size=8, color=COLORS['success']),
+        fill='tozeroy',
+        fillcolor="rgba(16, 185, 129, 0.15)",
+        hovertemplate='<b>%{x}</b><br>Acumulado: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=df[COL_NOME_MES],
+        y=df[COL_META_ACUM],
+        name='Meta Acumulada',
+        mode='lines+markers+text' if mostrar_rotulos else 'lines+markers',
+        line=dict(color=COLORS['primary'], width=3, dash='dot'),
+        marker=dict(size=7, color=COLORS['primary']),
+        text=[''] * (len(df) - 1) + formatar_moeda_serie(df[COL_META_ACUM].tail(1)).tolist()
+        if mostrar_rotulos and len(df) else None,
+        textposition='bottom left' if mostrar_rotulos else None,
+        textfont=dict(size=14, family='Inter', color=COLORS['primary']) if mostrar_rotulos else None,
+        hovertemplate='<b>%{x}</b><br>Meta: R$ %{y:,.2f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=dict(
+            text=titulo,
+            x=0.5,
+            xanchor='center',
+            font=dict(size=18, color=COLORS['text_dark'], family='Inter', weight=600)
+        ),
+        xaxis=dict(
+            title='Mês',
+            title_font=dict(size=13, color=COLORS['text_dark']),
+            tickfont=dict(size=12, family='Inter'),
+            categoryorder='array',
+            categoryarray=df[COL_NOME_MES].tolist(),
+            showgrid=False
+        ),
+        yaxis=dict(
+            title='Valor Acumulado (R$)',
+            title_font=dict(size=13, color=COLORS['text_dark']),
+            tickformat=',.0f',
+            tickfont=dict(size=11, family='Inter'),
+            showgrid=True,
+            gridcolor='rgba(0,0,0,0.05)'
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=420,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.25,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=12, family='Inter')
+        ),
+        margin=dict(t=80, b=60, l=60, r=40),
+        hovermode='x unified'
+    )
+    
+    return fig
+
+@em_cache
+def criar_grafico_barras_acumulado(df: pd.DataFrame, em_percentual: bool = False, mostrar_rotulos: bool = True) -> go.Figure:
+    """Cria gráfico de barras comparando realizado vs meta acumulada."""
+    fig = go.Figure()
+    
+    # Ordenar por mês para garantir ordem correta
+    df = df.sort_values(COL_PERIODO)
+    
+    # Determinar cores e percentuais baseados no atingimento
+    y_valores, cores_barras, rotulos_percentuais = classificar_atingimento(df[COL_VALOR], df[COL_META_ACUMULADO])
+    
+    if em_percentual:
+        fig.add_trace(go.Bar(
+            x=df[COL_NOME_MES],
+            y=y_valores,
+            name='Atingimento',
+            marker=dict(color=cores_barras, line=dict(color='white', width=1)),
+            text=rotulos_percentuais if mostrar_rotulos else None,
+            textposition='outside' if mostrar_rotulos else None,
+            textfont=dict(size=14, family='Inter', color=COLORS['text_dark']) if mostrar_rotulos else None,
+            hovertemplate='<b>%{x}</b><br>Atingimento: %{y:.1f}%<extra></extra>'
+        ))
+        
+        # Linha de referência em 100%
+        fig.add_hline(
+            y=100,
+            line=dict(color=COLORS['success'], width=2, dash='dash'),
+            annotation=dict(text="Meta (100%)", font=dict(size=11, color=COLORS['success']))
+        )
+        
+        y_title = 'Percentual de Atingimento (%)'
+    else:
+        fig.add_trace(go.Bar(
+            x=df[COL_NOME_MES],
+            y=df[COL_VALOR],
+            name='Realizado',
+            marker=dict(color=cores_barras, line=dict(color='white', width=1)),
+            text=formatar_moeda_serie(df[COL_VALOR]) if mostrar_rotulos else None,
+            textposition='outside' if mostrar_rotulos else None,
+            textfont=dict(size=14, family='Inter', color=COLORS['text_dark']) if mostrar_rotulos else None,
+            hovertemplate='<b>%{x}</b><br>Realizado: R$ %{y:,.2f}<extra></extra>'
+        ))
+        
+        fig.add_trace(go.Scatter(
+            x=df[COL_NOME_MES],
+            y=df[COL_META_ACUMULADO],
+            name='Meta Acumulada (Ajustada)',
+            mode='lines+markers+text' if mostrar_rotulos else 'lines+markers',
+            line=dict(color=COLORS['warning'], width=3),
+            marker=dict(size=10, color=COLORS['warning'], line=dict(color='white', width=2)),
+            text=formatar_moeda_serie(df[COL_META_ACUMULADO]) if mostrar_rotulos else None,
+            textposition='top center' if mostrar_rotulos else None,
+            textfont=dict(size=14, family='Inter', color=COLORS['warning']) if mostrar_rotulos else None,
+            hovertemplate='<b>%{x}</b><br>Meta Acumulada: R$ %{y:,.2f}<extra></extra>'
+        ))
+        
+        y_title = 'Valor (R$)'
+    
+    fig.update_layout(
+        title=dict(
+            text='Desempenho Mensal vs Meta Acumulada (Ajustada)',
+            x=0.5,
+            xanchor='center',
+            font=dict(size=18, color=COLORS['text_dark'], family='Inter', weight=600)
+        ),
+        xaxis=dict(
+            title='Mês',
+            title_font=dict(size=13, color=COLORS['text_dark']),
+            tickfont=dict(size=12, color=COLORS['text_muted']),
+            showgrid=False
+        ),
+        yaxis=dict(
+            title=y_title,
+            title_font=dict(size=13, color=COLORS['text_dark']),
+            tickfont=dict(size=11, color=COLORS['text_muted']),
+            showgrid=True,
+            gridcolor=COLORS['border']
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=420,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.2,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=12, family='Inter')
+        ),
+        margin=dict(t=80, b=60, l=60, r=40),
+        hovermode='x unified'
+    )
+    
+    return fig
+
+def gerar_insights(indicadores):
+    """Gera os insights de uma linha de `dados.montar_insights` (a visão geral ou um vendedor)."""
+    insights = []
+
+    # Análise de atingimento geral
+    total_vendas, total_meta = indicadores[COL_VALOR], indicadores[COL_META_MENSAL]
+    if total_meta > 0:
+        perc_total = indicadores[COL_PERC_META_MENSAL]
+        if perc_total >= 100:
+            insights.append({
+                'tipo': 'success',
+                'titulo': '🎯 Meta Atingida!',
+                'texto': f'Parabéns! Você atingiu {perc_total:.1f}% da meta total, superando em {formatar_moeda(total_vendas - total_meta)}.'
+            })
+        elif perc_total >= 70:
+            falta = total_meta - total_vendas
+            insights.append({
+                'tipo': 'warning',
+                'titulo': '⚡ Quase lá!',
+                'texto': f'Você está em {perc_total:.1f}% da meta. Faltam {formatar_moeda(falta)} para atingir o objetivo.'
+            })
+        else:
+            insights.append({
+                'tipo': 'danger',
+                'titulo': '📊 Atenção Necessária',
+                'texto': f'O atingimento atual é de {perc_total:.1f}%. Revise a estratégia para melhorar os resultados.'
+            })
+
+    # Análise de tendência (último mês com vendas contra o anterior)
+    variacao = indicadores['Variacao_Ultimo']
+    if pd.notna(variacao):
+        if variacao > 0:
+            insights.append({
+                'tipo': 'success',
+                'titulo': '📈 Tendência Positiva',
+                'texto': f'Crescimento de {variacao:.1f}% em {indicadores["Mes_Ultimo"]} em relação a {indicadores["Mes_Penultimo"]}.'
+            })
+        else:
+            insights.append({
+                'tipo': 'warning',
+                'titulo': '📉 Atenção à Queda',
+                'texto': f'Redução de {-variacao:.1f}% em {indicadores["Mes_Ultimo"]} em relação a {indicadores["Mes_Penultimo"]}. Considere ações corretivas.'
+            })
+
+    # Sequência de meses com a meta mensal batida (ou não) até o último mês
+    if indicadores['Sequencia_Meta'] >= 2:
+        insights.append({
+            'tipo': 'success',
+            'titulo': '🔥 Sequência de Metas',
+            'texto': f'Meta mensal batida nos últimos {indicadores["Sequencia_Meta"]} meses seguidos.'
+        })
+    elif indicadores['Sequencia_Abaixo'] >= 2:
+        maior = indicadores['Maior_Sequencia_Meta']
+        complemento = f' A maior sequência no período foi de {maior} meses.' if maior >= 2 else ''
+        insights.append({
+            'tipo': 'danger',
+            'titulo': '⚠️ Metas em Aberto',
+            'texto': f'Meta mensal não atingida nos últimos {indicadores["Sequencia_Abaixo"]} meses seguidos.{complemento}'
+        })
+
+    # Melhor mês
+    if pd.notna(indicadores['Melhor_Mes']):
+        insights.append({
+            'tipo': 'info',
+            'titulo': '🏆 Melhor Performance',
+            'texto': f'{indicadores["Melhor_Mes"]} foi o melhor mês com {formatar_moeda(indicadores["Melhor_Valor"])} em vendas.'
+        })
+
+    # Maior queda entre meses seguidos com vendas
+    if pd.notna(indicadores['Maior_Queda']):
+        insights.append({
+            'tipo': 'neutral',
+            'titulo': '🔻 Maior Queda',
+            'texto': f'De {indicadores["Mes_Antes_Queda"]} para {indicadores["Mes_Maior_Queda"]} as vendas caíram '
+                     f'{formatar_moeda(indicadores["Maior_Queda"])} ({indicadores["Maior_Queda_Perc"]:.1f}%).'
+        })
+
+    return insights
+
+@em_cache
+def criar_heatmap_faturamento(df):
+    """Cria mapa de calor mostrando intensidade de faturamento por mês.
+
+    Com mais de um ano, cada ano vira uma linha, para comparar os mesmos
+    meses entre anos.
+    """
+    # Preparar dados
+    df_sorted = df.sort_values(COL_PERIODO).copy()
+    anos = df_sorted[COL_PERIODO] // 100
+    
+    if anos.nunique() > 1:
+        # Matriz anos x meses; meses sem vendas num ano ficam vazios
+        matriz = df_sorted.pivot_table(index=anos, columns=COL_MES_NUM, values=COL_VALOR, aggfunc='sum')
+        valores = matriz.to_numpy()
+        meses = [MESES_ABREV[mes] for mes in matriz.columns]
+        linhas = [str(ano) for ano in matriz.index]
+        texto_hover = [
+            ['' if np.isnan(v) else texto for v, texto in zip(linha, formatar_moeda_serie(linha))]
+            for linha in valores
+        ]
+    else:
+        # Criar matriz para heatmap (1 linha com todos os meses)
+        valores = df_sorted[COL_VALOR].values.reshape(1, -1)
+        meses = df_sorted[COL_NOME_MES].values
+        linhas = ['Faturamento']
+        
+        # Criar texto para hover (matriz 1 x meses, como os valores)
+        texto_hover = [formatar_moeda_serie(df_sorted[COL_VALOR]).tolist()]
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=valores,
+        x=meses,
+        y=linhas,
+        colorscale=[
+            [0, '#e0e7ff'],      # Azul muito claro
+            [0.25, '#c7d2fe'],   # Azul claro
+            [0.5, '#818cf8'],    # Azul médio
+            [0.75, '#6366f1'],   # Azul
+            [1, '#4f46e5']       # Azul escuro
+        ],
+        text=texto_hover,
+        texttemplate='%{text}',
+        textfont=dict(size=13, color='white', family='Inter', weight=600),
+        hovertemplate='<b>%{x}</b><br>Faturamento: %{text}<extra></extra>',
+        showscale=True,
+        colorbar=dict(
+            title="Valor (R$)",
+            tickformat=",.0f",
+            len=0.7,
+            thickness=15
+        )
+    ))
+    
+    fig.update_layout(
+        title=dict(
+            text='Mapa de Calor - Intensidade de Faturamento',
+            x=0.5,
+            xanchor='center',
+            font=dict(size=16, color=COLORS['text_dark'], family='Inter', weight=600)
+        ),
+        height=200 + 40 * (len(linhas) - 1),
+        xaxis=dict(
+            title='',
+            tickfont=dict(size=12, family='Inter'),
+            showgrid=False
+        ),
+        yaxis=dict(
+            title='',
+            showticklabels=len(linhas) > 1,
+            showgrid=False
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=20, r=100, t=50, b=50),
+        font=dict(family='Inter', size=12, color=COLORS['text_dark'])
+    )
+    
+    return fig
+
+@em_cache
+def criar_histograma_faturamento(df):
+    """Cria histograma mostrando distribuição de valores de faturamento."""
+    df_sorted = df.sort_values(COL_PERIODO).copy()
+    
+    fig = go.Figure(data=[go.Bar(
+        x=df_sorted[COL_NOME_MES],
+        y=df_sorted[COL_VALOR],
+        marker=dict(
+            color=df_sorted[COL_VALOR],
+            colorscale='Blues',
+            showscale=False,
+            line=dict(color='white', width=2)
+        ),
+        text=formatar_moeda_serie(df_sorted[COL_VALOR]),
+        textposition='outside',
+        textfont=dict(size=13, color=COLORS['text_dark'], family='Inter', weight=600),
+        hovertemplate='<b>%{x}</b><br>Faturamento: R$ %{y:,.2f}<extra></extra>'
+    )])
+    
+    fig.update_layout(
+        title=dict(
+            text='Histograma - Valores de Faturamento por Mês',
+            x=0.5,
+            xanchor='center',
+            font=dict(size=16, color=COLORS['text_dark'], family='Inter', weight=600)
+        ),
+        height=380,
+        xaxis=dict(
+            title='Mês',
+            tickfont=dict(size=12, family='Inter'),
+            showgrid=False
+        ),
+        yaxis=dict(
+            title='Faturamento (R$)',
+            tickformat=',.0f',
+            tickfont=dict(size=12, family='Inter'),
+            showgrid=True,
+            gridcolor='rgba(0,0,0,0.05)'
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(t=60, b=60, l=80, r=40)
+    )
+    
+    return fig
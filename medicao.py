@@ -0,0 +1,112 @@
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # resource só existe em sistemas Unix
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Arquivo JSON Lines onde cada rerun medido é acrescentado, para agregar entre sessões e processos
+ARQUIVO_LOG = os.environ.get('DASHBOARD_MEDICAO_LOG')
+if ARQUIVO_LOG:
+    _handler = logging.FileHandler(ARQUIVO_LOG, encoding='utf-8')
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# A medição do rerun em andamento; cada rerun do Streamlit roda na sua própria thread
+_atual = threading.local()
+
+
+def memoria_processo():
+    """Memória residente (RSS) do processo em bytes, ou None se não houver como medir."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # Sem /proc só há o pico de memória (em KB no Linux, em bytes no macOS)
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if os.uname().sysname == 'Darwin' else pico * 1024
+    return None
+
+
+class Medicao:
+    """Tempo e memória das etapas de um rerun, na ordem em que terminaram.
+
+    A memória é a variação da RSS do processo durante a etapa; como o
+    processo é compartilhado por todas as sessões (e pelas threads de
+    carregamento), é uma indicação, não uma medida exata da etapa.
+    """
+
+    def __init__(self, sessao=None):
+        self.sessao = sessao
+        self.data = datetime.now().isoformat(timespec='milliseconds')
+        self.etapas = []
+        self._inicio = time.perf_counter()
+        self._memoria_inicial = memoria_processo()
+        self.segundos = None
+        self.memoria_final = None
+
+    def registrar(self, etapa, segundos, memoria_delta, **extras):
+        self.etapas.append({'etapa': etapa, 'segundos': segundos, 'memoria_delta': memoria_delta, **extras})
+
+    def encerrar(self):
+        """Fecha a medição com o tempo total do rerun e grava a linha de log estruturado."""
+        self.segundos = time.perf_counter() - self._inicio
+        self.memoria_final = memoria_processo()
+        logger.info(json.dumps(self.como_dict(), ensure_ascii=False, default=str))
+        return self
+
+    def como_dict(self):
+        return {
+            'data': self.data,
+            'sessao': self.sessao,
+            'pid': os.getpid(),
+            'segundos': self.segundos,
+            'memoria_inicial': self._memoria_inicial,
+            'memoria_final': self.memoria_final,
+            'etapas': self.etapas,
+        }
+
+
+def iniciar(sessao=None):
+    """Começa a medir o rerun da thread atual."""
+    _atual.medicao = Medicao(sessao)
+    return _atual.medicao
+
+
+def encerrar():
+    """Encerra e retorna a medição do rerun da thread atual (None se não houver)."""
+    medicao = getattr(_atual, 'medicao', None)
+    _atual.medicao = None
+    return medicao.encerrar() if medicao is not None else None
+
+
+@contextlib.contextmanager
+def etapa(nome, **extras):
+    """Mede o bloco como uma etapa do rerun atual; fora de um rerun medido, não faz nada.
+
+    Retorna um dicionário em que o bloco pode acrescentar informações à
+    etapa (ex.: se a figura veio do cache).
+    """
+    medicao = getattr(_atual, 'medicao', None)
+    if medicao is None:
+        yield extras
+        return
+    memoria = memoria_processo()
+    inicio = time.perf_counter()
+    try:
+        yield extras
+    finally:
+        segundos = time.perf_counter() - inicio
+        memoria_delta = None if memoria is None else memoria_processo() - memoria
+        medicao.registrar(nome, segundos, memoria_delta, **extras)
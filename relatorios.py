@@ -0,0 +1,197 @@
+"""Exporta os indicadores e gráficos do dashboard para arquivos, sem o Streamlit.
+
+Uso: python relatorios.py VENDAS METAS DESTINO [--formato html|png|svg|pdf]
+     [--de AAAA-MM] [--ate AAAA-MM] [--processos N] [--sem-rotulos] [--percentual]
+
+Grava em DESTINO o arquivo kpis.csv (visão geral e um vendedor por linha),
+os gráficos da visão geral em geral/ e os de cada vendedor em
+vendedores/<nome>/. Os relatórios dos vendedores são gerados em paralelo
+por um pool de processos. Imagens (png, svg, pdf) exigem o pacote kaleido.
+"""
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from dados import (
+    COL_VENDEDOR, COL_VALOR, COL_CONTAGEM, COL_META_INICIAL, COL_META_MENSAL,
+    COL_PERC_META_MENSAL, COL_PERC_META_INICIAL, COL_TICKET_MEDIO, ROTULO_GERAL,
+    carregar_e_processar_dados, obter_cubo, periodo, consolidar_meses, consolidar_vendedor, resumir_vendedores
+)
+from graficos import (
+    criar_pizza_atingimento, criar_pizza_distribuicao, criar_grafico_barras, criar_grafico_cumulativo,
+    criar_grafico_barras_acumulado, criar_heatmap_faturamento, criar_histograma_faturamento
+)
+
+FORMATOS_FIGURA = ('html', 'png', 'svg', 'pdf')
+ARQUIVO_KPIS = 'kpis.csv'
+
+# Mesmos rótulos do ranking do dashboard
+ROTULOS_KPIS = {
+    COL_VENDEDOR: 'Vendedor', COL_VALOR: 'Faturamento', COL_PERC_META_MENSAL: 'vs Meta Mensal',
+    COL_PERC_META_INICIAL: 'vs Meta Inicial', COL_TICKET_MEDIO: 'Ticket Médio', COL_CONTAGEM: 'Pedidos',
+    COL_META_MENSAL: 'Meta Mensal', COL_META_INICIAL: 'Meta Inicial',
+}
+# Casas decimais das colunas do kpis.csv: valores em reais e percentuais como no dashboard
+CASAS_KPIS = {
+    COL_VALOR: 2, COL_TICKET_MEDIO: 2, COL_META_MENSAL: 2, COL_META_INICIAL: 2,
+    COL_PERC_META_MENSAL: 1, COL_PERC_META_INICIAL: 1,
+}
+
+
+def _nome_arquivo(texto):
+    """Nome seguro para arquivo ou pasta a partir de um texto qualquer (ex.: nome do vendedor)."""
+    return re.sub(r'[^\w.-]+', '_', str(texto)).strip('._') or '_'
+
+
+def _periodo_argumento(texto):
+    """Converte 'AAAA-MM' da linha de comando na chave de período."""
+    try:
+        ano, mes = (int(parte) for parte in texto.split('-'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Período inválido '{texto}'; use AAAA-MM") from None
+    if not 1 <= mes <= 12:
+        raise argparse.ArgumentTypeError(f"Mês inválido em '{texto}'")
+    return periodo(ano, mes)
+
+
+def _gravar_figuras(figuras, pasta, formato):
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = []
+    for nome, fig in figuras.items():
+        caminho = os.path.join(pasta, f"{nome}.{formato}")
+        if formato == 'html':
+            fig.write_html(caminho, include_plotlyjs='cdn')
+        else:
+            fig.write_image(caminho)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def figuras_geral(df_consolidado, mostrar_rotulos=True, em_percentual=False):
+    """Gráficos da visão geral, na ordem do dashboard."""
+    total_vendas = df_consolidado[COL_VALOR].sum()
+    return {
+        'pizza_meta_inicial': criar_pizza_atingimento(
+            total_vendas, df_consolidado[COL_META_INICIAL].sum(), "Vs Meta Inicial", mostrar_rotulos
+        ),
+        'pizza_meta_mensal': criar_pizza_atingimento(
+            total_vendas, df_consolidado[COL_META_MENSAL].sum(), "Vs Meta Mensal", mostrar_rotulos
+        ),
+        'distribuicao': criar_pizza_distribuicao(df_consolidado, mostrar_rotulos),
+        'heatmap': criar_heatmap_faturamento(df_consolidado),
+        'histograma': criar_histograma_faturamento(df_consolidado),
+        'barras': criar_grafico_barras(df_consolidado, em_percentual, mostrar_rotulos),
+        'barras_acumulado': criar_grafico_barras_acumulado(df_consolidado, em_percentual, mostrar_rotulos),
+        'cumulativo': criar_grafico_cumulativo(df_consolidado, mostrar_rotulos),
+    }
+
+
+def figuras_vendedor(df_vendedor, vendedor, mostrar_rotulos=True):
+    """Gráficos da análise individual de um vendedor, como no dashboard."""
+    return {
+        'atingimento': criar_pizza_atingimento(
+            df_vendedor[COL_VALOR].sum(), df_vendedor[COL_META_MENSAL].sum(),
+            f"Atingimento - {vendedor}", mostrar_rotulos
+        ),
+        'distribuicao': criar_pizza_distribuicao(df_vendedor, mostrar_rotulos),
+    }
+
+
+def _exportar_vendedor(df_vendedor, vendedor, pasta, formato, mostrar_rotulos):
+    """Tarefa de um processo do pool: grava os gráficos de um vendedor."""
+    return _gravar_figuras(figuras_vendedor(df_vendedor, vendedor, mostrar_rotulos), pasta, formato)
+
+
+def calcular_kpis(df_consolidado, df_resumo):
+    """Indicadores da visão geral (primeira linha) seguidos dos de cada vendedor."""
+    total_vendas = df_consolidado[COL_VALOR].sum()
+    meta_mensal = df_consolidado[COL_META_MENSAL].sum()
+    meta_inicial = df_consolidado[COL_META_INICIAL].sum()
+    pedidos = df_consolidado[COL_CONTAGEM].sum()
+    geral = pd.DataFrame([{
+        COL_VENDEDOR: ROTULO_GERAL,
+        COL_VALOR: total_vendas,
+        COL_PERC_META_MENSAL: total_vendas / meta_mensal * 100 if meta_mensal > 0 else None,
+        COL_PERC_META_INICIAL: total_vendas / meta_inicial * 100 if meta_inicial > 0 else None,
+        COL_TICKET_MEDIO: total_vendas / pedidos if pedidos > 0 else 0,
+        COL_CONTAGEM: pedidos,
+        COL_META_MENSAL: meta_mensal,
+        COL_META_INICIAL: meta_inicial,
+    }])
+    return pd.concat([geral, df_resumo[list(ROTULOS_KPIS)]], ignore_index=True).round(CASAS_KPIS)
+
+
+def exportar_relatorios(arq_vendas, arq_metas, destino, formato='html', inicio=None, fim=None,
+                        processos=None, mostrar_rotulos=True, em_percentual=False):
+    """Grava os indicadores e os gráficos da visão geral e de todos os vendedores.
+
+    Os dados são carregados por `carregar_e_processar_dados` (com os
+    mesmos snapshots do dashboard). `inicio` e `fim` (períodos ano * 100 +
+    mês) limitam a visão geral e os indicadores dos vendedores, como o
+    filtro da barra lateral e o ranking; os gráficos de cada vendedor usam
+    todos os períodos, como na análise individual. Com
+    `processos=1` tudo roda no processo atual. Retorna os caminhos gravados.
+    """
+    if formato not in FORMATOS_FIGURA:
+        raise ValueError(f"Formato '{formato}' não suportado; use um de {', '.join(FORMATOS_FIGURA)}")
+
+    df_vendas, df_metas, df_metas_vendedores = carregar_e_processar_dados(arq_vendas, arq_metas)
+    cubo = obter_cubo(df_vendas)
+    df_consolidado = consolidar_meses(cubo, df_metas, inicio, fim)
+    df_resumo = resumir_vendedores(cubo, df_metas_vendedores, inicio, fim)
+
+    os.makedirs(destino, exist_ok=True)
+    caminho_kpis = os.path.join(destino, ARQUIVO_KPIS)
+    calcular_kpis(df_consolidado, df_resumo).rename(columns=ROTULOS_KPIS).to_csv(
+        caminho_kpis, index=False, sep=';', decimal=',', encoding='utf-8-sig'
+    )
+    caminhos = [caminho_kpis]
+    caminhos += _gravar_figuras(
+        figuras_geral(df_consolidado, mostrar_rotulos, em_percentual), os.path.join(destino, 'geral'), formato
+    )
+
+    # Cada tarefa leva só as linhas mensais do vendedor, não o dataset inteiro
+    tarefas = [
+        (
+            consolidar_vendedor(cubo, df_metas_vendedores, vendedor), vendedor,
+            os.path.join(destino, 'vendedores', _nome_arquivo(vendedor)), formato, mostrar_rotulos
+        )
+        for vendedor in df_resumo[COL_VENDEDOR]
+    ]
+    if processos == 1 or len(tarefas) <= 1:
+        resultados = [_exportar_vendedor(*tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            resultados = list(pool.map(_exportar_vendedor, *zip(*tarefas), chunksize=8))
+    for gravados in resultados:
+        caminhos += gravados
+    return caminhos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta KPIs e gráficos do dashboard de metas para arquivos.")
+    parser.add_argument('vendas', help="Planilha de vendas (.xlsx, .csv ou .parquet)")
+    parser.add_argument('metas', help="Planilha de metas (.xlsx ou .zip)")
+    parser.add_argument('destino', help="Pasta onde os relatórios são gravados")
+    parser.add_argument('--formato', choices=FORMATOS_FIGURA, default='html', help="Formato dos gráficos")
+    parser.add_argument('--de', type=_periodo_argumento, help="Primeiro mês dos indicadores (AAAA-MM)")
+    parser.add_argument('--ate', type=_periodo_argumento, help="Último mês dos indicadores (AAAA-MM)")
+    parser.add_argument('--processos', type=int, help="Processos do pool; padrão: um por CPU")
+    parser.add_argument('--sem-rotulos', action='store_true', help="Omite os valores escritos nos gráficos")
+    parser.add_argument('--percentual', action='store_true', help="Barras em percentual de atingimento")
+    args = parser.parse_args(argv)
+
+    caminhos = exportar_relatorios(
+        args.vendas, args.metas, args.destino, args.formato, args.de, args.ate,
+        args.processos, not args.sem_rotulos, args.percentual
+    )
+    print(f"{len(caminhos)} arquivos gravados em {args.destino}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow é opcional: sem ele os snapshots ficam desativados
+    pa = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.environ.get(
+    'DASHBOARD_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.snapshots')
+)
+# Registro único das versões anteriores, ainda lido por `listar`; hoje cada snapshot tem seu .json
+ARQUIVO_REGISTRO = 'registro.json'
+# Incrementar quando o processamento das planilhas mudar, invalidando snapshots antigos
+VERSAO = 6
+
+def disponivel():
+    """Indica se o formato colunar pode ser usado (pyarrow instalado)."""
+    return feather is not None
+
+
+def _caminho(chave, tabela):
+    return os.path.join(SNAPSHOT_DIR, f"{chave}.v{VERSAO}.{tabela}.feather")
+
+
+def _caminho_info(chave):
+    return os.path.join(SNAPSHOT_DIR, f"{chave}.v{VERSAO}.json")
+
+
+def _ler_json(caminho):
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def listar():
+    """Retorna o registro de snapshots: hash -> origem, tabelas, linhas e data.
+
+    Cada snapshot descreve a si mesmo num arquivo <chave>.v<VERSAO>.json,
+    então processos que gravam ao mesmo tempo (o dashboard e o
+    relatorios.py) não disputam um arquivo comum.
+    """
+    registro = _ler_json(os.path.join(SNAPSHOT_DIR, ARQUIVO_REGISTRO)) or {}
+    try:
+        nomes = os.listdir(SNAPSHOT_DIR)
+    except OSError:
+        return registro
+    for nome in nomes:
+        if nome.endswith('.json') and nome != ARQUIVO_REGISTRO:
+            info = _ler_json(os.path.join(SNAPSHOT_DIR, nome))
+            if isinstance(info, dict):
+                registro[nome.split('.', 1)[0]] = info
+    return registro
+
+
+def existe(chave, tabelas):
+    """Indica se todas as tabelas do snapshot estão gravadas (e podem ser lidas)."""
+    return disponivel() and all(os.path.exists(_caminho(chave, tabela)) for tabela in tabelas)
+
+
+def carregar(chave, tabelas):
+    """Lê o snapshot via memory-map e retorna os DataFrames na ordem pedida.
+
+    O memory-map só acelera a leitura: `to_pandas` copia cada coluna para
+    a memória do processo, porque o resto do código espera colunas NumPy
+    (e categóricas), não colunas Arrow. Retorna None se o pyarrow não estiver instalado ou se alguma tabela
+    do snapshot não existir.
+    """
+    if not disponivel():
+        return None
+    caminhos = [_caminho(chave, tabela) for tabela in tabelas]
+    if not all(os.path.exists(caminho) for caminho in caminhos):
+        return None
+    try:
+        return [feather.read_table(caminho, memory_map=True).to_pandas() for caminho in caminhos]
+    except (OSError, pa.ArrowException) as erro:
+        logger.warning("Snapshot %s ilegível, será recriado: %s", chave, erro)
+        return None
+
+
+def salvar(chave, tabelas, origem=None, base=None):
+    """Grava as tabelas em Feather sem compressão (mapeável) e registra o snapshot.
+
+    `base` é a chave do snapshot do qual este foi derivado (vendas com
+    lotes novos acrescentados), guardada no registro.
+
+    Falhas de conversão ou de disco não interrompem o dashboard: o
+    snapshot só deixa de existir e a planilha volta a ser lida do Excel.
+    """
+    if not disponivel():
+        return False
+    temporario = None
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        for tabela, df in tabelas.items():
+            caminho = _caminho(chave, tabela)
+            temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+            feather.write_feather(df, temporario, compression='uncompressed')
+            os.replace(temporario, caminho)
+    except (OSError, ValueError, TypeError, pa.ArrowException) as erro:
+        logger.warning("Não foi possível gravar o snapshot %s: %s", chave, erro)
+        if temporario and os.path.exists(temporario):
+            os.remove(temporario)
+        return False
+
+    info = {
+        'origem': origem,
+        'base': base,
+        'versao': VERSAO,
+        'tabelas': {tabela: len(df) for tabela, df in tabelas.items()},
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+    }
+    temporario = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=SNAPSHOT_DIR, prefix=f"{chave}.", suffix='.tmp', delete=False
+        ) as f:
+            temporario = f.name
+            json.dump(info, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, _caminho_info(chave))
+    except OSError as erro:
+        logger.warning("Não foi possível registrar o snapshot %s: %s", chave, erro)
+        if temporario and os.path.exists(temporario):
+            os.remove(temporario)
+    return True
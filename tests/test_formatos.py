@@ -0,0 +1,86 @@
+import io
+
+import pandas as pd
+import pytest
+
+import dados
+import formatos
+from dados import COL_EMISSAO, COL_PERIODO, COL_VALOR, COL_VENDEDOR, COLUNAS_VENDAS, TIPOS_VENDAS
+
+
+def test_csv_brasileiro_com_separador_de_milhar():
+    conteudo = (
+        'EMISSÃO;VALOR;CONTAGEM;VENDEDOR\n'
+        '02/01/2025;1.234,56;1;Ana\n'
+        '15/01/2025;10,50;1;Ana\n'
+        '03/02/2025;2.000.000,00;1;Bia\n'
+    ).encode('utf-8')
+    df_vendas, cubo = dados.processar_vendas_com_cubo(io.BytesIO(conteudo), formato='csv')
+
+    assert df_vendas[COL_VALOR].tolist() == [1234.56, 10.5, 2000000.0]
+    totais = cubo.groupby(level=COL_VENDEDOR, observed=True)[COL_VALOR].sum()
+    assert totais.to_dict() == {'Ana': 1245.06, 'Bia': 2000000.0}
+
+
+def test_csv_iso_com_valor_invalido_mantem_mes_e_dia():
+    conteudo = (
+        'EMISSÃO,VALOR,CONTAGEM,VENDEDOR\n'
+        '2025-01-02,10.0,1,Ana\n'
+        '2025-03-05,20.0,1,Ana\n'
+        '2025-03-06,n/d,1,Bia\n'
+    ).encode('utf-8')
+    df = formatos.ler_csv(conteudo, COLUNAS_VENDAS, TIPOS_VENDAS)
+
+    assert df[COL_EMISSAO].tolist() == [
+        pd.Timestamp('2025-01-02'), pd.Timestamp('2025-03-05'), pd.Timestamp('2025-03-06')
+    ]
+    assert pd.isna(df[COL_VALOR].iloc[2])
+
+
+def test_csv_com_datas_em_formatos_misturados():
+    conteudo = (
+        'EMISSÃO;VALOR;CONTAGEM;VENDEDOR\n'
+        '2025-01-02;1,00;1;Ana\n'
+        '05/03/2025;2,00;1;Ana\n'
+        '06/03/2025 10:30;3,00;1;Bia\n'
+        'sem data;4,00;1;Bia\n'
+    ).encode('utf-8')
+    df_vendas, _ = dados.processar_vendas_com_cubo(io.BytesIO(conteudo), formato='csv')
+
+    assert df_vendas[COL_PERIODO].tolist() == [202501, 202503, 202503]
+    assert df_vendas[COL_EMISSAO].dt.day.tolist() == [2, 5, 6]
+
+
+def test_csv_ponto_e_virgula_com_ponto_decimal():
+    conteudo = (
+        'EMISSÃO;VALOR;CONTAGEM;VENDEDOR\n'
+        '02/01/2025;1234.56;1;Ana\n'
+        '03/01/2025;10.5;1;Ana\n'
+        '04/01/2025;n/d;1;Bia\n'
+    ).encode('utf-8')
+    df = formatos.ler_csv(conteudo, COLUNAS_VENDAS, TIPOS_VENDAS)
+
+    assert df[COL_VALOR].iloc[:2].tolist() == [1234.56, 10.5]
+    assert pd.isna(df[COL_VALOR].iloc[2])
+
+
+def test_csv_virgula_com_milhar_entre_aspas():
+    conteudo = (
+        'EMISSÃO,VALOR,CONTAGEM,VENDEDOR\n'
+        '2025-01-02,"1,234.56",1,Ana\n'
+        '2025-01-03,"2,000,000.00",1,Bia\n'
+        '2025-01-04,10.5,1,Bia\n'
+    ).encode('utf-8')
+    df = formatos.ler_csv(conteudo, COLUNAS_VENDAS, TIPOS_VENDAS)
+
+    assert df[COL_VALOR].tolist() == [1234.56, 2000000.0, 10.5]
+
+
+def test_csv_com_separador_decimal_ambiguo():
+    conteudo = (
+        'EMISSÃO;VALOR;CONTAGEM;VENDEDOR\n'
+        '02/01/2025;1.234;1;Ana\n'
+        '03/01/2025;2.500;1;Bia\n'
+    ).encode('utf-8')
+    with pytest.raises(ValueError, match='separador decimal'):
+        formatos.ler_csv(conteudo, COLUNAS_VENDAS, TIPOS_VENDAS)